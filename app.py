@@ -1,108 +1,58 @@
-import json
 import os
 from flask import Flask, render_template, request, url_for, flash, redirect, jsonify, session
 from src.renderer import generate_bq_ddl
+from src.instrumentation import record_phases
+from src.diff import generate_bq_alter_ddl
+from src.snapshot import open_snapshot
+from src.source_sessions import attach_source, attached_sources, detach_sources
+from src.model_manager import start_warm_up
+from src.ddl_parser import extract_json_schema_from_ddl
+from src.serialization import dumps, json_value, schema_value
 from routes.mysql_routes import mysql_bp
 from routes.postgres_routes import postgres_bp
 from routes.sqlserver_routes import sqlserver_bp
 from routes.oracle_routes import oracle_bp
 from routes.ai_util_routes import ai_util_bp
+from routes.batch_routes import batch_bp
+from routes.metadata_routes import metadata_bp
+from routes.snapshot_routes import snapshot_bp
+from routes.metrics_routes import metrics_bp
+from routes.serialization_routes import serialization_bp, TimedJSONProvider
+from routes.catalog_routes import catalog_bp
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
+app.json = TimedJSONProvider(app)
 app.register_blueprint(mysql_bp)
 app.register_blueprint(postgres_bp)
 app.register_blueprint(sqlserver_bp)
 app.register_blueprint(oracle_bp)
 app.register_blueprint(ai_util_bp)
-
-import re
+app.register_blueprint(batch_bp)
+app.register_blueprint(metadata_bp)
+app.register_blueprint(snapshot_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(serialization_bp)
+app.register_blueprint(catalog_bp)
 
 def debug_log(message):
     print(f"[DEBUG] {message}")
 
-def extract_json_schema_from_ddl(source_ddl):
-    """
-    Extracts table name, database, schema, and columns from source DDL.
-    Supports:
-      CREATE TABLE ...
-      CREATE OR REPLACE TABLE ...
-      Formats: db.schema.table, schema.table, table
-    Returns a dictionary with table_name, db, schema, columns, table_comment.
-    """
-    # Normalize whitespace and remove extra line breaks
-    ddl_clean = " ".join(source_ddl.strip().split())
-
-    # Regex to extract CREATE TABLE or CREATE OR REPLACE TABLE
-    table_match = re.search(
-        r'CREATE\s+(OR\s+REPLACE\s+)?TABLE\s+((?P<db>\w+)\.)?(?P<schema>\w+)\.(?P<table>\w+)|CREATE\s+(OR\s+REPLACE\s+)?TABLE\s+(?P<table2>\w+)',
-        ddl_clean,
-        re.IGNORECASE
-    )
-
-    db = None
-    schema_name = None
-    table_name = None
-
-    if table_match:
-        if table_match.group('db') and table_match.group('schema') and table_match.group('table'):
-            db = table_match.group('db')
-            schema_name = table_match.group('schema')
-            table_name = table_match.group('table')
-        elif table_match.group('schema') and table_match.group('table'):
-            schema_name = table_match.group('schema')
-            table_name = table_match.group('table')
-        elif table_match.group('table2'):
-            table_name = table_match.group('table2')
-    else:
-        # fallback
-        match_simple = re.search(r'CREATE\s+(OR\s+REPLACE\s+)?TABLE\s+([^\s(]+)', ddl_clean, re.IGNORECASE)
-        table_name = match_simple.group(2) if match_simple else "extracted_table"
-
-    # Parse column definitions inside parentheses
-    columns = []
-    col_block_match = re.search(r'\((.*)\)', ddl_clean)
-    if col_block_match:
-        col_block = col_block_match.group(1)
-        # Split by commas not inside parentheses
-        col_defs = re.split(r',\s*(?![^()]*\))', col_block)
-        for col_def in col_defs:
-            col_def = col_def.strip()
-            if not col_def:
-                continue
-            # Pattern: name type [NULL|NOT NULL] [COMMENT '...']
-            col_match = re.match(
-                r'`?(?P<name>\w+)`?\s+(?P<type>\w+(\([^)]+\))?)\s*(?P<nullable>NOT NULL|NULL)?\s*(COMMENT\s+[\'"](?P<comment>[^\'"]+)[\'"])?',
-                col_def,
-                re.IGNORECASE
-            )
-            if col_match:
-                col_name = col_match.group('name')
-                col_type = col_match.group('type')
-                nullable = True if not col_match.group('nullable') or col_match.group('nullable').upper() != "NOT NULL" else False
-                comment = col_match.group('comment') or ""
-                columns.append({
-                    "name": col_name,
-                    "type": col_type,
-                    "nullable": nullable,
-                    "comment": comment
-                })
-
-    # If no columns parsed, indicate failure
-    if not columns:
-        msg = "Failed to parse columns"
-    else:
-        msg = "Columns parsed successfully"
-
-    return {
-        "table_name": table_name,
-        "columns": columns,
-        "db": db or "sourcedb",
-        "schema": schema_name or "sourceschema",
-        "table_comment": "Extracted from DDL",
-        "msg": msg
-    }
-
+def source_template_args(preferred=None):
+    # <engine>_connected / <engine>_dbs / <engine>_source for the browse tab, from the server-side
+    # source registry. Per engine: the source named preferred, else the default id (the engine
+    # name), else the most recently attached named one.
+    args = {}
+    sources = attached_sources(session)
+    for db_system in ("mysql", "postgresql", "sqlserver", "oracle"):
+        candidates = {source["id"]: source for source in sources if source["engine"] == db_system}
+        source = candidates.get(preferred) or candidates.get(db_system)
+        if source is None and candidates:
+            source = list(candidates.values())[-1]
+        args[f"{db_system}_connected"] = source is not None
+        args[f"{db_system}_dbs"] = source["dbs"] if source else []
+        args[f"{db_system}_source"] = source["id"] if source else ""
+    return args
 
 DEFAULT_JSON_SCHEMA = '''{
     "table_name": "employees",
@@ -132,17 +82,11 @@ def home():
         port=request.args.get('port', ''),
         username=request.args.get('username', ''),
         database=request.args.get('database', ''),
-        mysql_connected=session.get('mysql_connected', False),
-        mysql_dbs=session.get('mysql_dbs', []),
-        postgresql_connected=session.get('postgresql_connected', False),
-        postgresql_dbs=session.get('postgresql_dbs', []),
-        sqlserver_connected=session.get('sqlserver_connected', False),
-        sqlserver_dbs=session.get('sqlserver_dbs', []),
-        oracle_connected=session.get('oracle_connected', False),
         active_tab=request.args.get('active_tab', 'manual'),
         json_schema_text=request.args.get('json_schema_text', DEFAULT_JSON_SCHEMA),
         source_ddl_text=request.args.get('source_ddl_text', DEFAULT_SOURCE_DDL),
-        bq_table_name=request.args.get('bq_table_name', '')
+        bq_table_name=request.args.get('bq_table_name', ''),
+        **source_template_args(request.args.get('source'))
     )
 
 @app.route('/generate', methods=['POST'])
@@ -160,13 +104,15 @@ def generate():
     # If JSON schema is provided, use it
     if json_schema_text:
         try:
-            schema = json.loads(json_schema_text)
+            schema = schema_value(json_schema_text)
             columns = schema.get('columns', [])
             table_comment = schema.get('table_comment', '')
             table_name = bq_table_name or schema.get('table_name', '')
             dataset = f"{bq_project_id}.{bq_dataset_id}" if bq_project_id and bq_dataset_id else bq_dataset_id
             debug_log(f"Calling generate_bq_ddl with table_name={table_name}, columns={columns}, dataset={dataset}")
-            ddl = generate_bq_ddl(table_name, columns, dataset, table_comment)
+            timings = {}
+            ddl = generate_bq_ddl(table_name, columns, dataset, table_comment, timings=timings)
+            record_phases(timings)
         except Exception as e:
             debug_log(f"Error in generate_bq_ddl: {e}")
             ddl = f"-- Error: {e}"
@@ -175,7 +121,7 @@ def generate():
         try:
             debug_log("Extracting JSON schema from source DDL")
             schema = extract_json_schema_from_ddl(source_ddl_text)
-            json_schema_text = json.dumps(schema, indent=4)
+            json_schema_text = dumps(schema, pretty=True)
         except Exception as e:
             debug_log(f"Error extracting schema from DDL: {e}")
             json_schema_text = f"-- Error extracting schema: {e}"
@@ -192,10 +138,8 @@ def generate():
         port=request.form.get('port', ''),
         username=request.form.get('username', ''),
         database=request.form.get('database', ''),
-        mysql_connected=session.get('mysql_connected', False),
-        mysql_dbs=session.get('mysql_dbs', []),
-        oracle_connected=session.get('oracle_connected', False),
-        active_tab='manual'
+        active_tab='manual',
+        **source_template_args(request.args.get('source'))
     )
 
 @app.route('/connect', methods=['POST'])
@@ -210,17 +154,7 @@ def connect():
 
     debug_log(f"Trying to connect to {db_system} with host={host}, port={port}, username={username}")
 
-    # Disconnect all source systems before connecting a new one
-    session.pop('mysql_connected', None)
-    session.pop('mysql_dbs', None)
-    session.pop('mysql_conn', None)
-    session.pop('postgresql_connected', None)
-    session.pop('postgresql_dbs', None)
-    session.pop('postgresql_conn', None)
-    session.pop('sqlserver_connected', None)
-    session.pop('sqlserver_dbs', None)
-    session.pop('sqlserver_conn', None)
-
+    # Other attached sources stay attached; connecting again replaces this source only
     # Only handle SQL Server here; MySQL and PostgreSQL are handled in their blueprints
     connection_success = False
 
@@ -230,14 +164,18 @@ def connect():
             dbs = test_sqlserver_connection(host, port, username, password)
             debug_log("SQL Server connection successful")
             flash("SQL Server connection successful!", "success")
-            session['sqlserver_connected'] = True
-            session['sqlserver_dbs'] = dbs
-            session['sqlserver_conn'] = {
-                'host': host,
-                'port': port,
-                'user': username,
-                'password': password
-            }
+            attach_source(
+                session,
+                'sqlserver',
+                {
+                    'host': host,
+                    'port': port,
+                    'user': username,
+                    'password': password
+                },
+                dbs,
+                request.form.get('source_name') or None
+            )
             connection_success = True
         except Exception as e:
             debug_log(f"SQL Server connection failed: {e}")
@@ -269,35 +207,100 @@ def connect():
 @app.route('/clear_connection', methods=['POST'])
 def clear_connection():
     debug_log("POST /clear_connection route called")
-    session.pop('mysql_connected', None)
-    session.pop('postgresql_connected', None)
-    session.pop('sqlserver_connected', None)
-    session.pop('oracle_connected', None)         # <-- Add this line
-    session.pop('mysql_dbs', None)
-    session.pop('postgresql_dbs', None)
-    session.pop('sqlserver_dbs', None)
-    session.pop('oracle_dbs', None)               # <-- Add this line
-    session.pop('mysql_conn', None)
-    session.pop('postgresql_conn', None)
-    session.pop('sqlserver_conn', None)
-    session.pop('oracle_conn', None)              # <-- Add this line
-    debug_log("Cleared all connection sessions")
+    # "source" detaches one source; without it every source of this session is closed
+    source_id = request.values.get('source') or (request.get_json(silent=True) or {}).get('source')
+    removed = detach_sources(session, source_id or None)
+    debug_log(f"Detached {removed} source(s)")
     return ('', 204)
 
+@app.route('/sources', methods=['GET'])
+def list_sources():
+    """The sources attached to this session, without credentials."""
+    return jsonify([
+        {
+            "source": source["id"],
+            "db_system": source["engine"],
+            "host": source["conn"].get('host'),
+            "port": source["conn"].get('port'),
+            "user": source["conn"].get('user'),
+            "databases": source["dbs"]
+        }
+        for source in attached_sources(session)
+    ])
+
 @app.route('/generate_bq_ddl', methods=['POST'])
 def generate_bq_ddl_route():
     debug_log("POST /generate_bq_ddl route called")
     data = request.get_json()
-    print("Data :",data)
-    schema = json.loads(data.get('schema'))
+    try:
+        schema = schema_value(data.get('schema'))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid schema: {e}"}), 400
+    bq_project_id = data.get('bq_project_id')
+    bq_dataset_id = data.get('bq_dataset_id')
+    bq_table_name = data.get('bq_table_name') or schema.get('table_name', 'my_table')
+    dataset = f"{bq_project_id}.{bq_dataset_id}" if bq_project_id and bq_dataset_id else bq_dataset_id or schema.get("schema")
+    timings = {}
+    ddl = generate_bq_ddl(bq_table_name, schema.get('columns', []), dataset, schema.get('table_comment'),
+                          data.get('db_system') or None, timings)
+    record_phases(timings)
+    return jsonify({"ddl": ddl})
+
+@app.route('/generate_bq_alter_ddl', methods=['POST'])
+def generate_bq_alter_ddl_route():
+    """
+    Like /generate_bq_ddl, but returns only the ALTER TABLE statements needed to
+    bring an existing BigQuery table up to date. The existing table is described
+    by "previous_schema" (a schema JSON from an earlier extraction),
+    "bigquery_schema" (output of `bq show --schema` or a table resource) or a
+    "snapshot_id" to look the table up in. Schemas may be sent as JSON objects
+    or, as older clients do, as JSON strings.
+    """
+    debug_log("POST /generate_bq_alter_ddl route called")
+    data = request.get_json()
+    try:
+        schema = schema_value(data.get('schema'))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid schema: {e}"}), 400
     bq_project_id = data.get('bq_project_id')
     bq_dataset_id = data.get('bq_dataset_id')
     bq_table_name = data.get('bq_table_name') or schema.get('table_name', 'my_table')
     dataset = f"{bq_project_id}.{bq_dataset_id}" if bq_project_id and bq_dataset_id else bq_dataset_id or schema.get("schema")
-    ddl = generate_bq_ddl(bq_table_name, schema.get('columns', []), dataset, schema.get('table_comment'))
+    old_is_bigquery = False
+    try:
+        bigquery_schema = json_value(data.get('bigquery_schema'))
+        previous_schema = json_value(data.get('previous_schema'))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid previous schema: {e}"}), 400
+    if bigquery_schema:
+        previous = bigquery_schema
+        old_is_bigquery = True
+    elif previous_schema:
+        previous = previous_schema
+    elif data.get('snapshot_id'):
+        try:
+            previous = open_snapshot(data['snapshot_id']).get_table_schema(schema.get('table_name'), schema.get('schema'))
+        except (ValueError, FileNotFoundError) as e:
+            return jsonify({"error": str(e)}), 404
+        if previous is None:
+            return jsonify({"error": "Table not in snapshot"}), 404
+    else:
+        return jsonify({"error": "previous_schema, bigquery_schema or snapshot_id is required"}), 400
+    ddl = generate_bq_alter_ddl(
+        bq_table_name,
+        previous,
+        schema,
+        dataset,
+        data.get('db_system') or None,
+        old_is_bigquery=old_is_bigquery,
+        drop_columns=bool(data.get('drop_columns'))
+    )
     return jsonify({"ddl": ddl})
 
 
 if __name__ == '__main__':
     debug_log("Starting Flask app")
+    # With the debug reloader only the child process serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_warm_up()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,282 @@
+# asgi.py
+"""
+ASGI entry point, for serving many concurrent browse requests from one process:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+
+The Flask app runs unchanged on a thread pool. Catalog and browse requests
+(/catalog/*, /get_<engine>_*) wait as coroutines for a slot on their source
+before they get a thread, so a slow catalog holds at most
+BQ_DDL_SOURCE_CONCURRENCY threads and requests to other sources keep flowing.
+Run one process per deployment (or sticky sessions): attached sources live in
+this process's registry.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_cookie
+
+from app import app
+from src.executor import SOURCE_CONCURRENCY
+from src.instrumentation import metrics
+from src.source_sessions import DB_SYSTEMS, SESSION_KEY, source_sessions
+
+# Threads running Flask requests; parked catalog requests do not use one
+ASGI_THREADS = int(os.environ.get("BQ_DDL_ASGI_THREADS", "64"))
+# Request bodies larger than this are spooled to a temporary file
+BODY_SPOOL_SIZE = 1024 * 1024
+
+# Browse endpoints of the engine blueprints; /catalog/* take db_system instead
+_ENGINE_PREFIXES = {
+    "/get_mysql_": "mysql",
+    "/get_postgres_": "postgresql",
+    "/get_sqlserver_": "sqlserver",
+    "/get_oracle_": "oracle",
+}
+
+
+class SourceGate:
+    """
+    Per-source asyncio semaphores capping the catalog requests in flight
+    against one server (engine, host, port). Waiting requests cost a coroutine,
+    not a thread. A source's semaphore and counts are dropped once no request
+    waits on or runs against it, so sessions attaching many hosts do not grow
+    the gate or the metric's label set.
+    """
+
+    def __init__(self, limit=SOURCE_CONCURRENCY):
+        self.limit = max(1, limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self.waiting = {}
+        self.active = {}
+
+    def _semaphore(self, key):
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    async def run(self, key, coro_fn):
+        semaphore = self._semaphore(key)
+        self._count(self.waiting, key, 1)
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._count(self.waiting, key, -1)
+            self._forget_if_idle(key)
+            raise
+        self._count(self.waiting, key, -1)
+        self._count(self.active, key, 1)
+        try:
+            return await coro_fn()
+        finally:
+            self._count(self.active, key, -1)
+            semaphore.release()
+            self._forget_if_idle(key)
+
+    def _count(self, counts, key, delta):
+        # Runs on the event loop thread; the lock is for samples() called from /metrics threads
+        with self._lock:
+            counts[key] = counts.get(key, 0) + delta
+
+    def _forget_if_idle(self, key):
+        # Every coroutine holding this key's semaphore is counted as waiting or active
+        with self._lock:
+            if not self.waiting.get(key) and not self.active.get(key):
+                self.waiting.pop(key, None)
+                self.active.pop(key, None)
+                self._semaphores.pop(key, None)
+
+    def samples(self):
+        with self._lock:
+            waiting = dict(self.waiting)
+            active = dict(self.active)
+        samples = []
+        for (engine, host, port), value in waiting.items():
+            samples.append(("bq_ddl_catalog_requests", "gauge", "Catalog requests per source by state",
+                            {"engine": engine, "host": host, "port": port, "state": "waiting"}, value))
+        for (engine, host, port), value in active.items():
+            samples.append(("bq_ddl_catalog_requests", "gauge", "Catalog requests per source by state",
+                            {"engine": engine, "host": host, "port": port, "state": "active"}, value))
+        return samples
+
+
+def _request_engine(path, query):
+    if path in ("/catalog/schemas", "/catalog/tables"):
+        engine = query.get("db_system", [""])[0]
+        return engine if engine in DB_SYSTEMS else None
+    for prefix, engine in _ENGINE_PREFIXES.items():
+        if path.startswith(prefix):
+            return engine
+    return None
+
+
+def _session_handle(headers):
+    """The source registry handle from the signed Flask session cookie, or None."""
+    cookie = headers.get(b"cookie")
+    if not cookie:
+        return None
+    value = parse_cookie(cookie.decode("latin1")).get(app.config["SESSION_COOKIE_NAME"])
+    serializer = app.session_interface.get_signing_serializer(app)
+    if not value or serializer is None:
+        return None
+    try:
+        data = serializer.loads(value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+    except Exception:
+        return None
+    return data.get(SESSION_KEY)
+
+
+def source_key(scope, headers):
+    """
+    (engine, host, port) of the attached source a catalog request will query,
+    or None. It can block on closing expired pools; call it from a worker thread.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode("latin1"))
+    engine = _request_engine(scope["path"], query)
+    if engine is None:
+        return None
+    entry = source_sessions.get(_session_handle(headers), query.get("source", [engine])[0])
+    if entry is None or entry["engine"] != engine:
+        return None
+    return (engine, str(entry["conn"].get("host")), str(entry["conn"].get("port")))
+
+
+def _environ(scope, headers, body, body_length):
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path,
+        "PATH_INFO": path,
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers.items():
+        name = name.decode("latin1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = "HTTP_" + name
+        environ[name] = value.decode("latin1")
+    # The body is read in full before the request runs, so its length is known even when it was chunked
+    environ["CONTENT_LENGTH"] = str(body_length)
+    environ.pop("HTTP_TRANSFER_ENCODING", None)
+    return environ
+
+
+def _run_wsgi(environ, loop, send):
+    """Runs one Flask request on a pool thread, sending the response chunks through the event loop."""
+    status = {}
+
+    def emit(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def start_response(status_line, response_headers, exc_info=None):
+        status["code"] = int(status_line.split(" ", 1)[0])
+        status["headers"] = [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in response_headers]
+        return lambda chunk: emit_body(chunk)
+
+    def emit_body(chunk):
+        if not status.get("sent"):
+            emit({"type": "http.response.start", "status": status["code"], "headers": status["headers"]})
+            status["sent"] = True
+        if chunk:
+            emit({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    result = app(environ, start_response)
+    try:
+        for chunk in result:
+            emit_body(chunk)
+        emit_body(b"")
+        emit({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+
+
+class AsgiApp:
+    """ASGI wrapper around the Flask app with source-gated catalog requests."""
+
+    def __init__(self, threads=ASGI_THREADS, gate=None):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="bq-ddl-asgi")
+        self.gate = gate or SourceGate()
+        metrics.add_collector(self.gate.samples)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        headers = {}
+        for name, value in scope.get("headers", []):
+            name = name.lower()
+            if name in headers:
+                # Cookie is the one header whose repeated values are joined with "; " (RFC 6265)
+                value = headers[name] + (b"; " if name == b"cookie" else b",") + value
+            headers[name] = value
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return
+            body.write(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body_length = body.tell()
+        body.seek(0)
+        loop = asyncio.get_running_loop()
+        environ = _environ(scope, headers, body, body_length)
+
+        async def run():
+            try:
+                await loop.run_in_executor(self.executor, _run_wsgi, environ, loop, send)
+            finally:
+                body.close()
+
+        key = None
+        if _request_engine(scope["path"], parse_qs(environ["QUERY_STRING"])) is not None:
+            # The registry lookup may expire idle sessions and close their pools, so it stays off the loop
+            key = await loop.run_in_executor(self.executor, source_key, scope, headers)
+        if key is None:
+            await run()
+        else:
+            await self.gate.run(key, run)
+
+
+application = AsgiApp()
@@ -0,0 +1,205 @@
+# benchmarks/connectors.py
+"""
+Connector benchmarks against the mock catalogs, with simulated network latency.
+
+    python -m benchmarks.connectors                  # all engines
+    python -m benchmarks.connectors --engine oracle --query-latency 0.005
+    python -m benchmarks.connectors --save-baseline
+    python -m benchmarks.connectors --compare        # exit 1 on regressions
+
+Each scenario starts with empty pools and an empty metadata cache and reports
+wall time, catalog round trips, connections opened and the peak number of
+concurrent queries. Round trips and connections do not depend on the machine,
+so they are compared exactly; times are compared with --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.mock_catalog import ENGINES, MockCatalog, mock_sources
+from src.batch import extract_changed_schemas, extract_source_schemas
+from src.executor import SOURCE_CONCURRENCY
+from src.fingerprints import diff_fingerprints, get_table_fingerprints
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "connectors_baseline.json")
+DEFAULT_THRESHOLD = 1.25
+
+
+def _location(catalog):
+    database = next(iter(catalog.databases))
+    schema = next(iter(catalog.databases[database]))
+    return database, schema
+
+
+def _browse_table(catalog, repeats=3):
+    """The browse tab opening the same table several times; only the first should reach the source."""
+    database, schema = _location(catalog)
+    details = catalog.conn_details
+    args = (details["host"], details["port"], details["user"], details["password"])
+    table = catalog.databases[database][schema][0]["table_name"]
+    for _ in range(repeats):
+        if catalog.engine == "mysql":
+            from src.mysql_conn import get_mysql_table_schema
+            get_mysql_table_schema(*args, database, table)
+        elif catalog.engine == "postgresql":
+            from src.postgres_conn import get_postgres_table_schema
+            get_postgres_table_schema(*args, database, schema, table)
+        elif catalog.engine == "sqlserver":
+            from src.sqlserver_conn import get_sqlserver_table_schema
+            get_sqlserver_table_schema(*args, database, schema, table)
+        else:
+            from src.oracle_conn import get_oracle_table_schema
+            get_oracle_table_schema(*args, database, schema, table)
+    return repeats
+
+
+def _checked(outcome):
+    if outcome["errors"]:
+        raise RuntimeError(f"Extraction failed: {outcome['errors'][0]}")
+    return outcome
+
+
+def scenarios(table_count):
+    """Returns [(name, fn(catalog) -> tables processed)]."""
+    def bulk(catalog):
+        database, schema = _location(catalog)
+        outcome = _checked(extract_source_schemas(
+            catalog.engine, catalog.conn_details, database, schema if catalog.engine == "oracle" else None
+        ))
+        return len(outcome["schemas"])
+
+    def per_table(workers):
+        def run(catalog):
+            database, schema = _location(catalog)
+            tables = [t["table_name"] for t in catalog.databases[database][schema]][:table_count]
+            outcome = _checked(extract_source_schemas(
+                catalog.engine, catalog.conn_details, database, schema, tables=tables, max_workers=workers
+            ))
+            return len(outcome["schemas"])
+        return run
+
+    def changed(catalog):
+        database, schema = _location(catalog)
+        outcome = _checked(extract_changed_schemas(
+            catalog.engine, catalog.conn_details, database, schema if catalog.engine == "oracle" else None
+        ))
+        previous = outcome["fingerprints"]
+        # Second run with nothing changed should only cost the fingerprint queries
+        outcome = _checked(extract_changed_schemas(
+            catalog.engine, catalog.conn_details, database, schema if catalog.engine == "oracle" else None,
+            previous=previous
+        ))
+        return len(previous)
+
+    def detect_then_generate(catalog):
+        # /detect_changes output fed to /generate_batch_ddl as "tables", as the web app does
+        database, schema = _location(catalog)
+        owner = schema if catalog.engine == "oracle" else None
+        current = get_table_fingerprints(catalog.engine, catalog.conn_details, database, owner)
+        changes = diff_fingerprints(current, None)
+        keys = changes["changed"] + changes["added"]
+        outcome = _checked(extract_source_schemas(catalog.engine, catalog.conn_details, database, owner, keys))
+        extracted = {f"{s.get('schema')}.{s.get('table_name')}" for s in outcome["schemas"]}
+        if extracted != set(keys):
+            raise RuntimeError(f"Round trip extracted {len(extracted)} of {len(keys)} detected tables")
+        return len(extracted)
+
+    return [
+        ("bulk", bulk),
+        ("per_table_serial", per_table(1)),
+        ("per_table_concurrent", per_table(SOURCE_CONCURRENCY)),
+        ("browse_repeat", _browse_table),
+        ("changed_since", changed),
+        ("detect_then_generate", detect_then_generate),
+    ]
+
+
+def run_benchmarks(engines, tables=200, columns=20, schemas=2, connect_latency=0.02, query_latency=0.002,
+                   row_latency=0.001, table_count=40, out=sys.stdout):
+    results = {}
+    for engine in engines:
+        catalog = MockCatalog.synthetic(engine, schemas=schemas, tables=tables, columns=columns)
+        for name, fn in scenarios(table_count):
+            with mock_sources(catalog, connect_latency=connect_latency, query_latency=query_latency,
+                              row_latency=row_latency):
+                catalog.reset_stats()
+                start = time.perf_counter()
+                processed = fn(catalog)
+                seconds = time.perf_counter() - start
+                stats = catalog.stats()
+            key = f"{engine}/{name}"
+            results[key] = {
+                "seconds": seconds,
+                "tables": processed,
+                "queries": stats["queries"],
+                "connects": stats["connects"],
+                "max_concurrent_queries": stats["max_concurrent_queries"]
+            }
+            print(f"{key:<34} {seconds * 1000:>9.1f} ms {processed:>6} tables {stats['queries']:>6} queries "
+                  f"{stats['connects']:>3} connects {stats['max_concurrent_queries']:>3} concurrent", file=out)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, out=sys.stdout):
+    """Returns the names of scenarios that need more round trips or time than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        reasons = []
+        if result["queries"] > base["queries"]:
+            reasons.append(f"queries {base['queries']} -> {result['queries']}")
+        if result["max_concurrent_queries"] > SOURCE_CONCURRENCY:
+            reasons.append(f"{result['max_concurrent_queries']} concurrent queries exceed {SOURCE_CONCURRENCY}")
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        if ratio > threshold:
+            reasons.append(f"time x{ratio:.2f}")
+        if reasons:
+            regressions.append(name)
+        print(f"{name:<34} time x{ratio:.2f}  " + ("REGRESSION: " + ", ".join(reasons) if reasons else "ok"),
+              file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the source connectors against mock catalogs.")
+    parser.add_argument("--engine", choices=ENGINES, action="append", help="Engine to run (repeatable)")
+    parser.add_argument("--tables", type=int, default=200, help="Tables per schema (default 200)")
+    parser.add_argument("--columns", type=int, default=20, help="Columns per table (default 20)")
+    parser.add_argument("--connect-latency", type=float, default=0.02, help="Seconds per connect (default 0.02)")
+    parser.add_argument("--query-latency", type=float, default=0.002, help="Seconds per query (default 0.002)")
+    parser.add_argument("--row-latency", type=float, default=0.001,
+                        help="Seconds per 1000 rows returned (default 0.001)")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.engine or ENGINES, tables=args.tables, columns=args.columns, connect_latency=args.connect_latency,
+        query_latency=args.query_latency, row_latency=args.row_latency
+    )
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "source_concurrency": SOURCE_CONCURRENCY, "results": results}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,553 @@
+# benchmarks/mock_catalog.py
+"""
+In-memory stand-ins for the MySQL, PostgreSQL, SQL Server and Oracle drivers.
+
+A MockCatalog holds schema dicts and answers the catalog queries issued by
+src/*_conn.py through fake DB-API connections, with optional latency per
+connect and per query. Installing it replaces the pool adapters, so the real
+connector code (pooling, metadata cache, bulk extraction, fingerprints) runs
+unchanged against it:
+
+    catalog = MockCatalog.synthetic("postgresql", schemas=2, tables=100, columns=30)
+    with mock_sources(catalog, query_latency=0.002):
+        extract_source_schemas("postgresql", catalog.conn_details, "benchdb")
+    print(catalog.stats())
+
+Queries the catalog does not recognise raise MockQueryError, so a connector
+query that changes shape shows up here instead of silently returning nothing.
+"""
+
+import hashlib
+import importlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from benchmarks.synthetic import make_schema
+from src.metadata_cache import metadata_cache
+from src import pool
+
+ENGINES = ("mysql", "postgresql", "sqlserver", "oracle")
+# Connector modules, which register the pool adapters the mock replaces
+_CONNECTOR_MODULES = {
+    "mysql": "src.mysql_conn",
+    "postgresql": "src.postgres_conn",
+    "sqlserver": "src.sqlserver_conn",
+    "oracle": "src.oracle_conn",
+}
+_PING_QUERIES = {"oracle": "SELECT 1 FROM dual"}
+
+
+class MockQueryError(Exception):
+    pass
+
+
+def _fingerprint(schema):
+    text = "|".join(
+        f"{col['name']}:{col['type']}:{col['nullable']}:{col['comment']}" for col in schema["columns"]
+    )
+    return hashlib.md5(f"{schema.get('table_comment') or ''}|{text}".encode("utf-8")).hexdigest()
+
+
+class MockCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self._rows = []
+
+    def execute(self, query, params=None, **named):
+        self.connection.catalog._execute(self, query, params, named)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        self._rows = []
+
+
+class MockConnection:
+
+    def __init__(self, catalog, engine, database):
+        self.catalog = catalog
+        self.engine = engine
+        self.database = database
+        self.autocommit = True
+        self.closed = False
+
+    def cursor(self):
+        if self.closed:
+            raise MockQueryError("Connection is closed")
+        return MockCursor(self)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.catalog._closed()
+
+
+class MockCatalog:
+    """
+    Catalog of one engine: {database: {schema: [schema dict, ...]}}.
+    For MySQL the schema level is the database itself. connect_latency and
+    query_latency are seconds; query_latency may also be a function of the
+    query text. row_latency is added per 1000 rows returned.
+    """
+
+    def __init__(self, engine, databases, host="mock-host", port="1", user="bench", password="bench",
+                 connect_latency=0.0, query_latency=0.0, row_latency=0.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unsupported source system: {engine}")
+        self.engine = engine
+        self.databases = databases
+        self.conn_details = {"host": host, "port": port, "user": user, "password": password}
+        if engine == "oracle":
+            self.conn_details["service_name"] = next(iter(databases), "")
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+        self.row_latency = row_latency
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @classmethod
+    def synthetic(cls, engine, databases=1, schemas=1, tables=50, columns=20, comment_length=40, **kwargs):
+        """A catalog of generated tables named benchdb[_n] / bench[_n] / table_<n>."""
+        catalog = {}
+        seed = 0
+        for db_idx in range(databases):
+            db_name = "benchdb" if db_idx == 0 else f"benchdb_{db_idx}"
+            if engine == "oracle":
+                db_name = db_name.upper()
+            catalog[db_name] = {}
+            schema_names = [db_name] if engine == "mysql" else [
+                "bench" if idx == 0 else f"bench_{idx}" for idx in range(schemas)
+            ]
+            for schema_name in schema_names:
+                if engine == "oracle":
+                    schema_name = schema_name.upper()
+                entries = []
+                for table_idx in range(tables):
+                    table = make_schema(f"table_{table_idx}", columns, engine, comment_length, seed)
+                    seed += 1
+                    if engine == "oracle":
+                        table["table_name"] = table["table_name"].upper()
+                        for col in table["columns"]:
+                            col["name"] = col["name"].upper()
+                    table["db"] = db_name
+                    table["schema"] = schema_name
+                    entries.append(table)
+                catalog[db_name][schema_name] = entries
+        return cls(engine, catalog, **kwargs)
+
+    # Statistics
+
+    def reset_stats(self):
+        with self._lock:
+            self.connects = 0
+            self.closes = 0
+            self.queries = 0
+            self.rows = 0
+            self._open = 0
+            self._in_flight = 0
+            self.max_open = 0
+            self.max_in_flight = 0
+            self.query_counts = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "closes": self.closes,
+                "queries": self.queries,
+                "rows": self.rows,
+                "open_connections": self._open,
+                "max_open_connections": self.max_open,
+                "max_concurrent_queries": self.max_in_flight,
+                "query_counts": dict(self.query_counts)
+            }
+
+    # Driver entry points
+
+    def connect(self, host=None, port=None, user=None, password=None, database=None, **kwargs):
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        if (user, str(password)) != (self.conn_details["user"], str(self.conn_details["password"])):
+            raise MockQueryError(f"Access denied for user {user}")
+        with self._lock:
+            self.connects += 1
+            self._open += 1
+            self.max_open = max(self.max_open, self._open)
+        return MockConnection(self, self.engine, database)
+
+    def _closed(self):
+        with self._lock:
+            self.closes += 1
+            self._open -= 1
+
+    def _execute(self, cursor, query, params, named):
+        text = " ".join(query.split())
+        handler, name = self._route(text)
+        with self._lock:
+            self.queries += 1
+            self.query_counts[name] = self.query_counts.get(name, 0) + 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        rows = []
+        try:
+            rows = handler(cursor.connection.database, text, tuple(params or ()), named)
+            latency = self.query_latency(text) if callable(self.query_latency) else self.query_latency
+            latency += self.row_latency * len(rows) / 1000
+            if latency:
+                time.sleep(latency)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.rows += len(rows)
+        cursor._rows = list(rows)
+
+    def _route(self, text):
+        upper = text.upper()
+        if upper in ("SELECT 1", "SELECT 1 FROM DUAL"):
+            return (lambda *args: [(1,)]), "ping"
+        for needles, handler in getattr(self, f"_{self.engine}_routes")():
+            if all(needle in upper for needle in needles):
+                return handler, handler.__name__.lstrip("_")
+        raise MockQueryError(f"Mock {self.engine} catalog has no answer for: {text[:200]}")
+
+    # Catalog helpers
+
+    def _schemas(self, database):
+        return self.databases.get(database) or {}
+
+    def _tables(self, database, schema):
+        return self._schemas(database).get(schema, [])
+
+    def _table(self, database, schema, table):
+        for entry in self._tables(database, schema):
+            if entry["table_name"] == table:
+                return entry
+        return None
+
+    @staticmethod
+    def _page(names, pattern, after, limit):
+        """A keyset page of names: LIKE '<prefix>%' (escaped with \\), > after, sorted, at most limit."""
+        prefix = re.sub(r"\\(.)", r"\1", pattern[:-1] if pattern.endswith("%") else pattern)
+        matches = sorted(name for name in names if name.startswith(prefix) and name > after)
+        return [(name,) for name in matches[:int(limit)]]
+
+    # MySQL
+
+    def _mysql_routes(self):
+        return [
+            (("SHOW DATABASES",), self._mysql_databases),
+            (("INFORMATION_SCHEMA.TABLES", "LIMIT %S"), self._mysql_tables_page),
+            (("SHOW TABLE STATUS",), self._mysql_table_status),
+            (("SHOW TABLES",), self._mysql_tables),
+            (("CRC32",), self._mysql_fingerprints),
+            (("INFORMATION_SCHEMA.COLUMNS", "TABLE_NAME = %S"), self._mysql_columns),
+            (("INFORMATION_SCHEMA.COLUMNS",), self._mysql_all_columns),
+            (("INFORMATION_SCHEMA.TABLES",), self._mysql_all_tables),
+        ]
+
+    def _mysql_databases(self, database, text, params, named):
+        return [(name,) for name in self.databases]
+
+    def _mysql_tables(self, database, text, params, named):
+        return [(t["table_name"],) for t in self._tables(database, database)]
+
+    def _mysql_tables_page(self, database, text, params, named):
+        names = [t["table_name"] for t in self._tables(params[0], params[0])]
+        return self._page(names, params[1], params[2], params[3])
+
+    def _mysql_table_status(self, database, text, params, named):
+        table = self._table(database, database, params[0])
+        return [(table["table_name"],) + (None,) * 16 + (table["table_comment"],)] if table else []
+
+    def _mysql_columns(self, database, text, params, named):
+        table = self._table(params[0], params[0], params[1])
+        return [
+            (col["name"], col["type"], None, "YES" if col["nullable"] else "NO", None, "", "", col["comment"])
+            for col in (table or {}).get("columns", [])
+        ]
+
+    def _mysql_all_tables(self, database, text, params, named):
+        return [(t["table_name"], t["table_comment"]) for t in self._tables(params[0], params[0])]
+
+    def _mysql_all_columns(self, database, text, params, named):
+        return [
+            (t["table_name"], col["name"], col["type"], "YES" if col["nullable"] else "NO", col["comment"])
+            for t in sorted(self._tables(params[0], params[0]), key=lambda t: t["table_name"])
+            for col in t["columns"]
+        ]
+
+    def _mysql_fingerprints(self, database, text, params, named):
+        return [
+            (t["table_name"], "2024-01-01 00:00:00", t["table_comment"], len(t["columns"]), _fingerprint(t))
+            for t in self._tables(params[0], params[0])
+        ]
+
+    # PostgreSQL
+
+    def _postgresql_routes(self):
+        return [
+            (("FROM PG_DATABASE",), self._pg_databases),
+            (("FROM PG_CATALOG.PG_NAMESPACE", "LIMIT %S"), self._pg_schemas_page),
+            (("FROM PG_CATALOG.PG_CLASS", "LIMIT %S"), self._pg_tables_page),
+            (("INFORMATION_SCHEMA.SCHEMATA",), self._pg_schemas),
+            (("INFORMATION_SCHEMA.TABLES",), self._pg_tables),
+            (("STRING_AGG",), self._pg_fingerprints),
+            (("INFORMATION_SCHEMA.COLUMNS", "TABLE_NAME = %S"), self._pg_columns),
+            (("INFORMATION_SCHEMA.COLUMNS",), self._pg_all_columns),
+            (("PG_DESCRIPTION", "NSPNAME = %S"), self._pg_all_comments),
+            (("PG_ATTRIBUTE", "::REGCLASS"), self._pg_column_comments),
+            (("OBJ_DESCRIPTION(%S::REGCLASS)",), self._pg_table_comment),
+        ]
+
+    def _pg_regclass(self, database, value):
+        schema, _, table = value.partition(".")
+        return self._table(database, schema.strip('"'), table.strip('"'))
+
+    def _pg_databases(self, database, text, params, named):
+        return [(name,) for name in self.databases]
+
+    def _pg_schemas(self, database, text, params, named):
+        return [(name,) for name in self._schemas(database)]
+
+    def _pg_schemas_page(self, database, text, params, named):
+        return self._page(self._schemas(database), params[0], params[1], params[2])
+
+    def _pg_tables_page(self, database, text, params, named):
+        names = [t["table_name"] for t in self._tables(database, params[0])]
+        return self._page(names, params[1], params[2], params[3])
+
+    def _pg_tables(self, database, text, params, named):
+        return [(t["table_name"],) for t in self._tables(database, params[0])]
+
+    def _pg_columns(self, database, text, params, named):
+        table = self._table(database, params[0], params[1])
+        return [
+            (col["name"], col["type"], "YES" if col["nullable"] else "NO", None)
+            for col in (table or {}).get("columns", [])
+        ]
+
+    def _pg_column_comments(self, database, text, params, named):
+        table = self._pg_regclass(database, params[0])
+        if table is None:
+            raise MockQueryError(f'relation {params[0]} does not exist')
+        return [(col["name"], col["comment"] or None) for col in table["columns"]]
+
+    def _pg_table_comment(self, database, text, params, named):
+        table = self._pg_regclass(database, params[0])
+        return [(table["table_comment"] or None,)] if table else []
+
+    def _pg_all_comments(self, database, text, params, named):
+        rows = []
+        for t in self._tables(database, params[0]):
+            if t["table_comment"]:
+                rows.append((t["table_name"], None, t["table_comment"]))
+            rows.extend((t["table_name"], col["name"], col["comment"]) for col in t["columns"] if col["comment"])
+        return rows
+
+    def _pg_all_columns(self, database, text, params, named):
+        return [
+            (t["table_name"], col["name"], col["type"], "YES" if col["nullable"] else "NO")
+            for t in sorted(self._tables(database, params[0]), key=lambda t: t["table_name"])
+            for col in t["columns"]
+        ]
+
+    def _pg_fingerprints(self, database, text, params, named):
+        return [(t["table_name"], len(t["columns"]), _fingerprint(t)) for t in self._tables(database, params[0])]
+
+    # SQL Server
+
+    _OBJECT_ID_RE = re.compile(r"OBJECT_ID\('([^'.]*)\.([^']*)'\)")
+
+    def _sqlserver_routes(self):
+        return [
+            (("SYS.DATABASES",), self._mssql_databases),
+            (("SELECT TOP (?)", "FROM SYS.OBJECTS"), self._mssql_tables_page),
+            (("SELECT TOP (?)", "FROM SYS.SCHEMAS"), self._mssql_schemas_page),
+            (("SYS.SCHEMAS", "CHECKSUM_AGG"), self._mssql_fingerprints),
+            (("SYS.EXTENDED_PROPERTIES", "S.NAME = ?"), self._mssql_all_comments),
+            (("FROM SYS.SCHEMAS",), self._mssql_schemas),
+            (("INFORMATION_SCHEMA.TABLES",), self._mssql_tables),
+            (("INFORMATION_SCHEMA.COLUMNS", "TABLE_NAME = ?"), self._mssql_columns),
+            (("INFORMATION_SCHEMA.COLUMNS",), self._mssql_all_columns),
+            (("FROM SYS.COLUMNS C",), self._mssql_column_comments),
+            (("EP.MINOR_ID = 0",), self._mssql_table_comment),
+        ]
+
+    def _mssql_object(self, database, text):
+        match = self._OBJECT_ID_RE.search(text)
+        return self._table(database, match.group(1), match.group(2)) if match else None
+
+    def _mssql_databases(self, database, text, params, named):
+        return [(name,) for name in self.databases]
+
+    def _mssql_schemas(self, database, text, params, named):
+        return [(name,) for name in self._schemas(database)]
+
+    def _mssql_schemas_page(self, database, text, params, named):
+        return self._page(self._schemas(database), params[1], params[2], params[0])
+
+    def _mssql_tables_page(self, database, text, params, named):
+        names = [t["table_name"] for t in self._tables(database, params[1])]
+        return self._page(names, params[2], params[3], params[0])
+
+    def _mssql_tables(self, database, text, params, named):
+        return [(t["table_name"],) for t in self._tables(database, params[0])]
+
+    def _mssql_columns(self, database, text, params, named):
+        table = self._table(database, params[0], params[1])
+        return [
+            (col["name"], col["type"], "YES" if col["nullable"] else "NO", None)
+            for col in (table or {}).get("columns", [])
+        ]
+
+    def _mssql_column_comments(self, database, text, params, named):
+        table = self._mssql_object(database, text)
+        return [(col["name"], col["comment"] or None) for col in (table or {}).get("columns", [])]
+
+    def _mssql_table_comment(self, database, text, params, named):
+        table = self._mssql_object(database, text)
+        return [(table["table_comment"],)] if table and table["table_comment"] else []
+
+    def _mssql_all_comments(self, database, text, params, named):
+        return self._pg_all_comments(database, text, params, named)
+
+    def _mssql_all_columns(self, database, text, params, named):
+        return self._pg_all_columns(database, text, params, named)
+
+    def _mssql_fingerprints(self, database, text, params, named):
+        return [
+            (t["table_name"], "2024-01-01T00:00:00", len(t["columns"]), _fingerprint(t), t["table_comment"] or None)
+            for t in self._tables(database, params[0])
+        ]
+
+    # Oracle
+
+    def _oracle_routes(self):
+        return [
+            (("V$DATABASE",), self._ora_database),
+            (("ALL_USERS", "FETCH FIRST"), self._ora_users_page),
+            (("FROM ALL_TABLES", "FETCH FIRST"), self._ora_tables_page),
+            (("ALL_USERS",), self._ora_users),
+            (("FROM ALL_TABLES",), self._ora_tables),
+            (("ALL_OBJECTS",), self._ora_fingerprints),
+            (("ALL_TAB_COLUMNS", "COL.TABLE_NAME = :TABLE_NAME"), self._ora_columns),
+            (("ALL_TAB_COLUMNS",), self._ora_all_columns),
+            (("ALL_TAB_COMMENTS", "TABLE_NAME = :TABLE_NAME"), self._ora_table_comment),
+            (("ALL_TAB_COMMENTS",), self._ora_all_comments),
+        ]
+
+    def _ora_owner_table(self, database, named):
+        return self._table(database, named["owner"], named["table_name"])
+
+    def _ora_database(self, database, text, params, named):
+        return [(database,)]
+
+    def _ora_users(self, database, text, params, named):
+        return [(name,) for name in sorted(self._schemas(database))]
+
+    def _ora_users_page(self, database, text, params, named):
+        return self._page(self._schemas(database), named["prefix"], named["after"], named["limit"])
+
+    def _ora_tables_page(self, database, text, params, named):
+        names = [t["table_name"] for t in self._tables(database, named["owner"])]
+        return self._page(names, named["prefix"], named["after"], named["limit"])
+
+    def _ora_tables(self, database, text, params, named):
+        return [(t["table_name"],) for t in sorted(self._tables(database, named["owner"]), key=lambda t: t["table_name"])]
+
+    _ORA_TYPE_RE = re.compile(r"^(\w+)(?:\((\*|\d+)(?:,\s*(\d+))?\))?$")
+
+    def _ora_type(self, col_type):
+        """(data_type, data_precision, data_scale, char_length) as all_tab_columns reports a declared type."""
+        match = self._ORA_TYPE_RE.match(col_type.upper())
+        if match is None:
+            return col_type, None, None, 0
+        base, first, second = match.groups()
+        if base == "NUMBER":
+            if first is None:
+                return base, None, None, 0
+            return base, None if first == "*" else int(first), int(second or 0), 0
+        if base in ("VARCHAR2", "NVARCHAR2", "VARCHAR", "CHAR", "NCHAR"):
+            return base, None, None, int(first or 1)
+        # TIMESTAMP(6), RAW(16), ...: data_type keeps its own parameters
+        return col_type, None, None, 0
+
+    def _ora_columns(self, database, text, params, named):
+        table = self._ora_owner_table(database, named)
+        return [
+            (col["name"], *self._ora_type(col["type"]), "Y" if col["nullable"] else "N", col["comment"] or None)
+            for col in (table or {}).get("columns", [])
+        ]
+
+    def _ora_table_comment(self, database, text, params, named):
+        table = self._ora_owner_table(database, named)
+        return [(table["table_comment"] or None,)] if table else []
+
+    def _ora_all_comments(self, database, text, params, named):
+        return [(t["table_name"], t["table_comment"] or None) for t in self._tables(database, named["owner"])]
+
+    def _ora_all_columns(self, database, text, params, named):
+        return [
+            (t["table_name"], col["name"], *self._ora_type(col["type"]), "Y" if col["nullable"] else "N",
+             col["comment"] or None)
+            for t in sorted(self._tables(database, named["owner"]), key=lambda t: t["table_name"])
+            for col in t["columns"]
+        ]
+
+    def _ora_fingerprints(self, database, text, params, named):
+        return [
+            (t["table_name"], _fingerprint(t)[:19], len(t["columns"]))
+            for t in self._tables(database, named["owner"])
+        ]
+
+
+def _connect_function(catalog):
+    def connect(host, port, user, password, database=None):
+        return catalog.connect(host=host, port=port, user=user, password=password, database=database)
+    return connect
+
+
+def _reset_source(catalog):
+    details = catalog.conn_details
+    pool.close_pools(catalog.engine, details["host"], details["port"], details["user"])
+    metadata_cache.invalidate(catalog.engine, details["host"], details["port"], details["user"])
+
+
+@contextmanager
+def mock_sources(*catalogs, connect_latency=None, query_latency=None, row_latency=None):
+    """
+    Routes the connectors of the catalogs' engines to the catalogs for the
+    duration of the block. Latency arguments, when given, override the catalogs'.
+    Pools and cached metadata for the mock hosts are dropped on entry and exit.
+    """
+    saved = {}
+    try:
+        for catalog in catalogs:
+            if connect_latency is not None:
+                catalog.connect_latency = connect_latency
+            if query_latency is not None:
+                catalog.query_latency = query_latency
+            if row_latency is not None:
+                catalog.row_latency = row_latency
+            importlib.import_module(_CONNECTOR_MODULES[catalog.engine])
+            saved.setdefault(catalog.engine, pool._ADAPTERS.get(catalog.engine))
+            pool.register_adapter(
+                catalog.engine, _connect_function(catalog), _PING_QUERIES.get(catalog.engine, "SELECT 1")
+            )
+            _reset_source(catalog)
+        yield catalogs[0] if len(catalogs) == 1 else catalogs
+    finally:
+        for catalog in catalogs:
+            _reset_source(catalog)
+        for engine, adapter in saved.items():
+            if adapter is not None:
+                pool._ADAPTERS[engine] = adapter
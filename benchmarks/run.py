@@ -0,0 +1,223 @@
+# benchmarks/run.py
+"""
+Benchmarks for the DDL parser, the type mapper, the BigQuery renderer and
+the JSON wire format.
+
+    python -m benchmarks.run                      # run everything and print a table
+    python -m benchmarks.run --quick --filter parse
+    python -m benchmarks.run --save-baseline      # write benchmarks/baseline.json
+    python -m benchmarks.run --compare            # fail if slower than the baseline
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import DIALECT_TYPES, make_create_table, make_dump, make_schema
+from src.ddl_parser import extract_json_schema_from_ddl
+from src.ddl_stream import iter_ddl_schemas
+from src.mapping import map_type_to_bigquery, map_types
+from src.renderer import generate_bq_ddl
+from src.serialization import compress, dumps_bytes, loads
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+COLUMN_COUNTS = (10, 100, 500, 2000, 10000)
+QUICK_COLUMN_COUNTS = (10, 500)
+# A case counts as a regression when it is this much slower than the baseline
+DEFAULT_THRESHOLD = 1.25
+
+
+def _parse_case(ddl):
+    return lambda: extract_json_schema_from_ddl(ddl)
+
+
+def _map_cold_case(types, dialect):
+    def run():
+        map_type_to_bigquery.cache_clear()
+        for src_type in types:
+            map_type_to_bigquery(src_type, dialect)
+    return run
+
+
+def _map_warm_case(types, dialect):
+    map_types(types, dialect)
+    return lambda: map_types(types, dialect)
+
+
+def _render_case(schema, dialect):
+    return lambda: generate_bq_ddl(
+        schema["table_name"], schema["columns"], "bench_dataset", schema["table_comment"], dialect
+    )
+
+
+def _dump_case(dump, tables):
+    found = sum(1 for _ in iter_ddl_schemas(io.StringIO(dump)))
+    if found != tables:
+        raise RuntimeError(f"dump benchmark parsed {found} of {tables} tables")
+    return lambda: sum(1 for _ in iter_ddl_schemas(io.StringIO(dump)))
+
+
+def _json_cases(schema, count):
+    """Schema JSON as it travels to and from the browser: encode, decode and gzip."""
+    encoded = dumps_bytes(schema)
+    text = json.dumps(schema)
+    return [
+        (f"json_dumps/{count}", count, lambda: dumps_bytes(schema)),
+        (f"json_dumps_stdlib/{count}", count, lambda: json.dumps(schema)),
+        (f"json_loads/{count}", count, lambda: loads(encoded)),
+        (f"json_loads_stdlib/{count}", count, lambda: json.loads(text)),
+        (f"gzip/{count}", count, lambda: compress(encoded, "gzip")),
+    ]
+
+
+def build_cases(quick=False):
+    """Returns [(name, columns processed per run, callable)]."""
+    counts = QUICK_COLUMN_COUNTS if quick else COLUMN_COUNTS
+    dialects = ("mysql", "postgresql") if quick else tuple(DIALECT_TYPES)
+    cases = []
+    for dialect in dialects:
+        for count in counts:
+            schema = make_schema("bench_table", count, dialect, comment_length=40)
+            types = [col["type"] for col in schema["columns"]]
+            # The paste path only reads the CREATE TABLE statement itself
+            ddl = make_create_table(schema, dialect).split(";\n", 1)[0] + ";"
+            cases.append((f"parse/{dialect}/{count}", count, _parse_case(ddl)))
+            cases.append((f"map_cold/{dialect}/{count}", count, _map_cold_case(types, dialect)))
+            cases.append((f"map_warm/{dialect}/{count}", count, _map_warm_case(types, dialect)))
+            cases.append((f"render/{dialect}/{count}", count, _render_case(schema, dialect)))
+    for comment_length in ((0, 200) if quick else (0, 40, 200, 1000)):
+        schema = make_schema("bench_table", 500, "mysql", comment_length=comment_length)
+        ddl = make_create_table(schema, "mysql").split(";\n", 1)[0] + ";"
+        cases.append((f"parse_comments/mysql/500/c{comment_length}", 500, _parse_case(ddl)))
+        cases.append((f"render_comments/mysql/500/c{comment_length}", 500, _render_case(schema, "mysql")))
+    for count in counts:
+        cases.extend(_json_cases(make_schema("bench_table", count, "mysql", comment_length=40), count))
+    for dialect in dialects:
+        tables, per_table = (20, 50) if quick else (200, 50)
+        dump = make_dump(tables, per_table, dialect)
+        cases.append((f"dump/{dialect}/{tables}x{per_table}", tables * per_table, _dump_case(dump, tables)))
+    return cases
+
+
+def _time_case(func, min_time, max_repeats):
+    """Best time per call over repeated runs lasting at least min_time overall."""
+    func()
+    best = float("inf")
+    spent = 0.0
+    repeats = 0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while repeats < max_repeats and (spent < min_time or repeats < 3):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = min(best, elapsed)
+            spent += elapsed
+            repeats += 1
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best, repeats
+
+
+def _peak_memory(func):
+    """Peak traced allocation of one call, in KiB. Run apart from timing since tracing slows it down."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_benchmarks(cases, min_time=0.2, max_repeats=200, out=sys.stdout):
+    results = {}
+    for name, columns, func in cases:
+        seconds, repeats = _time_case(func, min_time, max_repeats)
+        peak_kib = _peak_memory(func)
+        results[name] = {
+            "seconds": seconds,
+            "columns_per_second": columns / seconds if seconds else None,
+            "peak_kib": round(peak_kib, 1),
+            "repeats": repeats
+        }
+        print(f"{name:<40} {seconds * 1000:>10.3f} ms {columns / seconds:>14,.0f} col/s "
+              f"{peak_kib:>10.1f} KiB", file=out)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, out=sys.stdout):
+    """Prints the ratio to the baseline for each case; returns the names slower than threshold."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        mem_ratio = result["peak_kib"] / base["peak_kib"] if base["peak_kib"] else 1.0
+        flag = ""
+        if ratio > threshold or mem_ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} time x{ratio:.2f}  memory x{mem_ratio:.2f}{flag}", file=out)
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DDL parser, type mapper and renderer.")
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes and dialects")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to spend on each case (default 0.2)")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help="Store the results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help="Compare against a baseline and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown ratio counted as a regression (default {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.quick)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case[0]]
+    results = run_benchmarks(cases, min_time=args.min_time)
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        print()
+        regressions = compare(results, load_baseline(args.compare), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than x{args.threshold}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# benchmarks/startup.py
+"""
+Cold-start benchmark: how long importing the app takes in a fresh interpreter.
+
+    python -m benchmarks.startup                     # import app, 5 runs
+    python -m benchmarks.startup --module asgi --budget 0.8
+    python -m benchmarks.startup --top 15            # slowest imports
+
+Each run is a new process with `python -X importtime -c "import <module>"`.
+The best wall time is compared with --budget (seconds), and the run fails if
+any database driver or gpt4all was imported: those load on first use.
+Exits 1 when over budget or when a lazy module was imported eagerly.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from src.drivers import DRIVER_PACKAGES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = 0.5
+_CHECK = (
+    "import sys; import {module}; "
+    "print(','.join(m for m in {lazy!r} if m in sys.modules))"
+)
+
+
+def measure(module="app", runs=5):
+    """
+    Returns {"best", "median", "eager", "imports"}: wall seconds, lazy modules
+    found loaded, and [(cumulative seconds, module)] from -X importtime of the best run.
+    """
+    timings = []
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _CHECK.format(module=module, lazy=tuple(DRIVER_PACKAGES))],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        seconds = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        timings.append(seconds)
+        if best is None or seconds < best[0]:
+            best = (seconds, proc)
+    seconds, proc = best
+    imports = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3:
+            imports.append((int(parts[1]) / 1e6, parts[2].rstrip()))
+    eager = [name for name in proc.stdout.strip().split(",") if name]
+    timings.sort()
+    return {"best": seconds, "median": timings[len(timings) // 2], "eager": eager, "imports": imports}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the app's import (cold start) time.")
+    parser.add_argument("--module", default="app", help="Module to import (default app)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help=f"Seconds the best run may take (default {DEFAULT_BUDGET})")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    result = measure(args.module, args.runs)
+    print(f"import {args.module}: best {result['best'] * 1000:.0f} ms, median {result['median'] * 1000:.0f} ms "
+          f"over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    # Entries indented one level are the imports of the module itself (-X importtime nests by two spaces)
+    direct = sorted(
+        (entry for entry in result["imports"] if entry[1].startswith("  ") and not entry[1].startswith("    ")),
+        reverse=True
+    )
+    for seconds, name in direct[:args.top]:
+        print(f"  {seconds * 1000:>8.1f} ms  {name.strip()}")
+
+    failed = False
+    if result["eager"]:
+        print(f"Imported at startup but should load on first use: {', '.join(result['eager'])}")
+        failed = True
+    if result["best"] > args.budget:
+        print(f"Over budget by {(result['best'] - args.budget) * 1000:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
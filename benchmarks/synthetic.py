@@ -0,0 +1,137 @@
+# benchmarks/synthetic.py
+"""Synthetic schemas and source DDL for the benchmarks."""
+
+import random
+
+# Source types with rough real-world weights per dialect
+DIALECT_TYPES = {
+    "mysql": [
+        ("int", 20), ("bigint", 10), ("varchar(255)", 25), ("text", 5), ("decimal(18,2)", 8),
+        ("datetime", 10), ("date", 5), ("tinyint(1)", 5), ("json", 2), ("double", 5),
+        ("int unsigned", 3), ("enum('a','b')", 2),
+    ],
+    "postgresql": [
+        ("integer", 20), ("bigint", 10), ("character varying(255)", 20), ("text", 10), ("numeric(38,10)", 8),
+        ("timestamp with time zone", 10), ("date", 5), ("boolean", 5), ("jsonb", 3), ("uuid", 4),
+        ("integer[]", 2), ("double precision", 3),
+    ],
+    "sqlserver": [
+        ("int", 20), ("bigint", 10), ("nvarchar(255)", 25), ("nvarchar(max)", 5), ("decimal(18,4)", 8),
+        ("datetime2(7)", 10), ("date", 5), ("bit", 5), ("uniqueidentifier", 4), ("float", 5),
+        ("money", 3),
+    ],
+    "oracle": [
+        ("NUMBER(10)", 20), ("NUMBER(19)", 10), ("VARCHAR2(255)", 25), ("CLOB", 5), ("NUMBER(18,2)", 8),
+        ("TIMESTAMP(6)", 10), ("DATE", 10), ("NUMBER(1)", 5), ("RAW(16)", 3), ("BINARY_DOUBLE", 4),
+    ],
+}
+
+_WORDS = ("customer", "order", "amount", "created", "updated", "status", "code", "name", "total",
+          "region", "account", "product", "price", "quantity", "flag", "source", "batch", "ref")
+
+
+def make_comment(rng, length):
+    if length <= 0:
+        return ""
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)[:length]
+
+
+def make_columns(count, dialect="mysql", comment_length=40, seed=0):
+    """Returns count column dicts with dialect-typical types and comments of about comment_length chars."""
+    rng = random.Random(seed)
+    types, weights = zip(*DIALECT_TYPES[dialect])
+    chosen = rng.choices(types, weights=weights, k=count)
+    columns = []
+    for idx, col_type in enumerate(chosen):
+        columns.append({
+            "name": f"{rng.choice(_WORDS)}_{idx}",
+            "type": col_type,
+            "nullable": rng.random() < 0.7,
+            "comment": make_comment(rng, comment_length)
+        })
+    return columns
+
+
+def make_schema(table_name, column_count, dialect="mysql", comment_length=40, seed=0):
+    return {
+        "table_name": table_name,
+        "columns": make_columns(column_count, dialect, comment_length, seed),
+        "db": "benchdb",
+        "schema": "bench",
+        "table_comment": make_comment(random.Random(seed + 1), comment_length)
+    }
+
+
+def _quote(dialect, name):
+    if dialect == "mysql":
+        return f"`{name}`"
+    if dialect == "sqlserver":
+        return f"[{name}]"
+    return f'"{name}"'
+
+
+def _escape(text):
+    return text.replace("'", "''")
+
+
+def _pg_dump_header(name, object_type, schema):
+    return f"--\n-- Name: {name}; Type: {object_type}; Schema: {schema}; Owner: -\n--\n\n"
+
+
+def make_create_table(schema, dialect="mysql", headers=False):
+    """
+    Renders a schema dict as a source CREATE TABLE statement in the dialect's
+    own style. PostgreSQL and Oracle comments follow as COMMENT ON statements,
+    SQL Server comments as sp_addextendedproperty calls. With headers, each
+    PostgreSQL statement gets the "-- Name: ...; Type: ..." block pg_dump writes.
+    """
+    pg_headers = headers and dialect == "postgresql"
+    table = schema["table_name"]
+    qualified = f"{_quote(dialect, schema['schema'])}.{_quote(dialect, table)}"
+    lines = []
+    after = []
+    for col in schema["columns"]:
+        line = f"    {_quote(dialect, col['name'])} {col['type']}"
+        if not col["nullable"]:
+            line += " NOT NULL"
+        if col["comment"]:
+            if dialect == "mysql":
+                line += f" COMMENT '{_escape(col['comment'])}'"
+            elif dialect == "sqlserver":
+                after.append(
+                    f"EXEC sp_addextendedproperty @name=N'MS_Description', @value=N'{_escape(col['comment'])}', "
+                    f"@level0type=N'SCHEMA', @level0name=N'{schema['schema']}', @level1type=N'TABLE', "
+                    f"@level1name=N'{table}', @level2type=N'COLUMN', @level2name=N'{col['name']}';"
+                )
+            else:
+                after.append(
+                    (_pg_dump_header(f"COLUMN {table}.{col['name']}", "COMMENT", schema["schema"]) if pg_headers else "") +
+                    f"COMMENT ON COLUMN {qualified}.{_quote(dialect, col['name'])} IS '{_escape(col['comment'])}';"
+                )
+        lines.append(line)
+    body = ",\n".join(lines)
+    statement = f"CREATE TABLE {qualified} (\n{body}\n)"
+    if dialect == "mysql" and schema.get("table_comment"):
+        statement += f" COMMENT='{_escape(schema['table_comment'])}'"
+    statement += ";"
+    if pg_headers:
+        statement = _pg_dump_header(table, "TABLE", schema["schema"]) + statement
+    if dialect in ("postgresql", "oracle") and schema.get("table_comment"):
+        header = _pg_dump_header(f"TABLE {table}", "COMMENT", schema["schema"]) if pg_headers else ""
+        after.insert(0, f"{header}COMMENT ON TABLE {qualified} IS '{_escape(schema['table_comment'])}';")
+    return "\n".join([statement] + after)
+
+
+def make_dump(table_count, columns_per_table, dialect="mysql", comment_length=40, seed=0):
+    """
+    A multi-table schema dump, as one string. PostgreSQL dumps look like
+    pg_dump --schema-only output, with a comment block before each statement.
+    """
+    return "\n\n".join(
+        make_create_table(make_schema(f"table_{idx}", columns_per_table, dialect, comment_length, seed + idx), dialect,
+                          headers=True)
+        for idx in range(table_count)
+    ) + "\n"
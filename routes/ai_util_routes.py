@@ -1,6 +1,11 @@
 import os
-from flask import Blueprint, request, jsonify
-from src.ai_utils import add_comments_to_json_schema
+from flask import Blueprint, Response, request, jsonify
+from src.ai_utils import add_comments_to_json_schema, batch_size, iter_ddl_comment_tokens
+from src.ai_jobs import submit_comment_job, get_job, cancel_job, iter_job_events
+from src.comment_cache import comment_cache
+from src.drivers import DriverNotInstalledError
+from src.serialization import dumps, schema_value
+from src.model_manager import model_manager
 
 ai_util_bp = Blueprint('ai_util_bp', __name__)
 
@@ -13,10 +18,125 @@ def list_models():
         models = []
     return jsonify(models)
 
+@ai_util_bp.route('/ai_comment_ddl_stream', methods=['POST'])
+def ai_comment_ddl_stream():
+    """
+    Streams the AI-commented version of a DDL as Server-Sent Events: one
+    "data" event per generated token, then a "done" (or "error") event.
+    """
+    data = request.get_json()
+    ddl = data.get('ddl', '')
+    model_name = data.get('model', '')
+    if not ddl or not model_name:
+        return jsonify({"error": "ddl and model are required"}), 400
+
+    def events():
+        tokens = iter_ddl_comment_tokens(ddl, model_name)
+        try:
+            for token in tokens:
+                yield f"data: {dumps({'token': token})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            print(f"Error in ai_comment_ddl_stream: {e}")
+            yield f"event: error\ndata: {dumps({'error': str(e)})}\n\n"
+        finally:
+            # Releases the model if the client went away mid-stream
+            tokens.close()
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@ai_util_bp.route('/loaded_models')
+def loaded_models():
+    """Models currently resident in this process, with load/hit/eviction counts."""
+    return jsonify(model_manager.stats())
+
+@ai_util_bp.route('/unload_models', methods=['POST'])
+def unload_models():
+    data = request.get_json(silent=True) or {}
+    model_manager.unload(data.get('model') or None)
+    return jsonify(model_manager.stats())
+
 @ai_util_bp.route('/ai_add_comment', methods=['POST'])
 def ai_add_comment():
     data = request.get_json()
     json_schema = data.get('json_schema', '')
     model_name = data.get('model', '')
-    updated_schema = add_comments_to_json_schema(json_schema, model_name)
-    return jsonify({"schema": updated_schema})
\ No newline at end of file
+    try:
+        size = batch_size(data.get('batch_size'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        updated_schema = add_comments_to_json_schema(
+            json_schema,
+            model_name,
+            size,
+            use_cache=data.get('use_cache', True) is not False,
+            dialect=data.get('db_system') or None
+        )
+    except DriverNotInstalledError as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({"schema": updated_schema})
+
+@ai_util_bp.route('/comment_cache_stats')
+def comment_cache_stats():
+    return jsonify(comment_cache.stats())
+
+@ai_util_bp.route('/clear_comment_cache', methods=['POST'])
+def clear_comment_cache():
+    comment_cache.clear()
+    return jsonify(comment_cache.stats())
+
+@ai_util_bp.route('/ai_jobs', methods=['POST'])
+def submit_ai_job():
+    """
+    Starts AI commenting in the background and returns its job id at once.
+    Takes the same body as /ai_add_comment.
+    """
+    data = request.get_json()
+    try:
+        schema_obj = schema_value(data.get('json_schema'), "json_schema")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid JSON schema: {e}"}), 400
+    try:
+        size = batch_size(data.get('batch_size'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = submit_comment_job(
+        schema_obj,
+        data.get('model', ''),
+        size,
+        use_cache=data.get('use_cache', True) is not False,
+        dialect=data.get('db_system') or None
+    )
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+@ai_util_bp.route('/ai_jobs/<job_id>')
+def ai_job_status(job_id):
+    """Progress of a job; comments of finished columns while it runs, the full schema once done."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict(include_schema=job.finished is not None))
+
+@ai_util_bp.route('/ai_jobs/<job_id>/events')
+def ai_job_events(job_id):
+    """Server-Sent Events stream of a job's progress."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return Response(
+        iter_job_events(job),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@ai_util_bp.route('/ai_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_ai_job(job_id):
+    job = cancel_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict(include_schema=False))
@@ -0,0 +1,150 @@
+import shutil
+import tempfile
+from flask import Blueprint, Response, request, session, jsonify, send_file, stream_with_context
+from src.executor import worker_count
+from src.source_sessions import get_source
+from src.ddl_stream import iter_ddl_schemas
+from src.batch import DB_SYSTEMS, extract_source_schemas, iter_combined_sql, write_zip
+from src.snapshot import open_snapshot
+from src.fingerprints import diff_fingerprints, get_table_fingerprints
+
+batch_bp = Blueprint('batch_bp', __name__)
+
+# Zip archives are built in memory up to this size, then spill to a temp file
+ZIP_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+def _iter_and_close(items, fp):
+    try:
+        yield from items
+    finally:
+        fp.close()
+
+def _batch_response(schemas, output_format, bq_project_id, bq_dataset_id, dialect, errors=None):
+    """
+    A combined .sql file is streamed to the client table by table; a zip is
+    assembled in a spooled temp file first because the format needs seeking.
+    """
+    if output_format == "zip":
+        archive = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+        write_zip(archive, schemas, bq_project_id, bq_dataset_id, dialect, errors)
+        archive.seek(0)
+        return send_file(archive, mimetype="application/zip", as_attachment=True, download_name="bigquery_ddl.zip")
+    chunks = iter_combined_sql(schemas, bq_project_id, bq_dataset_id, dialect, errors)
+    return Response(
+        stream_with_context(chunk.encode("utf-8") for chunk in chunks),
+        mimetype="text/sql",
+        headers={"Content-Disposition": "attachment; filename=bigquery_ddl.sql"}
+    )
+
+@batch_bp.route('/generate_batch_ddl', methods=['POST'])
+def generate_batch_ddl_route():
+    """
+    Generates BigQuery DDL for many tables at once.
+    Either pass "schemas" (a list of schema dicts), a "snapshot_id" of an
+    imported snapshot, or a "db_system" plus "database"/"schema" filters to
+    extract from the connected source. "tables" takes bare table names or
+    "<schema>.<table>" keys as returned by /detect_changes.
+    "output" selects one combined .sql file (default) or a .zip of per-table files.
+    Tables that fail to extract are reported inside the output instead of failing the batch.
+    """
+    data = request.get_json() or {}
+    output_format = data.get('output', 'sql')
+    schemas = data.get('schemas')
+    dialect = data.get('db_system') or None
+    errors = []
+    if schemas is not None and not (isinstance(schemas, list) and all(isinstance(s, dict) for s in schemas)):
+        return jsonify({"error": "schemas must be a list of schema objects"}), 400
+    if schemas is None and data.get('snapshot_id'):
+        try:
+            snap = open_snapshot(data['snapshot_id'])
+        except (ValueError, FileNotFoundError) as e:
+            return jsonify({"error": str(e)}), 404
+        schemas = snap.iter_schemas(data.get('tables'))
+        dialect = dialect or snap.source.get('db_system')
+    elif schemas is None:
+        db_system = data.get('db_system', '')
+        if db_system not in DB_SYSTEMS:
+            return jsonify({"error": f"Unsupported source system: {db_system}"}), 400
+        conn_details = get_source(session, db_system, data.get('source'))
+        if not conn_details:
+            return jsonify({"error": f"Not connected to {db_system}"}), 400
+        try:
+            workers = worker_count(data.get('workers'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            extracted = extract_source_schemas(
+                db_system,
+                conn_details,
+                data.get('database'),
+                data.get('schema'),
+                data.get('tables'),
+                max_workers=workers
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            print(f"Error in generate_batch_ddl: {e}")
+            return jsonify({"error": f"Failed to extract schemas: {e}"}), 500
+        schemas = extracted["schemas"]
+        errors = extracted["errors"]
+
+    return _batch_response(
+        schemas, output_format, data.get('bq_project_id'), data.get('bq_dataset_id'), dialect, errors
+    )
+
+@batch_bp.route('/generate_batch_ddl_from_dump', methods=['POST'])
+def generate_batch_ddl_from_dump_route():
+    """
+    Generates BigQuery DDL for every CREATE TABLE in an uploaded schema dump.
+    The upload ("dump" file field) is read incrementally rather than loaded whole.
+    """
+    upload = request.files.get('dump')
+    if upload is None:
+        return jsonify({"error": "No dump file uploaded"}), 400
+    # The request closes its uploads once the view returns, before a streamed
+    # response is consumed, so the dump is copied to a temp file the response owns
+    dump = tempfile.TemporaryFile()
+    shutil.copyfileobj(upload.stream, dump)
+    dump.seek(0)
+    schemas = _iter_and_close(iter_ddl_schemas(dump), dump)
+    return _batch_response(
+        schemas,
+        request.form.get('output', 'sql'),
+        request.form.get('bq_project_id'),
+        request.form.get('bq_dataset_id'),
+        request.form.get('db_system') or None
+    )
+
+@batch_bp.route('/detect_changes', methods=['POST'])
+def detect_changes_route():
+    """
+    Cheap change detection for the connected source: returns the current
+    per-table catalog fingerprints and, when "fingerprints" from an earlier
+    call are passed, which tables changed, were added or were removed.
+    Fingerprint keys are "<schema>.<table>" ("<database>.<table>" for MySQL);
+    pass the changed and added keys on to /generate_batch_ddl as "tables".
+    """
+    data = request.get_json() or {}
+    db_system = data.get('db_system', '')
+    if db_system not in DB_SYSTEMS:
+        return jsonify({"error": f"Unsupported source system: {db_system}"}), 400
+    conn_details = get_source(session, db_system, data.get('source'))
+    if not conn_details:
+        return jsonify({"error": f"Not connected to {db_system}"}), 400
+    try:
+        workers = worker_count(data.get('workers'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        current = get_table_fingerprints(
+            db_system,
+            conn_details,
+            data.get('database'),
+            data.get('schema'),
+            max_workers=workers
+        )
+    except Exception as e:
+        print(f"Error in detect_changes: {e}")
+        return jsonify({"error": f"Failed to read catalog fingerprints: {e}"}), 500
+    return jsonify({"fingerprints": current, "changes": diff_fingerprints(current, data.get('fingerprints'))})
@@ -0,0 +1,64 @@
+from flask import Blueprint, request, session, jsonify
+from src.catalog import list_schemas_page, list_tables_page
+from src.source_sessions import DB_SYSTEMS, get_source
+
+catalog_bp = Blueprint('catalog_bp', __name__)
+
+def _source_args():
+    db_system = request.args.get('db_system', '')
+    if db_system not in DB_SYSTEMS:
+        return None, (jsonify({"error": f"Unsupported source system: {db_system}"}), 400)
+    conn_details = get_source(session, db_system, request.args.get('source'))
+    if not conn_details:
+        return None, (jsonify({"error": f"Not connected to {db_system}"}), 400)
+    return (db_system, conn_details), None
+
+@catalog_bp.route('/catalog/schemas', methods=['GET'])
+def catalog_schemas():
+    """
+    One page of schema names: ?db_system=&database=&prefix=&cursor=&limit=
+    Returns {"items": [...], "next_cursor": ...}; next_cursor is null on the last page.
+    """
+    source, error = _source_args()
+    if error:
+        return error
+    db_system, conn_details = source
+    try:
+        page = list_schemas_page(
+            db_system,
+            conn_details,
+            request.args.get('database', ''),
+            request.args.get('prefix', ''),
+            request.args.get('cursor') or None,
+            request.args.get('limit')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to list schemas: {e}"}), 500
+    return jsonify(page)
+
+@catalog_bp.route('/catalog/tables', methods=['GET'])
+def catalog_tables():
+    """One page of table names: ?db_system=&database=&schema=&prefix=&cursor=&limit="""
+    source, error = _source_args()
+    if error:
+        return error
+    db_system, conn_details = source
+    if db_system != 'mysql' and not request.args.get('schema'):
+        return jsonify({"error": "schema is required"}), 400
+    try:
+        page = list_tables_page(
+            db_system,
+            conn_details,
+            request.args.get('database', ''),
+            request.args.get('schema', ''),
+            request.args.get('prefix', ''),
+            request.args.get('cursor') or None,
+            request.args.get('limit')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to list tables: {e}"}), 500
+    return jsonify(page)
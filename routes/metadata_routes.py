@@ -0,0 +1,40 @@
+from flask import Blueprint, request, session, jsonify
+from src.metadata_cache import metadata_cache
+from src.source_sessions import attached_sources
+
+metadata_bp = Blueprint('metadata_bp', __name__)
+
+DB_SYSTEMS = ("mysql", "postgresql", "sqlserver", "oracle")
+
+@metadata_bp.route('/refresh_metadata', methods=['POST'])
+def refresh_metadata():
+    """
+    Invalidates cached catalog metadata for the connected source.
+    Narrow the subtree with database (Oracle: service name), schema and table;
+    without db_system (or source) every attached source is refreshed.
+    """
+    data = request.get_json(silent=True) or {}
+    db_system = data.get('db_system') or None
+    if db_system is not None and db_system not in DB_SYSTEMS:
+        return jsonify({"error": f"Unsupported source system: {db_system}"}), 400
+    removed = 0
+    for source in attached_sources(session):
+        if db_system and source["engine"] != db_system:
+            continue
+        if data.get('source') and source["id"] != data['source']:
+            continue
+        conn_details = source["conn"]
+        removed += metadata_cache.invalidate(
+            source["engine"],
+            conn_details.get('host'),
+            conn_details.get('port'),
+            conn_details.get('user'),
+            data.get('database') or None,
+            data.get('schema') or None,
+            data.get('table') or None
+        )
+    return jsonify({"removed": removed, "stats": metadata_cache.stats()})
+
+@metadata_bp.route('/metadata_cache_stats')
+def metadata_cache_stats():
+    return jsonify(metadata_cache.stats())
@@ -0,0 +1,54 @@
+import time
+from flask import Blueprint, Response, g, request
+from src.instrumentation import PROFILING_ENABLED, RequestProfiler, end_trace, metrics, start_trace
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+
+def _endpoint():
+    # The route pattern, not the path, so ids do not create new series
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _profiling_requested():
+    return PROFILING_ENABLED and (request.args.get('profile') or request.headers.get('X-Profile'))
+
+
+@metrics_bp.before_app_request
+def start_request_trace():
+    g.request_start = time.perf_counter()
+    start_trace()
+    if _profiling_requested():
+        g.profiler = RequestProfiler(f"{request.method}_{request.path}")
+        g.profiler.start()
+
+
+@metrics_bp.after_app_request
+def finish_request_trace(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-File'] = profiler.stop()
+    trace = end_trace()
+    if trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+    endpoint = _endpoint()
+    metrics.inc("bq_ddl_requests_total", endpoint=endpoint, method=request.method, status=response.status_code)
+    if 'request_start' in g:
+        # Streamed responses are only timed up to the first byte
+        metrics.observe("bq_ddl_request_seconds", time.perf_counter() - g.request_start, endpoint=endpoint)
+    return response
+
+
+@metrics_bp.teardown_app_request
+def discard_request_trace(exc):
+    # after_request does not run when the view raised
+    end_trace()
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        print(f"Profile of failed request written to {profiler.stop()}")
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of request, phase and cache metrics."""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
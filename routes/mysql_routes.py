@@ -1,4 +1,5 @@
 from flask import Blueprint, request, session, flash, redirect, url_for, jsonify
+from src.source_sessions import attach_source, get_source
 from src.mysql_conn import test_mysql_connection, get_mysql_tables, get_mysql_table_schema
 
 mysql_bp = Blueprint('mysql_bp', __name__)
@@ -12,15 +13,19 @@ def connect_mysql():
     try:
         dbs = test_mysql_connection(host, port, username, password)
         flash("MySQL connection successful!", "success")
-        session['mysql_connected'] = True
-        session['mysql_dbs'] = dbs
-        session['mysql_conn'] = {
-            'host': host,
-            'port': port,
-            'user': username,
-            'password': password
-        }
-        return redirect(url_for('home', db_system='mysql', host=host, port=port, username=username, active_tab='browse'))
+        attach_source(
+            session,
+            'mysql',
+            {
+                'host': host,
+                'port': port,
+                'user': username,
+                'password': password
+            },
+            dbs,
+            request.form.get('source_name') or None
+        )
+        return redirect(url_for('home', db_system='mysql', host=host, port=port, username=username, active_tab='browse', source=request.form.get('source_name') or None))
     except Exception as e:
         flash(f"MySQL connection failed: {e}", "danger")
         return redirect(url_for('home', db_system='mysql', host=host, port=port, username=username, active_tab='manual'))
@@ -28,7 +33,7 @@ def connect_mysql():
 @mysql_bp.route('/get_mysql_tables', methods=['GET'])
 def get_mysql_tables_route():
     database = request.args.get('database', '')
-    conn_details = session.get('mysql_conn')
+    conn_details = get_source(session, 'mysql', request.args.get('source'))
     tables = []
     if conn_details and database:
         try:
@@ -47,7 +52,7 @@ def get_mysql_tables_route():
 def get_mysql_schema_route():
     database = request.args.get('database', '')
     table = request.args.get('table', '')
-    conn_details = session.get('mysql_conn')
+    conn_details = get_source(session, 'mysql', request.args.get('source'))
     schema = {}
     if conn_details and database and table:
         try:
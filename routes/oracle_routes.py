@@ -1,4 +1,5 @@
 from flask import Blueprint, request, session, flash, redirect, url_for, jsonify
+from src.source_sessions import attach_source, get_source
 from src.oracle_conn import (
     test_oracle_connection,
     get_oracle_schemas,
@@ -19,15 +20,19 @@ def connect_oracle():
     try:
         dbs = test_oracle_connection(host, port, username, password, service_name)
         flash("Oracle connection successful!", "success")
-        session['oracle_connected'] = True
-        session['oracle_dbs'] = dbs
-        session['oracle_conn'] = {
-            'host': host,
-            'port': port,
-            'service_name': service_name,
-            'user': username,
-            'password': password
-        }
+        attach_source(
+            session,
+            'oracle',
+            {
+                'host': host,
+                'port': port,
+                'service_name': service_name,
+                'user': username,
+                'password': password
+            },
+            dbs,
+            request.form.get('source_name') or None
+        )
         connection_success = True
     except Exception as e:
         flash(f"Oracle connection failed: {e}", "danger")
@@ -40,7 +45,8 @@ def connect_oracle():
             username=username,
             database=service_name,
             service_name=service_name,
-            active_tab='browse'
+            active_tab='browse',
+            source=request.form.get('source_name') or None
         ))
     else:
         return redirect(url_for(
@@ -55,7 +61,7 @@ def connect_oracle():
 
 @oracle_bp.route('/get_oracle_schemas')
 def get_oracle_schemas_route():
-    conn_info = session.get('oracle_conn', {})
+    conn_info = get_source(session, 'oracle', request.args.get('source')) or {}
     schemas = []
     try:
         schemas = get_oracle_schemas(
@@ -73,7 +79,7 @@ def get_oracle_schemas_route():
 @oracle_bp.route('/get_oracle_tables')
 def get_oracle_tables_route():
     owner = request.args.get('schema', '')
-    conn_info = session.get('oracle_conn', {})
+    conn_info = get_source(session, 'oracle', request.args.get('source')) or {}
     tables = []
     try:
         tables = get_oracle_tables(
@@ -93,7 +99,7 @@ def get_oracle_tables_route():
 def get_oracle_table_schema_route():
     owner = request.args.get('schema', '')
     table = request.args.get('table', '')
-    conn_info = session.get('oracle_conn', {})
+    conn_info = get_source(session, 'oracle', request.args.get('source')) or {}
     schema_json = {}
     try:
         schema_json = get_oracle_table_schema(
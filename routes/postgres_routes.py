@@ -1,4 +1,5 @@
 from flask import Blueprint, request, session, flash, redirect, url_for, jsonify
+from src.source_sessions import attach_source, get_source
 from src.postgres_conn import (
     test_postgres_connection,
     get_postgres_schemas,
@@ -18,15 +19,19 @@ def connect_postgres():
     try:
         dbs = test_postgres_connection(host, port, username, password)
         flash("PostgreSQL connection successful!", "success")
-        session['postgresql_connected'] = True
-        session['postgresql_dbs'] = dbs
-        session['postgresql_conn'] = {
-            'host': host,
-            'port': port,
-            'user': username,
-            'password': password
-        }
-        return redirect(url_for('home', db_system='postgresql', host=host, port=port, username=username, database=database, active_tab='browse'))
+        attach_source(
+            session,
+            'postgresql',
+            {
+                'host': host,
+                'port': port,
+                'user': username,
+                'password': password
+            },
+            dbs,
+            request.form.get('source_name') or None
+        )
+        return redirect(url_for('home', db_system='postgresql', host=host, port=port, username=username, database=database, active_tab='browse', source=request.form.get('source_name') or None))
     except Exception as e:
         flash(f"PostgreSQL connection failed: {e}", "danger")
         return redirect(url_for('home', db_system='postgresql', host=host, port=port, username=username, database=database, active_tab='manual'))
@@ -34,7 +39,7 @@ def connect_postgres():
 @postgres_bp.route('/get_postgres_schemas', methods=['GET'])
 def get_postgres_schemas_route():
     database = request.args.get('database', '')
-    conn_details = session.get('postgresql_conn')
+    conn_details = get_source(session, 'postgresql', request.args.get('source'))
     schemas = []
     if conn_details and database:
         try:
@@ -53,7 +58,7 @@ def get_postgres_schemas_route():
 def get_postgres_tables_route():
     database = request.args.get('database', '')
     schema = request.args.get('schema', '')
-    conn_details = session.get('postgresql_conn')
+    conn_details = get_source(session, 'postgresql', request.args.get('source'))
     tables = []
     if conn_details and database and schema:
         try:
@@ -74,7 +79,7 @@ def get_postgres_schema_route():
     database = request.args.get('database')
     schema = request.args.get('schema')
     table = request.args.get('table')
-    conn_details = session.get('postgresql_conn')
+    conn_details = get_source(session, 'postgresql', request.args.get('source'))
     schema_dict = {}
     if conn_details and database and schema and table:
         try:
@@ -0,0 +1,52 @@
+from flask import Blueprint, request
+from flask.json.provider import JSONProvider
+from src.instrumentation import span
+from src.serialization import (
+    COMPRESS_MIN_BYTES, COMPRESS_RESPONSES, COMPRESSIBLE_TYPES, choose_encoding, compress, compress_stream, dumps, loads
+)
+
+serialization_bp = Blueprint('serialization_bp', __name__)
+
+
+class TimedJSONProvider(JSONProvider):
+    """
+    JSON for request bodies, jsonify() and the session cookie through
+    src/serialization.py (orjson when installed). Output is compact and keeps
+    key order; jsonify() responses are timed as the "serialize" phase.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, pretty=bool(kwargs.get("indent")), sort_keys=bool(kwargs.get("sort_keys")))
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        with span("serialize"):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(self.dumps(obj) + "\n", mimetype="application/json")
+
+
+@serialization_bp.after_app_request
+def compress_response(response):
+    """gzip (or brotli) large JSON, SQL and text responses for clients that accept it, streamed ones included."""
+    if not COMPRESS_RESPONSES or response.direct_passthrough or response.status_code < 200 \
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        with span("compress"):
+            response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
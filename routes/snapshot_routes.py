@@ -0,0 +1,111 @@
+import os
+import tempfile
+import uuid
+from flask import Blueprint, request, session, jsonify, send_file
+from src.executor import worker_count
+from src.source_sessions import get_source
+from src.batch import DB_SYSTEMS, extract_source_schemas
+from src.snapshot import (
+    SNAPSHOT_DIR,
+    SNAPSHOT_EXTENSION,
+    Snapshot,
+    list_snapshots,
+    open_snapshot,
+    snapshot_path,
+    write_snapshot
+)
+
+snapshot_bp = Blueprint('snapshot_bp', __name__)
+
+def _snapshot_or_error(snapshot_id):
+    try:
+        return open_snapshot(snapshot_id), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    except FileNotFoundError as e:
+        return None, (jsonify({"error": str(e)}), 404)
+
+@snapshot_bp.route('/export_snapshot', methods=['POST'])
+def export_snapshot():
+    """
+    Extracts a database/schema from the connected source (same body as
+    /generate_batch_ddl) and downloads it as a snapshot file.
+    """
+    data = request.get_json()
+    db_system = data.get('db_system', '')
+    if db_system not in DB_SYSTEMS:
+        return jsonify({"error": f"Unsupported source system: {db_system}"}), 400
+    conn_details = get_source(session, db_system, data.get('source'))
+    if not conn_details:
+        return jsonify({"error": f"Not connected to {db_system}"}), 400
+    try:
+        workers = worker_count(data.get('workers'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        extracted = extract_source_schemas(
+            db_system,
+            conn_details,
+            data.get('database'),
+            data.get('schema'),
+            data.get('tables'),
+            max_workers=workers
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error in export_snapshot: {e}")
+        return jsonify({"error": f"Failed to extract schemas: {e}"}), 500
+    if extracted["errors"]:
+        return jsonify({"error": "Some tables failed to extract", "errors": extracted["errors"]}), 500
+    source = {
+        "db_system": db_system,
+        "host": conn_details.get('host'),
+        "database": data.get('database') or conn_details.get('service_name'),
+        "schema": data.get('schema')
+    }
+    out = tempfile.TemporaryFile()
+    save_name = f"{data.get('database') or db_system}{SNAPSHOT_EXTENSION}"
+    write_snapshot(out, extracted["schemas"], source)
+    out.seek(0)
+    return send_file(out, mimetype="application/octet-stream", as_attachment=True, download_name=save_name)
+
+@snapshot_bp.route('/import_snapshot', methods=['POST'])
+def import_snapshot():
+    """Stores an uploaded snapshot ("snapshot" file field) and returns its id and table list."""
+    upload = request.files.get('snapshot')
+    if upload is None:
+        return jsonify({"error": "No snapshot file uploaded"}), 400
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    snapshot_id = uuid.uuid4().hex
+    path = snapshot_path(snapshot_id)
+    upload.save(path)
+    try:
+        with Snapshot(path) as snap:
+            info = snap.info()
+    except Exception as e:
+        os.remove(path)
+        return jsonify({"error": f"Not a valid snapshot: {e}"}), 400
+    return jsonify({"snapshot_id": snapshot_id, **info})
+
+@snapshot_bp.route('/snapshots')
+def snapshots():
+    return jsonify(list_snapshots())
+
+@snapshot_bp.route('/snapshot_tables')
+def snapshot_tables():
+    snap, error = _snapshot_or_error(request.args.get('snapshot_id', ''))
+    if error:
+        return error
+    return jsonify(snap.table_names(request.args.get('schema') or None))
+
+@snapshot_bp.route('/snapshot_schema')
+def snapshot_schema():
+    """Schema of one table from a snapshot, shaped like the /get_*_schema routes."""
+    snap, error = _snapshot_or_error(request.args.get('snapshot_id', ''))
+    if error:
+        return error
+    schema = snap.get_table_schema(request.args.get('table', ''), request.args.get('schema') or None)
+    if schema is None:
+        return jsonify({"error": "Table not in snapshot"}), 404
+    return jsonify({"schema": schema, "db_system": snap.source.get("db_system")})
@@ -1,4 +1,5 @@
 from flask import Blueprint, request, session, flash, redirect, url_for, jsonify
+from src.source_sessions import attach_source, get_source
 from src.sqlserver_conn import (
     test_sqlserver_connection,
     get_sqlserver_schemas,
@@ -18,15 +19,19 @@ def connect_sqlserver():
     try:
         dbs = test_sqlserver_connection(host, port, username, password)
         flash("SQL Server connection successful!", "success")
-        session['sqlserver_connected'] = True
-        session['sqlserver_dbs'] = dbs
-        session['sqlserver_conn'] = {
-            'host': host,
-            'port': port,
-            'user': username,
-            'password': password
-        }
-        return redirect(url_for('home', db_system='sqlserver', host=host, port=port, username=username, database=database, active_tab='browse'))
+        attach_source(
+            session,
+            'sqlserver',
+            {
+                'host': host,
+                'port': port,
+                'user': username,
+                'password': password
+            },
+            dbs,
+            request.form.get('source_name') or None
+        )
+        return redirect(url_for('home', db_system='sqlserver', host=host, port=port, username=username, database=database, active_tab='browse', source=request.form.get('source_name') or None))
     except Exception as e:
         flash(f"SQL Server connection failed: {e}", "danger")
         return redirect(url_for('home', db_system='sqlserver', host=host, port=port, username=username, database=database, active_tab='manual'))
@@ -34,7 +39,7 @@ def connect_sqlserver():
 @sqlserver_bp.route('/get_sqlserver_schemas', methods=['GET'])
 def get_sqlserver_schemas_route():
     database = request.args.get('database', '')
-    conn_details = session.get('sqlserver_conn')
+    conn_details = get_source(session, 'sqlserver', request.args.get('source'))
     schemas = []
     if conn_details and database:
         try:
@@ -53,7 +58,7 @@ def get_sqlserver_schemas_route():
 def get_sqlserver_tables_route():
     database = request.args.get('database', '')
     schema = request.args.get('schema', '')
-    conn_details = session.get('sqlserver_conn')
+    conn_details = get_source(session, 'sqlserver', request.args.get('source'))
     tables = []
     if conn_details and database and schema:
         try:
@@ -74,7 +79,7 @@ def get_sqlserver_schema_route():
     database = request.args.get('database')
     schema = request.args.get('schema')
     table = request.args.get('table')
-    conn_details = session.get('sqlserver_conn')
+    conn_details = get_source(session, 'sqlserver', request.args.get('source'))
     schema_dict = {}
     if conn_details and database and schema and table:
         try:
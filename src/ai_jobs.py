@@ -0,0 +1,176 @@
+# src/ai_jobs.py
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.ai_utils import comment_schema, COMMENT_BATCH_SIZE
+from src.serialization import dumps
+
+# Threads running AI jobs; jobs for the same model still take turns on it
+AI_JOB_WORKERS = int(os.environ.get("BQ_DDL_AI_JOB_WORKERS", "2"))
+# Finished jobs are kept this long (seconds) so their results can be fetched
+AI_JOB_RETENTION = float(os.environ.get("BQ_DDL_AI_JOB_RETENTION", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class CommentJob:
+    """One AI commenting run over a schema, with progress that can be polled."""
+
+    def __init__(self, schema_obj, model_name, batch_size=COMMENT_BATCH_SIZE, use_cache=True, dialect=None):
+        self.id = uuid.uuid4().hex
+        self.schema = schema_obj
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.use_cache = use_cache
+        self.dialect = dialect
+        self.status = QUEUED
+        self.total = len(schema_obj.get("columns", []))
+        self.completed = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self.version = 0  # bumped on every change, for change notifications
+        self._done = set()  # id() of columns whose comment has been set
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+
+    def _touch(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def _on_progress(self, done):
+        self._done.update(id(col) for col in done)
+        self.completed = len(self._done)
+        self._touch()
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def run(self):
+        if self._cancel.is_set():
+            self._finish(CANCELLED)
+            return
+        self.status = RUNNING
+        self._touch()
+        try:
+            comment_schema(
+                self.schema, self.model_name, self.batch_size, self.use_cache, self.dialect,
+                on_progress=self._on_progress
+            )
+            self._finish(DONE)
+        except JobCancelled:
+            self._finish(CANCELLED)
+        except Exception as e:
+            print(f"Error in AI job {self.id}: {e}")
+            self.error = str(e)
+            self._finish(FAILED)
+
+    def _finish(self, status):
+        self.status = status
+        self.finished = time.time()
+        self._touch()
+
+    def cancel(self):
+        """Stops the job after the batch in progress; a queued job never starts."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELLED)
+
+    def wait_for_change(self, version, timeout):
+        """Blocks until the job changes past version or timeout passes; returns the current version."""
+        with self._changed:
+            if self.version == version and self.status not in FINISHED_STATES:
+                self._changed.wait(timeout)
+            return self.version
+
+    def to_dict(self, include_schema=True):
+        result = {
+            "job_id": self.id,
+            "status": self.status,
+            "model": self.model_name,
+            "total": self.total,
+            "completed": self.completed,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished
+        }
+        if include_schema:
+            result["schema"] = self.schema
+        else:
+            # Partial results: the comment of each finished column, None for the rest
+            result["comments"] = [
+                col.get("comment") if id(col) in self._done else None
+                for col in self.schema.get("columns", [])
+            ]
+        return result
+
+
+_executor = ThreadPoolExecutor(max_workers=AI_JOB_WORKERS, thread_name_prefix="ai-job")
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _prune(now):
+    # Called with _jobs_lock held
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job.finished is not None and now - job.finished > AI_JOB_RETENTION
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def submit_comment_job(schema_obj, model_name, batch_size=COMMENT_BATCH_SIZE, use_cache=True, dialect=None):
+    """Queues a commenting job and returns it without waiting for it to run."""
+    job = CommentJob(schema_obj, model_name, batch_size, use_cache, dialect)
+    with _jobs_lock:
+        _prune(time.time())
+        _jobs[job.id] = job
+    job.future = _executor.submit(job.run)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id):
+    job = get_job(job_id)
+    if job is not None:
+        job.cancel()
+    return job
+
+
+def iter_job_events(job, heartbeat=15.0):
+    """
+    Yields Server-Sent Events for a job: a "progress" event on every change and
+    a final "done" event once it has finished. Comment lines keep idle
+    connections open through proxies.
+    """
+    version = -1
+    while True:
+        current = job.wait_for_change(version, heartbeat)
+        if current == version and job.status not in FINISHED_STATES:
+            yield ": keep-alive\n\n"
+            continue
+        version = current
+        finished = job.status in FINISHED_STATES
+        payload = dumps(job.to_dict(include_schema=finished))
+        yield f"event: {'done' if finished else 'progress'}\ndata: {payload}\n\n"
+        if finished:
+            return
@@ -1,6 +1,35 @@
-import json
+import os
 import re
-from gpt4all import GPT4All
+from src.drivers import DriverNotInstalledError
+from src.instrumentation import span
+from src.comment_cache import comment_cache, COMMENT_CACHE_ENABLED, COMMENT_CACHE_TABLE_CONTEXT, TABLE_KIND
+from src.mapping import map_types
+from src.serialization import schema_value
+from src.model_manager import model_manager
+
+# Columns packed into one prompt in batched mode; 1 disables batching
+COMMENT_BATCH_SIZE = int(os.environ.get("BQ_DDL_COMMENT_BATCH_SIZE", "25"))
+# Largest batch a request may ask for; the prompt and token budget grow with it
+MAX_COMMENT_BATCH_SIZE = int(os.environ.get("BQ_DDL_MAX_COMMENT_BATCH_SIZE", "100"))
+# Generation budget per column in a batched prompt
+BATCH_TOKENS_PER_COLUMN = 40
+
+_NUMBERED_LINE_RE = re.compile(r"^\s*(\d+)\s*[.):\-]\s*(.*)$")
+
+def batch_size(value, default=COMMENT_BATCH_SIZE):
+    """
+    Parses a requested comment batch size (default when empty).
+    Raises ValueError unless it is an integer from 1 to MAX_COMMENT_BATCH_SIZE.
+    """
+    if value in (None, ""):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid batch_size: {value!r}")
+    if not 1 <= size <= MAX_COMMENT_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_COMMENT_BATCH_SIZE}, got {size}")
+    return size
 
 def clean_ai_comment(raw_comment: str) -> str:
     print("Cleaning AI comment...")
@@ -48,7 +77,8 @@ def get_column_comment(model, col_name, col_type):
     Type: {col_type}
     """
     print("Sending prompt to AI model...")
-    response = model.generate(prompt, max_tokens=64).strip()
+    with span("inference"):
+        response = model.generate(prompt, max_tokens=64).strip()
     print(f"Raw AI response for '{col_name}': {response}")
     if response.startswith('"') and response.endswith('"'):
         response = response[1:-1]
@@ -58,6 +88,83 @@ def get_column_comment(model, col_name, col_type):
     print(f"Final cleaned comment for '{col_name}': {cleaned_comment}")
     return cleaned_comment
 
+def _parse_batch_response(response, columns):
+    """
+    Reads "<n>. <description>" lines back into {column index: comment}.
+    Lines that do not parse, numbers out of range and empty descriptions are skipped.
+    """
+    comments = {}
+    for line in response.splitlines():
+        match = _NUMBERED_LINE_RE.match(line)
+        if not match:
+            continue
+        idx = int(match.group(1)) - 1
+        if idx < 0 or idx >= len(columns) or idx in comments:
+            continue
+        text = match.group(2).strip()
+        # Models often echo the column name before the description
+        col_name = str(columns[idx].get("name") or "")
+        for prefix in (f"{col_name}:", f"{col_name} -", f"{col_name} ({columns[idx].get('type')}):"):
+            if col_name and text.lower().startswith(prefix.lower()):
+                text = text[len(prefix):].strip()
+                break
+        comment = clean_ai_comment(text)
+        if comment:
+            comments[idx] = comment
+    return comments
+
+def get_column_comments_batch(model, columns):
+    """
+    Generates comments for several columns with a single prompt.
+    Returns {index into columns: comment}; columns missing from the result
+    could not be parsed from the response.
+    """
+    listing = "\n".join(
+        f"{idx + 1}. {col.get('name')} ({col.get('type')})" for idx, col in enumerate(columns)
+    )
+    prompt = f"""
+    You are a database expert.
+    Write a single-line, human-readable description for each column below.
+    - Answer with one line per column, in the same order, formatted as: <number>. <description>
+    - Do NOT add 'Solution:', 'Output:', 'Response:', examples, JSON, markdown, assistant, end, explanation or any commentary.
+    - Keep each description concise.
+
+    Columns (name and type):
+{listing}
+    """
+    print(f"Sending batched prompt for {len(columns)} columns to AI model...")
+    with span("inference"):
+        response = model.generate(prompt, max_tokens=BATCH_TOKENS_PER_COLUMN * len(columns) + 16)
+    print(f"Raw batched AI response: {response}")
+    return _parse_batch_response(response, columns)
+
+def comment_columns(model, columns, batch_size=COMMENT_BATCH_SIZE, on_progress=None):
+    """
+    Fills in col["comment"] for every column. Columns are sent batch_size at a
+    time; any column whose comment cannot be read back from a batched answer
+    falls back to its own get_column_comment call.
+    on_progress, if given, is called with each list of columns as it is finished.
+    """
+    if batch_size <= 1:
+        for idx, col in enumerate(columns):
+            print(f"Processing column {idx+1}/{len(columns)}: {col.get('name')}")
+            col["comment"] = get_column_comment(model, col.get("name"), col.get("type"))
+            if on_progress:
+                on_progress([col])
+        return
+    for start in range(0, len(columns), batch_size):
+        chunk = columns[start:start + batch_size]
+        print(f"Processing columns {start+1}-{start+len(chunk)}/{len(columns)}")
+        comments = get_column_comments_batch(model, chunk)
+        for idx, col in enumerate(chunk):
+            comment = comments.get(idx)
+            if comment is None:
+                print(f"No batched comment for '{col.get('name')}', falling back to a single prompt.")
+                comment = get_column_comment(model, col.get("name"), col.get("type"))
+            col["comment"] = comment
+        if on_progress:
+            on_progress(chunk)
+
 def get_table_comment(model, table_name):
     prompt = f"""
 Table: {table_name}
@@ -65,52 +172,107 @@ Task: Write a short, meaningful comment describing this table for a database sch
 Return ONLY the comment as a string.
 """
     print(f"Prompting for table comment for '{table_name}'...")
-    response = model.generate(prompt, max_tokens=64).strip()
+    with span("inference"):
+        response = model.generate(prompt, max_tokens=64).strip()
     return clean_ai_comment(response)
 
-def add_comments_to_json_schema(json_schema, model_name):
+def comment_schema(schema_obj, model_name, batch_size=COMMENT_BATCH_SIZE, use_cache=True, dialect=None,
+                   on_progress=None):
+    """
+    Adds AI comments to every column and to the table of a schema dict, in place.
+    Comments are looked up in the comment cache first (keyed by model, column
+    name and mapped BigQuery type) and only the misses are sent to the model;
+    use_cache=False bypasses the cache entirely.
+    on_progress is called with each list of columns as their comments are set
+    (cache hits first); raising from it stops the run.
+    """
+    columns = schema_obj.get("columns", [])
+    table_name = schema_obj.get("table_name", "")
+    print(f"Found {len(columns)} columns to process.")
+    use_cache = use_cache and COMMENT_CACHE_ENABLED
+    context = table_name if COMMENT_CACHE_TABLE_CONTEXT else ""
+    bq_types = map_types([col.get("type", "") for col in columns], dialect)
+
+    missing = list(range(len(columns)))
+    table_comment = None
+    if use_cache:
+        cached = comment_cache.get_many(
+            model_name, [(col.get("name"), bq_type) for col, bq_type in zip(columns, bq_types)], context
+        )
+        missing = []
+        for idx, comment in enumerate(cached):
+            if comment is None:
+                missing.append(idx)
+            else:
+                columns[idx]["comment"] = comment
+        table_comment = comment_cache.get(model_name, table_name, TABLE_KIND)
+        print(f"Comment cache: {len(columns) - len(missing)}/{len(columns)} columns cached.")
+        if on_progress and len(missing) < len(columns):
+            missing_set = set(missing)
+            on_progress([col for idx, col in enumerate(columns) if idx not in missing_set])
+
+    bq_type_by_column = {id(col): bq_type for col, bq_type in zip(columns, bq_types)}
+
+    def finished(done):
+        # Cache each batch as it completes, so a stopped run keeps its work
+        if use_cache:
+            comment_cache.put_many(
+                model_name, [(col.get("name"), bq_type_by_column[id(col)], col.get("comment")) for col in done], context
+            )
+        if on_progress:
+            on_progress(done)
+
+    if missing or table_comment is None:
+        # The model stays loaded between requests; see src/model_manager.py
+        with model_manager.use(model_name) as model:
+            print("Model ready.")
+            comment_columns(model, [columns[idx] for idx in missing], batch_size, finished)
+            if table_comment is None:
+                # Generate table comment using table name
+                table_comment = get_table_comment(model, table_name)
+                if use_cache:
+                    comment_cache.put(model_name, table_name, TABLE_KIND, table_comment)
+    schema_obj["table_comment"] = table_comment
+    print("Table comment generated.")
+    print("All column comments generated.")
+    return schema_obj
+
+def add_comments_to_json_schema(json_schema, model_name, batch_size=COMMENT_BATCH_SIZE, use_cache=True, dialect=None):
     try:
         print("Starting add_comments_to_json_schema function.")
-        model_path = "models/"
-        model = GPT4All(model_name, model_path=model_path)
-        print("Model initialized.")
-        schema_obj = json.loads(json_schema)
+        schema_obj = schema_value(json_schema, "json_schema")
         print("Loaded JSON schema.")
-        columns = schema_obj.get("columns", [])
-        print(f"Found {len(columns)} columns to process.")
-        for idx, col in enumerate(columns):
-            print(f"Processing column {idx+1}/{len(columns)}: {col.get('name')}")
-            col_name = col.get("name")
-            col_type = col.get("type")
-            comment = get_column_comment(model, col_name, col_type)
-            col["comment"] = comment
-            print(f"Comment added for column '{col_name}'.")
-        # Generate table comment using table name
-        table_name = schema_obj.get("table_name", "")
-        table_comment = get_table_comment(model, table_name)
-        schema_obj["table_comment"] = table_comment
-        print("Table comment generated.")
-        print("All column comments generated.")
-        return schema_obj
+        return comment_schema(schema_obj, model_name, batch_size, use_cache, dialect)
+    except DriverNotInstalledError:
+        raise
     except Exception as e:
         print(f"Error in add_comments_to_json_schema: {e}")
         return None
 
+def _ddl_comment_prompt(ddl):
+    return (
+        """Add helpful comments to each column and the table in this BigQuery DDL using 
+        "OPTIONS(description=\"...\") for both columns and the table. 
+        Return only the modified DDL.\n"""
+        f"{ddl}"
+    )
+
+def iter_ddl_comment_tokens(ddl, model_name, max_tokens=256):
+    """
+    Yields the model's commented DDL token by token as it is generated.
+    The model is held for the life of the generator, so close it (or run it
+    to the end) to let other requests use the model.
+    """
+    with model_manager.use(model_name) as model, span("inference"):
+        for token in model.generate(_ddl_comment_prompt(ddl), max_tokens=max_tokens, streaming=True):
+            yield token
+
 def add_comments_to_ddl(ddl, model_name):
     response_text = ""
     try:
-        model_path = "models/"
-        model = GPT4All(model_name, model_path=model_path)
-        prompt = (
-            """Add helpful comments to each column and the table in this BigQuery DDL using 
-            "OPTIONS(description=\"...\") for both columns and the table. 
-            Return only the modified DDL.\n"""
-            f"{ddl}"
-        )
-        response_text = model.generate(prompt, max_tokens=256)
+        response_text = "".join(iter_ddl_comment_tokens(ddl, model_name))
         print("AI Response:", response_text)
     except Exception as e:
         response_text = f"Error: {e}"
         print(response_text)
     return response_text
-
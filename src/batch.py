@@ -0,0 +1,487 @@
+# src/batch.py
+
+import argparse
+import json
+import os
+import sys
+import zipfile
+from functools import partial
+
+from src.ddl_stream import iter_ddl_file_schemas
+from src.diff import generate_bq_alter_ddl
+from src.executor import SOURCE_CONCURRENCY, run_concurrently
+from src.fingerprints import (
+    diff_fingerprints,
+    get_table_fingerprints,
+    load_fingerprints,
+    save_fingerprints,
+    source_key,
+    tables_by_schema
+)
+from src.instrumentation import record_phases
+from src.renderer import generate_bq_ddl
+from src.snapshot import Snapshot, save_snapshot
+
+DB_SYSTEMS = ("mysql", "postgresql", "sqlserver", "oracle")
+DDL_FILE_EXTENSIONS = (".sql", ".ddl")
+# Longer explicit table lists for one schema use the bulk query, filtered to the list
+PER_TABLE_MAX_TABLES = int(os.environ.get("BQ_DDL_PER_TABLE_MAX_TABLES", "50"))
+# Changed tables are fetched one by one only while they are at most this share of
+# their schema; beyond it (and on a first run) one bulk query per schema is cheaper
+CHANGED_PER_TABLE_FRACTION = float(os.environ.get("BQ_DDL_CHANGED_PER_TABLE_FRACTION", "0.1"))
+
+
+def _flatten(results):
+    schemas = []
+    for result in results:
+        if isinstance(result, list):
+            schemas.extend(result)
+        else:
+            schemas.append(result)
+    return schemas
+
+
+def _extract_tasks(db_system, conn_details, database, plan):
+    """
+    Builds the (label, fn) catalog tasks for plan, a list of (schema, tables, bulk):
+    bulk entries are one query for the whole schema, filtered to tables when given,
+    the others one query per table. MySQL schemas are databases.
+    """
+    host = conn_details.get('host')
+    port = conn_details.get('port')
+    user = conn_details.get('user')
+    password = conn_details.get('password')
+    tasks = []
+
+    if db_system == "mysql":
+        from src.mysql_conn import get_mysql_all_table_schemas, get_mysql_table_schema
+        for schema_name, tables, bulk in plan:
+            db = schema_name or database
+            if bulk:
+                tasks.append((db, partial(get_mysql_all_table_schemas, host, port, user, password, db, tables)))
+            else:
+                tasks.extend(
+                    (f"{db}.{table}", partial(get_mysql_table_schema, host, port, user, password, db, table))
+                    for table in tables
+                )
+
+    elif db_system == "postgresql":
+        from src.postgres_conn import get_postgres_all_table_schemas, get_postgres_table_schema
+        for schema_name, tables, bulk in plan:
+            if bulk:
+                tasks.append((schema_name, partial(
+                    get_postgres_all_table_schemas, host, port, user, password, database, schema_name, tables
+                )))
+            else:
+                tasks.extend(
+                    (f"{schema_name}.{table}", partial(
+                        get_postgres_table_schema, host, port, user, password, database, schema_name, table
+                    ))
+                    for table in tables
+                )
+
+    elif db_system == "sqlserver":
+        from src.sqlserver_conn import get_sqlserver_all_table_schemas, get_sqlserver_table_schema
+        for schema_name, tables, bulk in plan:
+            if bulk:
+                tasks.append((schema_name, partial(
+                    get_sqlserver_all_table_schemas, host, port, user, password, database, schema_name, tables
+                )))
+            else:
+                tasks.extend(
+                    (f"{schema_name}.{table}", partial(
+                        get_sqlserver_table_schema, host, port, user, password, database, schema_name, table
+                    ))
+                    for table in tables
+                )
+
+    elif db_system == "oracle":
+        from src.oracle_conn import get_oracle_all_table_schemas, get_oracle_table_schema
+        service_name = conn_details.get('service_name') or database
+        for schema_name, tables, bulk in plan:
+            if bulk:
+                tasks.append((schema_name, partial(
+                    get_oracle_all_table_schemas, host, port, user, password, service_name, schema_name, tables
+                )))
+            else:
+                tasks.extend(
+                    (f"{schema_name}.{table}", partial(
+                        get_oracle_table_schema, host, port, user, password, service_name, schema_name, table
+                    ))
+                    for table in tables
+                )
+
+    else:
+        raise ValueError(f"Unsupported source system: {db_system}")
+    return tasks
+
+
+def _run_tasks(db_system, conn_details, tasks, max_workers):
+    source = (db_system, conn_details.get('host'), str(conn_details.get('port')))
+    outcome = run_concurrently(tasks, max_workers=max_workers, source=source)
+    return {
+        "schemas": _flatten(outcome["results"]),
+        "errors": outcome["errors"],
+        "stats": outcome["stats"]
+    }
+
+
+def _list_schemas(db_system, conn_details, database):
+    args = (conn_details.get('host'), conn_details.get('port'), conn_details.get('user'), conn_details.get('password'))
+    if db_system == "postgresql":
+        from src.postgres_conn import get_postgres_schemas
+        return get_postgres_schemas(*args, database)
+    from src.sqlserver_conn import get_sqlserver_schemas
+    return get_sqlserver_schemas(*args, database)
+
+
+def extract_source_schemas(db_system, conn_details, database=None, schema=None, tables=None,
+                           max_workers=SOURCE_CONCURRENCY):
+    """
+    Extracts schema dicts for the tables of a source database.
+    conn_details is the same dict the blueprints keep in session['<db_system>_conn'].
+    For PostgreSQL and SQL Server all schemas are extracted when schema is empty;
+    Oracle raises ValueError without a schema (owner) unless every table is qualified.
+    tables may mix bare table names, which belong to schema, and "<schema>.<table>"
+    keys as returned by get_table_fingerprints (split on the first ".").
+
+    Each schema is pulled with one bulk catalog query and schemas are fanned out
+    across a bounded thread pool. Explicit lists of up to PER_TABLE_MAX_TABLES
+    tables in a known schema are fetched individually and concurrently instead.
+    Returns {"schemas": [...], "errors": [...], "stats": {...}}.
+    """
+    if db_system not in DB_SYSTEMS:
+        raise ValueError(f"Unsupported source system: {db_system}")
+    default_schema = database if db_system == "mysql" else schema
+    grouped = {}
+    for table in tables or ():
+        if "." in table:
+            schema_name, _, table_name = table.partition(".")
+        else:
+            schema_name, table_name = default_schema, table
+        grouped.setdefault(schema_name, []).append(table_name)
+
+    plan = [(name, names, len(names) > PER_TABLE_MAX_TABLES)
+            for name, names in grouped.items() if name]
+    unqualified = grouped.get(default_schema) if not default_schema else None
+    if not tables or unqualified:
+        # Bare names without a schema are looked up in every schema
+        if default_schema or db_system == "oracle":
+            plan.append((default_schema, unqualified, True))
+        else:
+            plan.extend((name, unqualified, True) for name in _list_schemas(db_system, conn_details, database))
+    if db_system == "oracle" and not all(name for name, _, _ in plan):
+        raise ValueError("Oracle batch extraction needs a schema (owner)")
+
+    return _run_tasks(db_system, conn_details, _extract_tasks(db_system, conn_details, database, plan), max_workers)
+
+
+def extract_changed_schemas(db_system, conn_details, database=None, schema=None, previous=None, tables=None,
+                            max_workers=SOURCE_CONCURRENCY):
+    """
+    Extracts only the tables whose catalog fingerprint differs from previous
+    ({"<schema>.<table>": fingerprint} from an earlier run).
+    Returns {"schemas", "errors", "changes", "fingerprints"}, where fingerprints
+    is the full map to store for the next run: tables that failed to extract
+    keep their old fingerprint so they are retried.
+
+    A schema is extracted with the bulk query and filtered afterwards when there
+    is no previous state for it or more than CHANGED_PER_TABLE_FRACTION of its
+    tables changed; otherwise the changed tables are fetched individually.
+    """
+    previous = previous or {}
+    wanted = set(tables) if tables else None
+
+    def in_scope(key):
+        schema_name, _, table_name = key.partition(".")
+        if schema and db_system != "mysql" and schema_name != schema:
+            return False
+        return wanted is None or table_name in wanted or key in wanted
+
+    current = {key: value for key, value in
+               get_table_fingerprints(db_system, conn_details, database, schema, max_workers).items()
+               if in_scope(key)}
+    changes = diff_fingerprints(current, {key: value for key, value in previous.items() if in_scope(key)})
+
+    schema_sizes = {name: len(keys) for name, keys in tables_by_schema(current).items()}
+    previous_schemas = set(tables_by_schema(key for key in previous if in_scope(key)))
+
+    plan = []
+    for schema_name, names in tables_by_schema(changes["changed"] + changes["added"]).items():
+        bulk = (schema_name not in previous_schemas
+                or len(names) > CHANGED_PER_TABLE_FRACTION * schema_sizes.get(schema_name, len(names)))
+        plan.append((schema_name, names, bulk))
+    extracted = _run_tasks(db_system, conn_details, _extract_tasks(db_system, conn_details, database, plan),
+                           max_workers)
+    schemas = extracted["schemas"]
+    errors = extracted["errors"]
+
+    # Entries outside the requested schema/tables are carried over untouched
+    fingerprints = {key: value for key, value in previous.items() if not in_scope(key) or key in current}
+    extracted_keys = {f"{s.get('schema')}.{s.get('table_name')}" for s in schemas}
+    pending = set(changes["changed"]) | set(changes["added"])
+    for key, value in current.items():
+        if key in extracted_keys or key not in pending:
+            fingerprints[key] = value
+    return {"schemas": schemas, "errors": errors, "changes": changes, "fingerprints": fingerprints}
+
+
+def load_schemas_from_dir(path):
+    """
+    Loads schema dicts from a directory of JSON schemas (one dict or a list of
+    dicts per file) and source DDL files (*.sql, *.ddl). DDL files may be full
+    dumps; every CREATE TABLE in them is read.
+    """
+    schemas = []
+    for file_name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, file_name)
+        if not os.path.isfile(file_path):
+            continue
+        lower_name = file_name.lower()
+        if lower_name.endswith(".json"):
+            with open(file_path, encoding="utf-8") as f:
+                data = json.load(f)
+            schemas.extend(data if isinstance(data, list) else [data])
+        elif lower_name.endswith(DDL_FILE_EXTENSIONS):
+            schemas.extend(iter_ddl_file_schemas(file_path))
+    return schemas
+
+
+def _render_args(schema, bq_project_id=None, bq_dataset_id=None):
+    table_name = schema.get('table_name', 'my_table')
+    if bq_project_id and bq_dataset_id:
+        dataset = f"{bq_project_id}.{bq_dataset_id}"
+    else:
+        dataset = bq_dataset_id or schema.get("schema")
+    return table_name, schema.get('columns', []), dataset, schema.get('table_comment')
+
+
+def iter_combined_sql(schemas, bq_project_id=None, bq_dataset_id=None, dialect=None, errors=None):
+    """
+    Yields the DDL of every schema as text chunks, separated by blank lines,
+    using dialect's type-mapping rules. Schemas may be any iterable (e.g. a
+    streamed dump), so memory stays flat however many tables there are.
+    Extraction errors are listed as SQL comments at the top.
+    """
+    for error in errors or []:
+        yield f"-- Failed to extract {error['label']}: {error['error']}\n"
+    if errors:
+        yield "\n"
+    # Map and render time is summed over the batch and recorded once
+    timings = {}
+    try:
+        for idx, schema in enumerate(schemas):
+            if idx:
+                yield "\n\n"
+            yield generate_bq_ddl(*_render_args(schema, bq_project_id, bq_dataset_id), dialect=dialect, timings=timings)
+        yield "\n"
+    finally:
+        if timings:
+            record_phases(timings)
+
+
+def write_combined_sql(fp, schemas, bq_project_id=None, bq_dataset_id=None, dialect=None, errors=None):
+    """Writes all DDL statements into one text stream; returns the number of tables."""
+    written = 0
+
+    def counted():
+        nonlocal written
+        for schema in schemas:
+            written += 1
+            yield schema
+
+    for chunk in iter_combined_sql(counted(), bq_project_id, bq_dataset_id, dialect, errors):
+        fp.write(chunk)
+    return written
+
+
+def iter_diff_sql(schemas, previous, bq_project_id=None, bq_dataset_id=None, dialect=None, drop_columns=False):
+    """
+    Yields DDL that migrates the tables in previous (anything with
+    get_table_schema(table, schema), such as a Snapshot) to schemas: ALTER
+    statements for changed tables and CREATE TABLE for new ones. Unchanged
+    tables produce nothing.
+    """
+    first = True
+    timings = {}
+    try:
+        for schema in schemas:
+            table_name, columns, dataset, table_comment = _render_args(schema, bq_project_id, bq_dataset_id)
+            old = previous.get_table_schema(schema.get("table_name"), schema.get("schema"))
+            if old is None:
+                statement = generate_bq_ddl(table_name, columns, dataset, table_comment, dialect, timings)
+                statement = statement.replace("CREATE OR REPLACE TABLE", "CREATE TABLE IF NOT EXISTS", 1)
+            else:
+                statement = generate_bq_alter_ddl(table_name, old, schema, dataset, dialect, drop_columns=drop_columns)
+            if not statement:
+                continue
+            if not first:
+                yield "\n\n"
+            first = False
+            yield f"-- {table_name}\n{statement}"
+        if not first:
+            yield "\n"
+    finally:
+        if timings:
+            record_phases(timings)
+
+
+def write_zip(fp, schemas, bq_project_id=None, bq_dataset_id=None, dialect=None, errors=None):
+    """
+    Writes one <schema>.<table_name>.sql entry per table into a zip archive
+    (<table_name>.sql for schemas parsed without one). Extraction errors are
+    listed in an errors.txt entry.
+    Returns the number of tables written.
+    """
+    seen = {}
+    written = 0
+    timings = {}
+    with zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if errors:
+            archive.writestr("errors.txt", "".join(f"{e['label']}: {e['error']}\n" for e in errors))
+        for schema in schemas:
+            table_name, columns, dataset, table_comment = _render_args(schema, bq_project_id, bq_dataset_id)
+            # Same table name in different schemas must not overwrite each other
+            source_schema = schema.get("schema")
+            if source_schema and source_schema != "sourceschema":
+                base_name = f"{source_schema}.{table_name}"
+            else:
+                base_name = table_name
+            count = seen.get(base_name, 0)
+            seen[base_name] = count + 1
+            entry_name = f"{base_name}.sql" if not count else f"{base_name}_{count}.sql"
+            ddl = generate_bq_ddl(table_name, columns, dataset, table_comment, dialect, timings)
+            archive.writestr(entry_name, ddl + "\n")
+            written += 1
+    if timings:
+        record_phases(timings)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate BigQuery DDL for every table of a source database or a directory of schemas."
+    )
+    parser.add_argument("--source", choices=DB_SYSTEMS, help="Source database system")
+    parser.add_argument("--dialect", choices=DB_SYSTEMS,
+                        help="Type-mapping dialect for --input-dir/--dump/--snapshot (defaults to --source)")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", default="")
+    parser.add_argument("--user", default="")
+    parser.add_argument("--password", default=os.environ.get("BQ_DDL_SOURCE_PASSWORD", ""),
+                        help="Source password (defaults to $BQ_DDL_SOURCE_PASSWORD)")
+    parser.add_argument("--database", default="", help="Database (Oracle: service name)")
+    parser.add_argument("--schema", default="", help="Schema filter (Oracle: owner)")
+    parser.add_argument("--tables", default="", help="Comma-separated table names or <schema>.<table> keys to include")
+    parser.add_argument("--input-dir", help="Directory of JSON schemas and/or source DDL files")
+    parser.add_argument("--dump", help="Schema dump file (mysqldump, pg_dump --schema-only, SSMS script, DBMS_METADATA)")
+    parser.add_argument("--snapshot", help="Read schemas from a snapshot file instead of a live source")
+    parser.add_argument("--save-snapshot", help="Also save the extracted schemas to this snapshot file")
+    parser.add_argument("--since-snapshot",
+                        help="Write ALTER TABLE statements against this earlier snapshot instead of CREATE OR REPLACE")
+    parser.add_argument("--drop-columns", action="store_true",
+                        help="With --since-snapshot, drop columns that no longer exist (listed as comments otherwise)")
+    parser.add_argument("--changed-since",
+                        help="Fingerprint state file; only tables changed since the last run are extracted, "
+                             "and the file is updated afterwards")
+    parser.add_argument("--project", default="", help="BigQuery project ID")
+    parser.add_argument("--dataset", default="", help="BigQuery dataset ID")
+    parser.add_argument("--workers", type=int, default=SOURCE_CONCURRENCY,
+                        help="Maximum concurrent catalog queries against the source")
+    parser.add_argument("--output", help="Output file; a .zip extension writes one file per table")
+    args = parser.parse_args(argv)
+
+    if not args.output and not args.save_snapshot:
+        parser.error("--output or --save-snapshot is required")
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()] or None
+    errors = []
+    snapshot = None
+    if args.snapshot:
+        # Tables are decompressed one at a time as the output is written
+        snapshot = Snapshot(args.snapshot)
+        schemas = snapshot.iter_schemas(tables)
+        print(f"Reading {len(snapshot)} tables from snapshot {args.snapshot}")
+    elif args.input_dir or args.dump:
+        # A dump is streamed straight through to the output, one table at a time
+        schemas = load_schemas_from_dir(args.input_dir) if args.input_dir else iter_ddl_file_schemas(args.dump)
+        if tables:
+            schemas = (s for s in schemas if s.get("table_name") in tables)
+    elif args.source:
+        conn_details = {
+            'host': args.host,
+            'port': args.port,
+            'user': args.user,
+            'password': args.password,
+            'service_name': args.database
+        }
+        if args.changed_since:
+            state = load_fingerprints(args.changed_since)
+            state_key = source_key(args.source, conn_details, args.database)
+            extracted = extract_changed_schemas(
+                args.source, conn_details, args.database, args.schema, state.get(state_key), tables,
+                max_workers=args.workers
+            )
+            changes = extracted["changes"]
+            print(
+                f"{len(changes['changed'])} changed, {len(changes['added'])} new, "
+                f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged tables"
+            )
+            for key in changes["removed"]:
+                print(f"Table removed from source: {key}")
+            schemas = extracted["schemas"]
+            errors = extracted["errors"]
+        else:
+            extracted = extract_source_schemas(
+                args.source, conn_details, args.database, args.schema, tables, max_workers=args.workers
+            )
+            schemas = extracted["schemas"]
+            errors = extracted["errors"]
+            stats = extracted["stats"]
+            print(
+                f"Extracted {len(schemas)} tables in {stats['elapsed_seconds']}s "
+                f"({stats['succeeded']}/{stats['tasks']} catalog tasks ok, {stats['workers']} workers)"
+            )
+        for error in errors:
+            print(f"Failed to extract {error['label']}: {error['error']}", file=sys.stderr)
+    else:
+        parser.error("one of --source, --input-dir, --dump or --snapshot is required")
+
+    dialect = args.dialect or args.source or (snapshot.source.get("db_system") if snapshot else None)
+    if args.save_snapshot:
+        source = {
+            "db_system": args.source or args.dialect,
+            "host": args.host,
+            "database": args.database,
+            "schema": args.schema
+        }
+        saved = save_snapshot(args.save_snapshot, schemas, source)
+        print(f"Saved {saved} tables to snapshot {args.save_snapshot}")
+        # Read the tables back for the DDL rather than holding them all in memory
+        if snapshot is not None:
+            snapshot.close()
+        snapshot = Snapshot(args.save_snapshot)
+        schemas = snapshot.iter_schemas()
+    if args.output and args.since_snapshot:
+        with Snapshot(args.since_snapshot) as previous, open(args.output, "w", encoding="utf-8") as f:
+            for chunk in iter_diff_sql(schemas, previous, args.project, args.dataset, dialect, args.drop_columns):
+                f.write(chunk)
+        print(f"Wrote changes since {args.since_snapshot} to {args.output}")
+    elif args.output:
+        if args.output.lower().endswith(".zip"):
+            with open(args.output, "wb") as f:
+                written = write_zip(f, schemas, args.project, args.dataset, dialect, errors)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                written = write_combined_sql(f, schemas, args.project, args.dataset, dialect, errors)
+        print(f"Wrote DDL for {written} tables to {args.output}")
+    if snapshot is not None:
+        snapshot.close()
+    if args.changed_since and args.source:
+        # Saved only after the output is written, so a failed run is redone next time
+        state[state_key] = extracted["fingerprints"]
+        save_fingerprints(args.changed_since, state)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# src/catalog.py
+
+import os
+
+# Names per page when the caller does not ask for a size, and the most it may ask for
+CATALOG_PAGE_SIZE = int(os.environ.get("BQ_DDL_CATALOG_PAGE_SIZE", "100"))
+CATALOG_MAX_PAGE_SIZE = int(os.environ.get("BQ_DDL_CATALOG_MAX_PAGE_SIZE", "1000"))
+
+
+def like_prefix(prefix):
+    """A LIKE pattern matching names that start with prefix, with %, _ and \\ escaped (ESCAPE '\\')."""
+    escaped = (prefix or "").replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def _page_size(limit):
+    try:
+        limit = int(limit) if limit not in (None, "") else CATALOG_PAGE_SIZE
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid page size: {limit}")
+    return max(1, min(limit, CATALOG_MAX_PAGE_SIZE))
+
+
+def _page(fetch, limit):
+    """Fetches one row more than the page to tell whether another page follows."""
+    limit = _page_size(limit)
+    names = fetch(limit + 1)
+    items = names[:limit]
+    next_cursor = items[-1] if len(names) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_schemas_page(db_system, conn_details, database=None, prefix="", cursor=None, limit=None):
+    """
+    One page of schema names of a source, in name order, filtered by name
+    prefix. Returns {"items": [...], "next_cursor": name or None}; pass
+    next_cursor back as cursor for the following page. Pages are read with
+    keyset pagination in the catalog query, so deep pages cost the same as the first.
+    MySQL has no schemas below the database and returns the database itself.
+    """
+    host = conn_details.get('host')
+    port = conn_details.get('port')
+    user = conn_details.get('user')
+    password = conn_details.get('password')
+    after = cursor or ""
+
+    if db_system == "mysql":
+        items = [database] if database and database.startswith(prefix or "") and database > after else []
+        return {"items": items, "next_cursor": None}
+    elif db_system == "postgresql":
+        from src.postgres_conn import get_postgres_schemas_page
+
+        def fetch(size):
+            return get_postgres_schemas_page(host, port, user, password, database, prefix, after, size)
+    elif db_system == "sqlserver":
+        from src.sqlserver_conn import get_sqlserver_schemas_page
+
+        def fetch(size):
+            return get_sqlserver_schemas_page(host, port, user, password, database, prefix, after, size)
+    elif db_system == "oracle":
+        from src.oracle_conn import get_oracle_schemas_page
+        service_name = conn_details.get('service_name') or database
+
+        def fetch(size):
+            return get_oracle_schemas_page(host, port, user, password, service_name, prefix, after, size)
+    else:
+        raise ValueError(f"Unsupported source system: {db_system}")
+    return _page(fetch, limit)
+
+
+def list_tables_page(db_system, conn_details, database=None, schema=None, prefix="", cursor=None, limit=None):
+    """
+    One page of table names of a database (MySQL) or schema, in name order,
+    filtered by name prefix. Returns {"items": [...], "next_cursor": name or None}.
+    """
+    host = conn_details.get('host')
+    port = conn_details.get('port')
+    user = conn_details.get('user')
+    password = conn_details.get('password')
+    after = cursor or ""
+
+    if db_system == "mysql":
+        from src.mysql_conn import get_mysql_tables_page
+
+        def fetch(size):
+            return get_mysql_tables_page(host, port, user, password, database, prefix, after, size)
+    elif db_system == "postgresql":
+        from src.postgres_conn import get_postgres_tables_page
+
+        def fetch(size):
+            return get_postgres_tables_page(host, port, user, password, database, schema, prefix, after, size)
+    elif db_system == "sqlserver":
+        from src.sqlserver_conn import get_sqlserver_tables_page
+
+        def fetch(size):
+            return get_sqlserver_tables_page(host, port, user, password, database, schema, prefix, after, size)
+    elif db_system == "oracle":
+        from src.oracle_conn import get_oracle_tables_page
+        service_name = conn_details.get('service_name') or database
+
+        def fetch(size):
+            return get_oracle_tables_page(host, port, user, password, service_name, schema, prefix, after, size)
+    else:
+        raise ValueError(f"Unsupported source system: {db_system}")
+    return _page(fetch, limit)
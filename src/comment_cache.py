@@ -0,0 +1,160 @@
+# src/comment_cache.py
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+COMMENT_CACHE_ENABLED = os.environ.get("BQ_DDL_COMMENT_CACHE", "1") != "0"
+COMMENT_CACHE_PATH = os.environ.get(
+    "BQ_DDL_COMMENT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache", "comment_cache.sqlite3")
+)
+COMMENT_CACHE_MAX_ENTRIES = int(os.environ.get("BQ_DDL_COMMENT_CACHE_MAX_ENTRIES", "100000"))
+# When set, column comments are cached per table instead of shared across tables
+COMMENT_CACHE_TABLE_CONTEXT = os.environ.get("BQ_DDL_COMMENT_CACHE_TABLE_CONTEXT", "0") == "1"
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+
+# Column type used in the key of table comments
+TABLE_KIND = "TABLE"
+
+
+def normalize_name(name):
+    """customerID, "Customer_Id" and `customer id` all become customer_id."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", str(name or "").strip("`\"[] "))
+    return _NON_WORD_RE.sub("_", text.lower()).strip("_")
+
+
+class CommentCache:
+    """
+    SQLite-backed cache of AI comments keyed by
+    (model, normalized column name, mapped BigQuery type, table context).
+    When more than max_entries are stored, the least recently used are deleted.
+    """
+
+    def __init__(self, path=COMMENT_CACHE_PATH, max_entries=COMMENT_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        # Called with self._lock held; opened on first use
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS comments ("
+                " model TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " type TEXT NOT NULL,"
+                " context TEXT NOT NULL,"
+                " comment TEXT NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, name, type, context))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS comments_last_used ON comments (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _key(model, name, bq_type, context):
+        return (model or "", normalize_name(name), (bq_type or "").upper(), normalize_name(context))
+
+    def get_many(self, model, names_and_types, context=""):
+        """
+        Looks up [(name, bq_type), ...]; returns a list of comments with None for misses.
+        """
+        keys = [self._key(model, name, bq_type, context) for name, bq_type in names_and_types]
+        if not keys:
+            return []
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for key in set(keys):
+                row = conn.execute(
+                    "SELECT comment FROM comments WHERE model=? AND name=? AND type=? AND context=?", key
+                ).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE comments SET last_used=? WHERE model=? AND name=? AND type=? AND context=?",
+                    [(now,) + key for key in found]
+                )
+                conn.commit()
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for comment in results if comment is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def get(self, model, name, bq_type, context=""):
+        return self.get_many(model, [(name, bq_type)], context)[0]
+
+    def put_many(self, model, entries, context=""):
+        """Stores [(name, bq_type, comment), ...]; empty comments are not cached."""
+        now = time.time()
+        rows = [
+            self._key(model, name, bq_type, context) + (comment, now)
+            for name, bq_type, comment in entries
+            if comment
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO comments (model, name, type, context, comment, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def put(self, model, name, bq_type, comment, context=""):
+        self.put_many(model, [(name, bq_type, comment)], context)
+
+    def _evict(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM comments WHERE rowid IN"
+                " (SELECT rowid FROM comments ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM comments")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "enabled": COMMENT_CACHE_ENABLED,
+                "path": self.path,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+comment_cache = CommentCache()
@@ -0,0 +1,381 @@
+# src/ddl_parser.py
+
+import re
+
+from src.instrumentation import span
+
+# One alternation, compiled once; scanning with finditer is a single linear pass.
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>(?:--|\#(?=\s))[^\n]*)
+  | (?P<block_comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>[Nn]?'(?:[^'\\]|\\.|'')*(?:'|\Z))
+  | (?P<dquote>"(?:[^"]|"")*(?:"|\Z))
+  | (?P<bquote>`(?:[^`]|``)*(?:`|\Z))
+  | (?P<bracket>\[[^\]]*(?:\]|\Z))
+  | (?P<number>\d+(?:\.\d*)?)
+  | (?P<word>[^\W\d][\w$\#]*|[\#@][\w$\#]+)
+  | (?P<punct>.)
+""", re.S | re.X)
+
+_SKIPPED_KINDS = {"ws", "line_comment", "block_comment"}
+# MySQL accepts COMMENT "..." as well as COMMENT '...'
+_COMMENT_KINDS = ("string", "dquote")
+
+# Words that end a column's type and start its attributes
+_COLUMN_ATTRIBUTE_WORDS = {
+    "NOT", "NULL", "DEFAULT", "PRIMARY", "UNIQUE", "REFERENCES", "CHECK",
+    "COMMENT", "CONSTRAINT", "COLLATE", "GENERATED", "AUTO_INCREMENT",
+    "AUTOINCREMENT", "IDENTITY", "ON", "AS", "CHARSET", "SPARSE", "ROWGUIDCOL",
+    "FILESTREAM", "MASKED", "VISIBLE", "INVISIBLE", "ENABLE", "DISABLE",
+    "STORAGE", "COMPRESSION", "COLUMN_FORMAT", "SRID", "ENCRYPTED", "KEY",
+}
+
+# Words that start a table-level element rather than a column definition
+_TABLE_CONSTRAINT_WORDS = {
+    "CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK", "EXCLUDE", "PERIOD", "LIKE",
+}
+_INDEX_WORDS = {"KEY", "INDEX", "FULLTEXT", "SPATIAL"}
+
+
+class Token:
+    __slots__ = ("kind", "value", "upper")
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+        self.upper = value.upper() if kind == "word" else None
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.value!r})"
+
+
+def _unquote(kind, text):
+    if kind == "string":
+        if text[0] in "Nn":
+            text = text[1:]
+        body = text[1:-1] if len(text) > 1 and text.endswith("'") else text[1:]
+        return body.replace("''", "'").replace("\\'", "'").replace("\\\\", "\\")
+    if kind == "dquote":
+        return text[1:-1].replace('""', '"')
+    if kind == "bquote":
+        return text[1:-1].replace("``", "`")
+    if kind == "bracket":
+        return text[1:-1]
+    return text
+
+
+def tokenize(text):
+    """
+    Splits SQL text into tokens, dropping whitespace and comments.
+    Quoted identifiers and string literals are unquoted; their kind is kept
+    ("dquote", "bquote", "bracket", "string") so callers can tell them apart.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind in _SKIPPED_KINDS:
+            continue
+        tokens.append(Token(kind, _unquote(kind, match.group())))
+    return tokens
+
+
+def is_identifier(token):
+    return token.kind in ("word", "dquote", "bquote", "bracket")
+
+
+def is_punct(token, value):
+    return token.kind == "punct" and token.value == value
+
+
+def is_word(token, *words):
+    return token.kind == "word" and token.upper in words
+
+
+def _skip_to_element_end(tokens, i):
+    """Advances past one list element; stops on ',' or ')' at depth zero."""
+    depth = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        if token.kind == "punct":
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                if depth == 0:
+                    return i
+                depth -= 1
+            elif token.value == "," and depth == 0:
+                return i
+            elif token.value == ";" and depth == 0:
+                return i
+        i += 1
+    return i
+
+
+def _parse_parenthesized(tokens, i):
+    """Parses '( ... )' starting at tokens[i]; returns (inner text, next index)."""
+    depth = 0
+    parts = []
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        if is_punct(token, "("):
+            depth += 1
+            if depth > 1:
+                parts.append("(")
+        elif is_punct(token, ")"):
+            depth -= 1
+            if depth == 0:
+                return "".join(parts), i + 1
+            parts.append(")")
+        elif depth >= 1:
+            if is_punct(token, ","):
+                parts.append(",")
+            elif token.kind == "string":
+                parts.append("'" + token.value.replace("'", "''") + "'")
+            else:
+                if parts and parts[-1] not in ("(", ","):
+                    parts.append(" ")
+                parts.append(token.value)
+        i += 1
+    return "".join(parts), i
+
+
+def _looks_like_index(tokens, i, end):
+    """
+    Tells a MySQL index definition ('KEY idx (col)') from a column that happens
+    to be named key/index ('key VARCHAR(10)').
+    """
+    if i + 1 < end and is_punct(tokens[i + 1], "("):
+        return True
+    if i + 1 < end and tokens[i + 1].kind in ("dquote", "bquote", "bracket"):
+        return True
+    for j in range(i + 1, end):
+        if is_punct(tokens[j], "("):
+            following = tokens[j + 1] if j + 1 < end else None
+            return not (following is not None and (following.kind == "number" or is_word(following, "MAX")))
+    return False
+
+
+def parse_column(tokens, i, end):
+    """Parses one column definition in tokens[i:end]; returns a column dict or None."""
+    name_token = tokens[i]
+    if not is_identifier(name_token):
+        return None
+    i += 1
+
+    # Type: words plus optional (params) and array suffixes, up to the first attribute
+    type_parts = []
+    while i < end:
+        token = tokens[i]
+        if token.kind == "word":
+            if token.upper in _COLUMN_ATTRIBUTE_WORDS:
+                break
+            if token.upper == "CHARACTER" and i + 1 < end and is_word(tokens[i + 1], "SET"):
+                break
+            type_parts.append(token.value)
+            i += 1
+        elif is_punct(token, "("):
+            params, i = _parse_parenthesized(tokens, i)
+            if type_parts:
+                type_parts[-1] += f"({params})"
+        elif token.kind == "bracket" and (token.value == "" or token.value.isdigit()):
+            # PostgreSQL array suffix, e.g. int[] or text[3]
+            if type_parts:
+                type_parts[-1] += "[]"
+            i += 1
+        elif token.kind in ("dquote", "bquote", "bracket") and not type_parts:
+            # Quoted type name, e.g. "public"."my_enum"
+            type_parts.append(token.value)
+            i += 1
+        elif is_punct(token, ".") and type_parts:
+            i += 1
+            if i < end and is_identifier(tokens[i]):
+                type_parts[-1] += "." + tokens[i].value
+                i += 1
+        else:
+            break
+
+    nullable = True
+    comment = ""
+    while i < end:
+        token = tokens[i]
+        if is_word(token, "NOT") and i + 1 < end and is_word(tokens[i + 1], "NULL"):
+            nullable = False
+            i += 2
+        elif is_word(token, "COMMENT"):
+            i += 1
+            if i < end and is_punct(tokens[i], "="):
+                i += 1
+            if i < end and tokens[i].kind in _COMMENT_KINDS:
+                comment = tokens[i].value
+                i += 1
+        elif is_punct(token, "("):
+            _, i = _parse_parenthesized(tokens, i)
+        else:
+            i += 1
+
+    return {
+        "name": name_token.value,
+        "type": " ".join(type_parts),
+        "nullable": nullable,
+        "comment": comment
+    }
+
+
+def parse_qualified_name(tokens, i):
+    """Parses a dotted, optionally quoted name; returns (parts, next index)."""
+    parts = []
+    n = len(tokens)
+    while i < n and is_identifier(tokens[i]):
+        parts.append(tokens[i].value)
+        i += 1
+        if i < n and is_punct(tokens[i], "."):
+            i += 1
+        else:
+            break
+    return parts, i
+
+
+def _find_create_table(tokens, i):
+    """Returns the index just past 'CREATE ... TABLE [IF NOT EXISTS]', or -1."""
+    n = len(tokens)
+    while i < n:
+        if is_word(tokens[i], "CREATE"):
+            j = i + 1
+            # OR REPLACE, TEMPORARY, GLOBAL TEMPORARY, UNLOGGED, ...
+            while j < n and tokens[j].kind == "word" and tokens[j].upper != "TABLE" and j - i <= 4:
+                j += 1
+            if j < n and is_word(tokens[j], "TABLE"):
+                j += 1
+                if j + 2 < n and is_word(tokens[j], "IF") and is_word(tokens[j + 1], "NOT") \
+                        and is_word(tokens[j + 2], "EXISTS"):
+                    j += 3
+                return j
+        i += 1
+    return -1
+
+
+def parse_column_list(tokens, i):
+    """
+    Parses a parenthesized column/constraint list starting at tokens[i] == '('.
+    Returns (columns, index after the closing paren).
+    """
+    columns = []
+    n = len(tokens)
+    i += 1
+    while i < n:
+        if is_punct(tokens[i], ")"):
+            return columns, i + 1
+        if is_punct(tokens[i], ";"):
+            return columns, i
+        end = _skip_to_element_end(tokens, i)
+        token = tokens[i]
+        is_constraint = token.kind == "word" and (
+            token.upper in _TABLE_CONSTRAINT_WORDS
+            or (token.upper in _INDEX_WORDS and _looks_like_index(tokens, i, end))
+        )
+        if not is_constraint and end > i:
+            column = parse_column(tokens, i, end)
+            if column is not None:
+                columns.append(column)
+        i = end
+        if i < n and is_punct(tokens[i], ","):
+            i += 1
+    return columns, i
+
+
+def _parse_table_options(tokens, i):
+    """Reads table options up to ';'; returns (table comment or None, next index)."""
+    comment = None
+    n = len(tokens)
+    while i < n and not is_punct(tokens[i], ";"):
+        if is_word(tokens[i], "COMMENT"):
+            j = i + 1
+            if j < n and is_punct(tokens[j], "="):
+                j += 1
+            if j < n and tokens[j].kind in _COMMENT_KINDS:
+                comment = tokens[j].value
+                i = j
+        elif is_word(tokens[i], "CREATE"):
+            break
+        i += 1
+    return comment, i
+
+
+def parse_create_table(tokens, start=0):
+    """
+    Parses the first CREATE TABLE statement at or after tokens[start].
+    Returns (schema dict, index after the statement), or (None, start) when
+    there is no CREATE TABLE.
+    """
+    i = _find_create_table(tokens, start)
+    if i < 0:
+        return None, start
+    name_parts, i = parse_qualified_name(tokens, i)
+    db = schema_name = None
+    if len(name_parts) >= 3:
+        db, schema_name, table_name = name_parts[-3:]
+    elif len(name_parts) == 2:
+        schema_name, table_name = name_parts
+    elif name_parts:
+        table_name = name_parts[0]
+    else:
+        table_name = "extracted_table"
+
+    columns = []
+    n = len(tokens)
+    # Skip anything between the name and the column list (e.g. Oracle SHARING=...)
+    while i < n and not is_punct(tokens[i], "(") and not is_punct(tokens[i], ";"):
+        if is_word(tokens[i], "AS"):
+            break
+        i += 1
+    if i < n and is_punct(tokens[i], "("):
+        columns, i = parse_column_list(tokens, i)
+    table_comment, i = _parse_table_options(tokens, i)
+    if i < n and is_punct(tokens[i], ";"):
+        i += 1
+
+    schema = {
+        "table_name": table_name,
+        "columns": columns,
+        "db": db or "sourcedb",
+        "schema": schema_name or "sourceschema",
+        "table_comment": table_comment or "Extracted from DDL",
+        "msg": "Columns parsed successfully" if columns else "Failed to parse columns"
+    }
+    return schema, i
+
+
+def extract_json_schema_from_ddl(source_ddl):
+    """
+    Extracts table name, database, schema, and columns from source DDL.
+    Supports:
+      CREATE TABLE ...
+      CREATE OR REPLACE TABLE ...
+      Formats: db.schema.table, schema.table, table
+    Quoted identifiers, nested parentheses, constraints, defaults and
+    comments are handled by a tokenizer and a recursive-descent parser.
+    Returns a dictionary with table_name, db, schema, columns, table_comment.
+    """
+    with span("parse"):
+        tokens = tokenize(source_ddl)
+        schema, _ = parse_create_table(tokens)
+        if schema is not None:
+            return schema
+
+        # No CREATE TABLE header: try the first parenthesized list as a column list
+        columns = []
+        for i, token in enumerate(tokens):
+            if is_punct(token, "("):
+                columns, _ = parse_column_list(tokens, i)
+                break
+        return {
+            "table_name": "extracted_table",
+            "columns": columns,
+            "db": "sourcedb",
+            "schema": "sourceschema",
+            "table_comment": "Extracted from DDL",
+            "msg": "Columns parsed successfully" if columns else "Failed to parse columns"
+        }
@@ -0,0 +1,311 @@
+# src/ddl_stream.py
+
+import re
+
+from src.ddl_parser import (
+    tokenize,
+    parse_create_table,
+    parse_column,
+    parse_qualified_name,
+    is_word,
+    is_punct
+)
+
+_DELIMITER_LINE_RE = re.compile(r"^\s*DELIMITER\s+(\S+)\s*$", re.IGNORECASE)
+# SSMS batch separator and SQL*Plus block terminator, each on a line of its own
+_SEPARATOR_LINE_RE = re.compile(r"^\s*(?:GO(?:\s+\d+)?|/)\s*$", re.IGNORECASE)
+
+# Comments and whitespace before a statement's first keyword (pg_dump writes a "-- Name: ..." block before each)
+_LEADING_COMMENTS_RE = re.compile(r"(?:\s+|--[^\n]*|#[^\n]*|/\*(?!!).*?\*/)*", re.DOTALL)
+
+# SSMS "Script Database" writes these before every object
+_SSMS_SET_STATEMENTS = ("SET ANSI_NULLS", "SET QUOTED_IDENTIFIER")
+
+_QUOTE_CLOSE_RES = {
+    "'": re.compile(r"\\.|''|'"),
+    '"': re.compile(r'""|"'),
+    "`": re.compile(r"``|`"),
+}
+
+
+def _special_re(delimiter):
+    # The delimiter goes first so a MySQL "DELIMITER $$" is not read as a dollar quote
+    return re.compile(re.escape(delimiter) + r"|'|\"|`|--|#(?=\s)|/\*|\$[A-Za-z_]*\$")
+
+
+def iter_sql_statements(stream):
+    """
+    Yields SQL statements one at a time from a text or binary stream.
+    The stream is read line by line, so only the current statement is held in
+    memory. Statements end at the delimiter (';' or one set with MySQL's
+    DELIMITER), at a 'GO' line (SSMS) or at a '/' line (SQL*Plus). Delimiters
+    inside strings, quoted identifiers, comments and $$-quoted bodies are ignored.
+    """
+    delimiter = ";"
+    special = _special_re(delimiter)
+    parts = []
+    state = None  # None, a quote char, "*/" for block comments, or a $tag$
+
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        if state is None:
+            delimiter_match = _DELIMITER_LINE_RE.match(line)
+            if delimiter_match and not "".join(parts).strip():
+                delimiter = delimiter_match.group(1)
+                special = _special_re(delimiter)
+                continue
+            if _SEPARATOR_LINE_RE.match(line):
+                statement = "".join(parts).strip()
+                parts = []
+                if statement:
+                    yield statement
+                continue
+
+        pos = 0
+        start = 0
+        length = len(line)
+        while pos < length:
+            if state is None:
+                match = special.search(line, pos)
+                if match is None:
+                    break
+                token = match.group()
+                pos = match.end()
+                if token == delimiter:
+                    parts.append(line[start:match.start()])
+                    statement = "".join(parts).strip()
+                    parts = []
+                    start = pos
+                    if statement:
+                        yield statement
+                elif token in ("--", "#"):
+                    break
+                elif token == "/*":
+                    state = "*/"
+                elif token in _QUOTE_CLOSE_RES:
+                    state = token
+                else:
+                    state = token  # dollar-quote tag
+            elif state in _QUOTE_CLOSE_RES:
+                closed = False
+                for match in _QUOTE_CLOSE_RES[state].finditer(line, pos):
+                    if match.group() == state:
+                        pos = match.end()
+                        closed = True
+                        break
+                if not closed:
+                    pos = length
+                else:
+                    state = None
+            else:
+                end = line.find(state, pos)
+                if end < 0:
+                    pos = length
+                else:
+                    pos = end + len(state)
+                    state = None
+        parts.append(line[start:])
+
+    statement = "".join(parts).strip()
+    if statement:
+        yield statement
+
+
+def _name_matches(schema, name_parts):
+    if not name_parts:
+        return False
+    if name_parts[-1].lower() != schema["table_name"].lower():
+        return False
+    if len(name_parts) >= 2 and schema.get("schema") not in (None, "sourceschema"):
+        return name_parts[-2].lower() == schema["schema"].lower()
+    return True
+
+
+def _set_column_comment(schema, column_name, comment):
+    for col in schema["columns"]:
+        if col["name"].lower() == column_name.lower():
+            col["comment"] = comment
+            return
+
+
+def _apply_comment_on(schema, tokens):
+    """COMMENT ON TABLE t IS '...' / COMMENT ON COLUMN t.c IS '...'"""
+    if len(tokens) < 5 or not is_word(tokens[2], "TABLE", "COLUMN"):
+        return
+    target = tokens[2].upper
+    name_parts, i = parse_qualified_name(tokens, 3)
+    if i + 1 >= len(tokens) or not is_word(tokens[i], "IS") or tokens[i + 1].kind != "string":
+        return
+    comment = tokens[i + 1].value
+    if target == "TABLE" and _name_matches(schema, name_parts):
+        schema["table_comment"] = comment
+    elif target == "COLUMN" and len(name_parts) >= 2 and _name_matches(schema, name_parts[:-1]):
+        _set_column_comment(schema, name_parts[-1], comment)
+
+
+def _apply_alter_table(schema, tokens):
+    """ALTER TABLE t COMMENT = '...' / ALTER TABLE t MODIFY|CHANGE [COLUMN] ... COMMENT '...'"""
+    name_parts, i = parse_qualified_name(tokens, 2)
+    if not _name_matches(schema, name_parts):
+        return
+    n = len(tokens)
+    while i < n:
+        if is_word(tokens[i], "COMMENT"):
+            j = i + 1
+            if j < n and is_punct(tokens[j], "="):
+                j += 1
+            if j < n and tokens[j].kind in ("string", "dquote"):
+                schema["table_comment"] = tokens[j].value
+            i = j + 1
+        elif is_word(tokens[i], "MODIFY", "CHANGE"):
+            is_change = tokens[i].upper == "CHANGE"
+            i += 1
+            if i < n and is_word(tokens[i], "COLUMN"):
+                i += 1
+            if is_change:
+                i += 1  # old column name
+            end = i
+            depth = 0
+            while end < n and not (depth == 0 and is_punct(tokens[end], ",")):
+                if is_punct(tokens[end], "("):
+                    depth += 1
+                elif is_punct(tokens[end], ")"):
+                    depth -= 1
+                end += 1
+            if i < end:
+                column = parse_column(tokens, i, end)
+                if column is not None and column["comment"]:
+                    _set_column_comment(schema, column["name"], column["comment"])
+            i = end + 1
+        else:
+            i += 1
+
+
+def _extended_property_args(tokens):
+    """SQL Server: EXEC sp_addextendedproperty @name=N'MS_Description', @value=N'...', ..."""
+    args = {}
+    n = len(tokens)
+    for i in range(n - 2):
+        if tokens[i].kind == "word" and tokens[i].value.startswith("@") and is_punct(tokens[i + 1], "="):
+            value_token = tokens[i + 2]
+            args[tokens[i].value[1:].lower()] = value_token.value
+    if not args:
+        # Positional form: 'MS_Description', 'value', 'SCHEMA', 'dbo', 'TABLE', 't', 'COLUMN', 'c'
+        values = [t.value for t in tokens if t.kind == "string"]
+        keys = ["name", "value", "level0type", "level0name", "level1type", "level1name", "level2type", "level2name"]
+        args = dict(zip(keys, values))
+    return args
+
+
+def _apply_extended_property(schema, tokens):
+    args = _extended_property_args(tokens)
+    if args.get("name", "").upper() != "MS_DESCRIPTION":
+        return
+    if (args.get("level1type") or "").upper() != "TABLE":
+        return
+    name_parts = [args.get("level0name") or "", args.get("level1name") or ""]
+    if not _name_matches(schema, [p for p in name_parts if p]):
+        return
+    if (args.get("level2type") or "").upper() == "COLUMN":
+        _set_column_comment(schema, args.get("level2name") or "", args.get("value") or "")
+    elif not args.get("level2type"):
+        schema["table_comment"] = args.get("value") or ""
+
+
+def _is_extended_property(tokens):
+    return is_word(tokens[0], "EXEC", "EXECUTE") and any(
+        t.kind == "word" and t.upper.endswith("SP_ADDEXTENDEDPROPERTY") for t in tokens[:4]
+    )
+
+
+def _apply_statement(schema, tokens):
+    if is_word(tokens[0], "COMMENT") and len(tokens) > 1 and is_word(tokens[1], "ON"):
+        _apply_comment_on(schema, tokens)
+    elif is_word(tokens[0], "ALTER") and len(tokens) > 2 and is_word(tokens[1], "TABLE"):
+        _apply_alter_table(schema, tokens)
+    elif _is_extended_property(tokens):
+        _apply_extended_property(schema, tokens)
+
+
+def _statement_table(tokens):
+    """Lower-cased name of the table a comment statement targets, or None."""
+    if is_word(tokens[0], "COMMENT") and len(tokens) > 3 and is_word(tokens[2], "TABLE", "COLUMN"):
+        name_parts, _ = parse_qualified_name(tokens, 3)
+        if tokens[2].upper == "COLUMN":
+            name_parts = name_parts[:-1]
+    elif is_word(tokens[0], "ALTER") and len(tokens) > 2 and is_word(tokens[1], "TABLE"):
+        name_parts, _ = parse_qualified_name(tokens, 2)
+    elif _is_extended_property(tokens):
+        name_parts = [_extended_property_args(tokens).get("level1name") or ""]
+    else:
+        return None
+    return name_parts[-1].lower() if name_parts and name_parts[-1] else None
+
+
+def _is_create_table(tokens):
+    if not tokens or not is_word(tokens[0], "CREATE"):
+        return False
+    for token in tokens[1:6]:
+        if is_word(token, "TABLE"):
+            return True
+    return False
+
+
+def iter_ddl_schemas(stream):
+    """
+    Yields one schema dict per CREATE TABLE statement in a DDL dump
+    (mysqldump, pg_dump --schema-only, SSMS "Script Database", Oracle DBMS_METADATA).
+    COMMENT ON, ALTER TABLE ... COMMENT and sp_addextendedproperty statements are
+    merged into the table they name.
+
+    Most dumps put comments right after their table, so tables are yielded one
+    at a time and only the current one is held. SSMS scripts write all
+    extended properties after the last table; once a SET ANSI_NULLS or SET
+    QUOTED_IDENTIFIER statement marks the dump as one, every table is kept in a
+    by-name index and yielded at the end, so memory grows with the number of
+    tables. Elsewhere, comments for a table that has already been yielded are
+    ignored.
+    """
+    pending = None
+    held = None  # SSMS scripts: every table in dump order
+    index = {}  # table name -> held schemas
+    for statement in iter_sql_statements(stream):
+        start = _LEADING_COMMENTS_RE.match(statement).end()
+        head = statement[start:start + 64].upper()
+        if held is None and head.startswith(_SSMS_SET_STATEMENTS):
+            held = []
+            if pending is not None:
+                held.append(pending)
+                index.setdefault(pending["table_name"].lower(), []).append(pending)
+            continue
+        if not head.startswith(("CREATE", "COMMENT", "ALTER", "EXEC")):
+            continue
+        tokens = tokenize(statement)
+        if not tokens:
+            continue
+        if _is_create_table(tokens):
+            schema, _ = parse_create_table(tokens)
+            if schema is None:
+                continue
+            if held is not None:
+                held.append(schema)
+                index.setdefault(schema["table_name"].lower(), []).append(schema)
+            elif pending is not None:
+                yield pending
+            pending = schema
+        elif held is not None:
+            for candidate in index.get(_statement_table(tokens), ()):
+                _apply_statement(candidate, tokens)
+        elif pending is not None:
+            _apply_statement(pending, tokens)
+    if held is not None:
+        yield from held
+    elif pending is not None:
+        yield pending
+
+
+def iter_ddl_file_schemas(path, encoding="utf-8"):
+    """Streams schema dicts from a DDL dump file on disk."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        yield from iter_ddl_schemas(f)
@@ -0,0 +1,149 @@
+# src/diff.py
+
+from src.mapping import map_types
+
+# Legacy names used by `bq show --schema` and the BigQuery API
+_LEGACY_BQ_TYPES = {
+    "INTEGER": "INT64",
+    "FLOAT": "FLOAT64",
+    "BOOLEAN": "BOOL",
+    "RECORD": "STRUCT",
+}
+
+# Column type changes BigQuery applies in place with ALTER COLUMN SET DATA TYPE
+_WIDENINGS = {
+    "INT64": ("NUMERIC", "BIGNUMERIC", "FLOAT64"),
+    "NUMERIC": ("BIGNUMERIC", "FLOAT64"),
+}
+
+
+def bigquery_columns(bq_schema):
+    """
+    Reads a BigQuery schema as exported by `bq show --schema` (a list of
+    fields), a {"fields": [...]} object or a table resource {"schema": {"fields": [...]}}
+    into [{"name", "type", "nullable", "comment"}] with standard SQL type names.
+    """
+    if isinstance(bq_schema, dict):
+        bq_schema = bq_schema.get("schema", bq_schema)
+        bq_schema = bq_schema.get("fields", []) if isinstance(bq_schema, dict) else bq_schema
+    columns = []
+    for field in bq_schema or []:
+        bq_type = str(field.get("type", "STRING")).upper()
+        bq_type = _LEGACY_BQ_TYPES.get(bq_type, bq_type)
+        mode = str(field.get("mode", "NULLABLE")).upper()
+        if mode == "REPEATED":
+            bq_type = f"ARRAY<{bq_type}>"
+        columns.append({
+            "name": field.get("name"),
+            "type": bq_type,
+            "nullable": mode != "REQUIRED",
+            "comment": field.get("description") or ""
+        })
+    return columns
+
+
+def _mapped(columns, dialect):
+    """Pairs each column with its BigQuery type."""
+    return list(zip(columns, map_types([col.get("type", "") for col in columns], dialect)))
+
+
+def diff_columns(old_columns, new_columns, old_dialect=None, new_dialect=None, old_is_bigquery=False):
+    """
+    Compares two column lists and returns a list of changes, each a dict with
+    "kind" (add, drop, set_description, drop_not_null, set_not_null, set_type),
+    "column" and the details needed to render it.
+    Columns are matched by case-insensitive name through a dict, so the
+    comparison is linear in the number of columns.
+    """
+    if old_is_bigquery:
+        old_mapped = [(col, col["type"]) for col in old_columns]
+    else:
+        old_mapped = _mapped(old_columns, old_dialect)
+    old_by_name = {str(col.get("name")).lower(): (col, bq_type) for col, bq_type in old_mapped}
+
+    changes = []
+    seen = set()
+    for col, bq_type in _mapped(new_columns, new_dialect):
+        key = str(col.get("name")).lower()
+        seen.add(key)
+        old = old_by_name.get(key)
+        comment = col.get("comment") or ""
+        nullable = col.get("nullable", True)
+        if old is None:
+            changes.append({"kind": "add", "column": col["name"], "type": bq_type,
+                            "nullable": nullable, "comment": comment})
+            continue
+        old_col, old_type = old
+        if old_type != bq_type:
+            changes.append({"kind": "set_type", "column": col["name"], "old_type": old_type, "type": bq_type})
+        # ARRAY columns are REPEATED in BigQuery and have no NOT NULL to change
+        repeated = bq_type.startswith("ARRAY<") or old_type.startswith("ARRAY<")
+        if nullable and not old_col.get("nullable", True) and not repeated:
+            changes.append({"kind": "drop_not_null", "column": col["name"]})
+        elif not nullable and old_col.get("nullable", True) and not repeated:
+            changes.append({"kind": "set_not_null", "column": col["name"]})
+        if comment != (old_col.get("comment") or ""):
+            changes.append({"kind": "set_description", "column": col["name"], "comment": comment})
+    for key, (old_col, _) in old_by_name.items():
+        if key not in seen:
+            changes.append({"kind": "drop", "column": old_col["name"]})
+    return changes
+
+
+def _alter_lines(full_table_name, changes, drop_columns=False):
+    for change in changes:
+        kind = change["kind"]
+        name = change["column"]
+        if kind == "add":
+            line = f"ALTER TABLE {full_table_name} ADD COLUMN IF NOT EXISTS {name} {change['type']}"
+            if change["comment"]:
+                line += f" OPTIONS(description=\"{change['comment']}\")"
+            yield line + ";"
+            if not change["nullable"] and not change["type"].startswith("ARRAY<"):
+                yield f"-- {name} is NOT NULL in the source; BigQuery can only add NULLABLE columns."
+        elif kind == "set_description":
+            yield f"ALTER TABLE {full_table_name} ALTER COLUMN {name} SET OPTIONS(description=\"{change['comment']}\");"
+        elif kind == "drop_not_null":
+            yield f"ALTER TABLE {full_table_name} ALTER COLUMN {name} DROP NOT NULL;"
+        elif kind == "set_not_null":
+            yield f"-- {name} became NOT NULL in the source; BigQuery cannot add NOT NULL to an existing column."
+        elif kind == "set_type":
+            if change["type"] in _WIDENINGS.get(change["old_type"], ()):
+                yield f"ALTER TABLE {full_table_name} ALTER COLUMN {name} SET DATA TYPE {change['type']};"
+            else:
+                yield (f"-- {name} changed type {change['old_type']} -> {change['type']}; "
+                       "BigQuery cannot convert it in place, the column must be rebuilt.")
+        elif kind == "drop":
+            statement = f"ALTER TABLE {full_table_name} DROP COLUMN IF EXISTS {name};"
+            yield statement if drop_columns else f"-- {name} no longer exists in the source: {statement}"
+
+
+def generate_bq_alter_ddl(table_name, old_schema, new_schema, dataset, dialect=None,
+                          old_is_bigquery=False, drop_columns=False):
+    """
+    Generates the ALTER TABLE statements that bring a BigQuery table created
+    from old_schema up to date with new_schema, instead of CREATE OR REPLACE.
+    old_schema is a schema dict from an earlier extraction (or snapshot) or,
+    with old_is_bigquery, a BigQuery schema JSON (see bigquery_columns).
+    Changes BigQuery cannot make in place are listed as SQL comments; dropped
+    columns are only dropped when drop_columns is set.
+    Returns an empty string when nothing changed.
+    """
+    if old_is_bigquery:
+        old_columns = bigquery_columns(old_schema)
+        # Only a full table resource carries the table description
+        is_resource = isinstance(old_schema, dict) and "schema" in old_schema
+        old_table_comment = (old_schema.get("description") or "") if is_resource else None
+    else:
+        old_columns = old_schema.get("columns", [])
+        old_table_comment = old_schema.get("table_comment") or ""
+    changes = diff_columns(old_columns, new_schema.get("columns", []), dialect, dialect, old_is_bigquery)
+
+    full_table_name = f"`{dataset}.{table_name}`" if dataset else f"`{table_name}`"
+    lines = list(_alter_lines(full_table_name, changes, drop_columns))
+    table_comment = new_schema.get("table_comment") or ""
+    # A bare field list carries no table description to compare against
+    if old_table_comment is not None and table_comment != old_table_comment:
+        lines.append(f"ALTER TABLE {full_table_name} SET OPTIONS(description=\"{table_comment}\");")
+    return "\n".join(lines)
+
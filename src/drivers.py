@@ -0,0 +1,43 @@
+# src/drivers.py
+
+import importlib
+import importlib.util
+
+# Optional modules imported on first use -> pip package that provides them
+DRIVER_PACKAGES = {
+    "mysql.connector": "mysql-connector-python",
+    "psycopg2": "psycopg2",
+    "pyodbc": "pyodbc",
+    "oracledb": "oracledb",
+    "gpt4all": "gpt4all",
+}
+
+
+class DriverNotInstalledError(ImportError):
+    """An optional database driver or the AI library is used but not installed."""
+
+
+def load_driver(module_name):
+    """
+    Imports an optional driver the first time it is needed, so the app starts
+    without it and deployments only pay for the drivers they use.
+    Raises DriverNotInstalledError naming the pip package when it is missing.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        # A missing dependency of an installed driver is a different problem
+        if e.name is None or not (module_name == e.name or module_name.startswith(e.name + ".")):
+            raise
+        package = DRIVER_PACKAGES.get(module_name, module_name)
+        raise DriverNotInstalledError(
+            f"{module_name} is not installed; install it with 'pip install {package}'"
+        ) from e
+
+
+def driver_installed(module_name):
+    """True when the module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        return False
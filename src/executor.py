@@ -0,0 +1,87 @@
+# src/executor.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.instrumentation import attached_trace, current_trace
+
+SOURCE_CONCURRENCY = int(os.environ.get("BQ_DDL_SOURCE_CONCURRENCY", "4"))
+# Upper bound on the thread pool a request may ask for with "workers"
+MAX_WORKERS = int(os.environ.get("BQ_DDL_MAX_WORKERS", "32"))
+
+_SOURCE_SEMAPHORES = {}
+_SOURCE_SEMAPHORES_LOCK = threading.Lock()
+
+
+def worker_count(value, default=SOURCE_CONCURRENCY):
+    """
+    Parses a requested worker count (default when empty), capped at MAX_WORKERS.
+    Raises ValueError when it is not a positive integer.
+    """
+    if value in (None, ""):
+        return default
+    try:
+        workers = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid workers: {value!r}")
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    return min(workers, MAX_WORKERS)
+
+
+def get_source_semaphore(source, limit=SOURCE_CONCURRENCY):
+    """
+    Returns the semaphore capping concurrent catalog queries against one source.
+    It is shared by every run in the process, so two batch runs against the
+    same server together stay under the cap.
+    """
+    with _SOURCE_SEMAPHORES_LOCK:
+        semaphore = _SOURCE_SEMAPHORES.get(source)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, limit))
+            _SOURCE_SEMAPHORES[source] = semaphore
+    return semaphore
+
+
+def run_concurrently(tasks, max_workers=SOURCE_CONCURRENCY, source=None):
+    """
+    Runs (label, fn) tasks on a thread pool.
+    Results keep the order of tasks, a failing task is reported in errors
+    without aborting the others, and stats carries throughput figures.
+    Returns {"results": [...], "errors": [{"label", "error"}], "stats": {...}}.
+    """
+    semaphore = get_source_semaphore(source) if source is not None else None
+    # Spans recorded by the workers count towards the calling request
+    trace = current_trace()
+
+    def run(fn):
+        with attached_trace(trace):
+            if semaphore is None:
+                return fn()
+            with semaphore:
+                return fn()
+
+    start = time.perf_counter()
+    results = []
+    errors = []
+    workers = max(1, min(max_workers, len(tasks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, fn) for _, fn in tasks]
+        for (label, _), future in zip(tasks, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append({"label": label, "error": str(e)})
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "tasks": len(tasks),
+        "succeeded": len(tasks) - len(errors),
+        "failed": len(errors),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "tasks_per_second": round(len(tasks) / elapsed, 2) if elapsed > 0 else None
+    }
+    return {"results": results, "errors": errors, "stats": stats}
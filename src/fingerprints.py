@@ -0,0 +1,115 @@
+# src/fingerprints.py
+
+import hashlib
+import json
+import os
+from functools import partial
+
+from src.executor import SOURCE_CONCURRENCY, run_concurrently
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def source_key(db_system, conn_details, database=None):
+    """Identifies a source database inside a fingerprint state file."""
+    return "|".join([
+        db_system,
+        str(conn_details.get('host') or ""),
+        str(conn_details.get('port') or ""),
+        str(database or conn_details.get('service_name') or "")
+    ])
+
+
+def get_table_fingerprints(db_system, conn_details, database=None, schema=None, max_workers=SOURCE_CONCURRENCY):
+    """
+    Returns {"<schema>.<table>": fingerprint} for a source database with one
+    catalog query per schema. For PostgreSQL and SQL Server all schemas are
+    scanned when schema is empty; Oracle needs the owner as schema.
+    A fingerprint changes whenever the table's columns, types, nullability or
+    comments change.
+    """
+    host = conn_details.get('host')
+    port = conn_details.get('port')
+    user = conn_details.get('user')
+    password = conn_details.get('password')
+
+    if db_system == "mysql":
+        from src.mysql_conn import get_mysql_table_fingerprints
+        tasks = [(database, partial(get_mysql_table_fingerprints, host, port, user, password, database))]
+    elif db_system == "postgresql":
+        from src.postgres_conn import get_postgres_schemas, get_postgres_table_fingerprints
+        schema_names = [schema] if schema else get_postgres_schemas(host, port, user, password, database)
+        tasks = [
+            (name, partial(get_postgres_table_fingerprints, host, port, user, password, database, name))
+            for name in schema_names
+        ]
+    elif db_system == "sqlserver":
+        from src.sqlserver_conn import get_sqlserver_schemas, get_sqlserver_table_fingerprints
+        schema_names = [schema] if schema else get_sqlserver_schemas(host, port, user, password, database)
+        tasks = [
+            (name, partial(get_sqlserver_table_fingerprints, host, port, user, password, database, name))
+            for name in schema_names
+        ]
+    elif db_system == "oracle":
+        from src.oracle_conn import get_oracle_table_fingerprints
+        service_name = conn_details.get('service_name') or database
+        tasks = [(schema, partial(get_oracle_table_fingerprints, host, port, user, password, service_name, schema))]
+    else:
+        raise ValueError(f"Unsupported source system: {db_system}")
+
+    outcome = run_concurrently(tasks, max_workers=max_workers, source=(db_system, host, str(port)))
+    if outcome["errors"]:
+        error = outcome["errors"][0]
+        raise RuntimeError(f"Fingerprinting {error['label']} failed: {error['error']}")
+    fingerprints = {}
+    for (schema_name, _), result in zip(tasks, outcome["results"]):
+        for table_name, text in result.items():
+            fingerprints[f"{schema_name}.{table_name}"] = _hash(text)
+    return fingerprints
+
+
+def diff_fingerprints(current, previous):
+    """
+    Compares two {"<schema>.<table>": fingerprint} maps.
+    Returns {"changed": [...], "added": [...], "removed": [...], "unchanged": count}.
+    """
+    previous = previous or {}
+    changed = []
+    added = []
+    unchanged = 0
+    for key, value in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.append(key)
+        elif old != value:
+            changed.append(key)
+        else:
+            unchanged += 1
+    removed = [key for key in previous if key not in current]
+    return {"changed": sorted(changed), "added": sorted(added), "removed": sorted(removed), "unchanged": unchanged}
+
+
+def tables_by_schema(keys):
+    """Groups "<schema>.<table>" keys into {schema: [table, ...]}."""
+    grouped = {}
+    for key in keys:
+        schema_name, _, table_name = key.partition(".")
+        grouped.setdefault(schema_name, []).append(table_name)
+    return grouped
+
+
+def load_fingerprints(path):
+    """Reads a fingerprint state file ({source_key: {table: fingerprint}}); missing files are empty."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fingerprints(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,329 @@
+# src/instrumentation.py
+
+import bisect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-request profiling is only honoured when this is enabled
+PROFILING_ENABLED = os.environ.get("BQ_DDL_PROFILE", "0").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get(
+    "BQ_DDL_PROFILE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles")
+)
+# "cprofile" or "pyinstrument" (when installed)
+PROFILER = os.environ.get("BQ_DDL_PROFILER", "cprofile").lower()
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Process-wide counters and duration histograms, rendered in the
+    Prometheus text exposition format. Collectors registered with
+    add_collector report values other modules already track (cache stats).
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {labels: value}
+        self._histograms = {}  # name -> {labels: [per-bucket counts..., +Inf count, sum, count]}
+        self._help = {}
+        self._collectors = []
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        self.observe_series(name, tuple(sorted(labels.items())), seconds)
+
+    def observe_series(self, name, key, seconds):
+        """observe() for a label key already built as a sorted tuple of (label, value) pairs."""
+        # Only the bucket the value falls in is counted; render() accumulates them
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.get(name)
+            if series is None:
+                series = self._histograms[name] = {}
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[idx] += 1
+            state[-2] += seconds
+            state[-1] += 1
+
+    def add_collector(self, collector):
+        """collector() returns [(name, type, help, {labels}, value), ...] when /metrics is scraped."""
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+        for name in sorted(counters):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name in sorted(histograms):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, state in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), state[:len(self.buckets) + 1]):
+                    cumulative += count
+                    bucket_labels = labels + (("le", _format_value(float(bound))),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {state[-1]}")
+        # Samples of one metric must be listed together, whichever collector reported them
+        families = {}
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+                continue
+            for name, metric_type, help_text, labels, value in samples:
+                if value is None:
+                    continue
+                family = families.setdefault(name, (metric_type, help_text, []))
+                family[2].append((labels, value))
+        for name, (metric_type, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("bq_ddl_phase_seconds", "Time spent per phase (connect, catalog, parse, map, render, ...)")
+metrics.describe("bq_ddl_requests_total", "HTTP requests by endpoint, method and status")
+metrics.describe("bq_ddl_request_seconds", "HTTP request duration by endpoint")
+metrics.describe("bq_ddl_source_connects_total", "Source database connections opened by the pools")
+
+
+# Spans
+
+_local = threading.local()
+
+
+class Trace:
+    """The spans recorded while handling one request, including work it hands to pool threads."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = []  # (phase, seconds, labels)
+
+    def totals(self):
+        """Returns {phase: (total seconds, count)} in first-seen order."""
+        totals = {}
+        for phase, seconds, _ in self.spans:
+            total, count = totals.get(phase, (0.0, 0))
+            totals[phase] = (total + seconds, count + 1)
+        return totals
+
+    def server_timing(self):
+        """A Server-Timing header value, so browser dev tools show the phase breakdown."""
+        parts = [
+            f"{phase};dur={total * 1000:.1f};desc=\"{count}x\""
+            for phase, (total, count) in self.totals().items()
+        ]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_trace():
+    _local.trace = Trace()
+    return _local.trace
+
+
+def end_trace():
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    return trace
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def attached_trace(trace):
+    """Records spans of the current thread into trace, e.g. in a worker running part of a request."""
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    try:
+        yield
+    finally:
+        _local.trace = previous
+
+
+class span:
+    """
+    Times a block as one phase. The duration goes to the
+    bq_ddl_phase_seconds histogram and, inside a request, to its trace.
+    A class rather than a generator context manager, to keep the overhead
+    small on short phases.
+    """
+
+    __slots__ = ("phase", "labels", "key", "start")
+
+    def __init__(self, phase, **labels):
+        self.phase = phase
+        self.labels = labels
+        self.key = tuple(sorted(dict(labels, phase=phase).items())) if labels else (("phase", phase),)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        metrics.observe_series("bq_ddl_phase_seconds", self.key, seconds)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.spans.append((self.phase, seconds, self.labels))
+        return False
+
+
+def record_phases(timings):
+    """
+    Records {phase: seconds} the caller measured itself as one span each, such
+    as map and render time summed over a batch of tables streamed out between renders.
+    """
+    trace = getattr(_local, "trace", None)
+    for phase, seconds in timings.items():
+        metrics.observe_series("bq_ddl_phase_seconds", (("phase", phase),), seconds)
+        if trace is not None:
+            trace.spans.append((phase, seconds, {}))
+
+
+# Profiling
+
+_PROFILE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class RequestProfiler:
+    """Profiles one request with cProfile (or pyinstrument) and writes the result under PROFILE_DIR."""
+
+    def __init__(self, name, profiler=PROFILER):
+        self.name = _PROFILE_NAME_RE.sub("_", name).strip("_") or "request"
+        self.kind = profiler
+        self._profiler = None
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                self.kind = "cprofile"
+        if self._profiler is None:
+            import cProfile
+            self.kind = "cprofile"
+            self._profiler = cProfile.Profile()
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        """Stops profiling and returns the path of the dump."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            path = os.path.join(PROFILE_DIR, f"{stamp}_{self.name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            path = os.path.join(PROFILE_DIR, f"{stamp}_{self.name}.prof")
+            self._profiler.dump_stats(path)
+        return path
+
+
+# Collectors for the caches that keep their own statistics
+
+def _cache_samples():
+    from src.mapping import map_type_to_bigquery
+    from src.metadata_cache import metadata_cache
+    from src.pool import pool_stats
+
+    help_hits = "Cache hits by cache"
+    help_misses = "Cache misses by cache"
+    metadata = metadata_cache.stats()
+    mapping = map_type_to_bigquery.cache_info()
+    samples = [
+        ("bq_ddl_cache_hits_total", "counter", help_hits, {"cache": "metadata"}, metadata["hits"]),
+        ("bq_ddl_cache_hits_total", "counter", help_hits, {"cache": "metadata_disk"}, metadata["disk_hits"]),
+        ("bq_ddl_cache_hits_total", "counter", help_hits, {"cache": "type_mapping"}, mapping.hits),
+        ("bq_ddl_cache_misses_total", "counter", help_misses, {"cache": "metadata"}, metadata["misses"]),
+        ("bq_ddl_cache_misses_total", "counter", help_misses, {"cache": "type_mapping"}, mapping.misses),
+        ("bq_ddl_cache_entries", "gauge", "Entries held by cache", {"cache": "metadata"}, metadata["entries"]),
+        ("bq_ddl_cache_entries", "gauge", "Entries held by cache", {"cache": "type_mapping"}, mapping.currsize),
+    ]
+    pools = pool_stats()
+    samples += [
+        ("bq_ddl_pool_connections", "gauge", "Pooled source connections by state", {"state": "idle"}, pools["idle"]),
+        ("bq_ddl_pool_connections", "gauge", "Pooled source connections by state", {"state": "in_use"},
+         pools["in_use"]),
+    ]
+    return samples
+
+
+def _ai_samples():
+    # Only report the AI modules once something has imported them (the batch CLI never does)
+    import sys
+    samples = []
+    comment_cache_module = sys.modules.get("src.comment_cache")
+    if comment_cache_module is not None:
+        stats = comment_cache_module.comment_cache.stats()
+        samples += [
+            ("bq_ddl_cache_hits_total", "counter", "Cache hits by cache", {"cache": "comments"}, stats["hits"]),
+            ("bq_ddl_cache_misses_total", "counter", "Cache misses by cache", {"cache": "comments"},
+             stats["misses"]),
+        ]
+    model_manager_module = sys.modules.get("src.model_manager")
+    if model_manager_module is not None:
+        stats = model_manager_module.model_manager.stats()
+        samples += [
+            ("bq_ddl_model_loads_total", "counter", "GPT4All model loads", {}, stats["loads"]),
+            ("bq_ddl_model_evictions_total", "counter", "GPT4All models unloaded to make room", {},
+             stats["evictions"]),
+            ("bq_ddl_cache_hits_total", "counter", "Cache hits by cache", {"cache": "models"}, stats["hits"]),
+            ("bq_ddl_models_loaded", "gauge", "GPT4All models resident in memory", {}, len(stats["loaded"])),
+        ]
+    return samples
+
+
+metrics.add_collector(_cache_samples)
+metrics.add_collector(_ai_samples)
@@ -1,28 +1,240 @@
 # src/mapping.py
 
+import re
+from functools import lru_cache, partial
+
 TYPE_MAPPING = {
     "INTEGER": "INT64",
     "INT": "INT64",
     "BIGINT": "INT64",
     "SMALLINT": "INT64",
+    "TINYINT": "INT64",
+    "MEDIUMINT": "INT64",
     "FLOAT": "FLOAT64",
     "DOUBLE": "FLOAT64",
+    "DOUBLE PRECISION": "FLOAT64",
+    "REAL": "FLOAT64",
     "NUMERIC": "NUMERIC",
     "DECIMAL": "NUMERIC",
+    "DEC": "NUMERIC",
     "VARCHAR": "STRING",
     "CHAR": "STRING",
+    "CHARACTER": "STRING",
+    "CHARACTER VARYING": "STRING",
+    "NVARCHAR": "STRING",
+    "NCHAR": "STRING",
     "TEXT": "STRING",
     "BOOLEAN": "BOOL",
     "BOOL": "BOOL",
     "DATE": "DATE",
+    "TIME": "TIME",
     "TIMESTAMP": "TIMESTAMP",
     "DATETIME": "TIMESTAMP",
+    "INTERVAL": "INTERVAL",
     "JSON": "JSON",
     "JSONB": "JSON",
     "BYTEA": "BYTES",
     "BLOB": "BYTES",
+    "BINARY": "BYTES",
+    "VARBINARY": "BYTES",
+}
+
+# Per-dialect additions and overrides on top of TYPE_MAPPING
+DIALECT_TYPE_MAPPING = {
+    "mysql": {
+        "TINYTEXT": "STRING",
+        "MEDIUMTEXT": "STRING",
+        "LONGTEXT": "STRING",
+        "ENUM": "STRING",
+        "SET": "STRING",
+        "YEAR": "INT64",
+        "TINYBLOB": "BYTES",
+        "MEDIUMBLOB": "BYTES",
+        "LONGBLOB": "BYTES",
+        "BIT": "INT64",
+        "GEOMETRY": "GEOGRAPHY",
+        "POINT": "GEOGRAPHY",
+    },
+    "postgresql": {
+        "INT2": "INT64",
+        "INT4": "INT64",
+        "INT8": "INT64",
+        "SERIAL": "INT64",
+        "SMALLSERIAL": "INT64",
+        "BIGSERIAL": "INT64",
+        "FLOAT4": "FLOAT64",
+        "FLOAT8": "FLOAT64",
+        "MONEY": "NUMERIC",
+        "TIMESTAMP WITH TIME ZONE": "TIMESTAMP",
+        "TIMESTAMP WITHOUT TIME ZONE": "TIMESTAMP",
+        "TIMESTAMPTZ": "TIMESTAMP",
+        "TIME WITH TIME ZONE": "TIME",
+        "TIME WITHOUT TIME ZONE": "TIME",
+        "UUID": "STRING",
+        "CITEXT": "STRING",
+        "INET": "STRING",
+        "CIDR": "STRING",
+        "XML": "STRING",
+        "USER-DEFINED": "STRING",
+    },
+    "sqlserver": {
+        "BIT": "BOOL",
+        "MONEY": "NUMERIC",
+        "SMALLMONEY": "NUMERIC",
+        "DATETIME": "DATETIME",
+        "DATETIME2": "DATETIME",
+        "SMALLDATETIME": "DATETIME",
+        "DATETIMEOFFSET": "TIMESTAMP",
+        "UNIQUEIDENTIFIER": "STRING",
+        "NTEXT": "STRING",
+        "XML": "STRING",
+        "IMAGE": "BYTES",
+        "ROWVERSION": "BYTES",
+        "GEOGRAPHY": "GEOGRAPHY",
+    },
+    "oracle": {
+        "NUMBER": "NUMERIC",
+        "VARCHAR2": "STRING",
+        "NVARCHAR2": "STRING",
+        "CLOB": "STRING",
+        "NCLOB": "STRING",
+        "LONG": "STRING",
+        "ROWID": "STRING",
+        "RAW": "BYTES",
+        "LONG RAW": "BYTES",
+        "BFILE": "BYTES",
+        "BINARY_FLOAT": "FLOAT64",
+        "BINARY_DOUBLE": "FLOAT64",
+        # Oracle DATE carries a time of day
+        "DATE": "DATETIME",
+        "TIMESTAMP WITH TIME ZONE": "TIMESTAMP",
+        "TIMESTAMP WITH LOCAL TIME ZONE": "TIMESTAMP",
+        "XMLTYPE": "STRING",
+    },
+}
+
+_PARAMS_RE = re.compile(r"\(([^()]*)\)")
+_ARRAY_SUFFIX_RE = re.compile(r"(?:\s*\[\d*\])+$|\s+ARRAY$")
+_UNSIGNED_RE = re.compile(r"\s+(?:UNSIGNED|SIGNED|ZEROFILL)\b")
+
+
+def _numeric_type(params, integers_as_int64=False):
+    """
+    Picks INT64 / NUMERIC / BIGNUMERIC from a (precision, scale) pair.
+    NUMERIC holds 29 integer digits and scale 9; anything wider needs BIGNUMERIC.
+    """
+    if not params or not params[0]:
+        return "NUMERIC"
+    precision_text = params[0]
+    if precision_text == "*":
+        precision = 38
+    elif precision_text.isdigit():
+        precision = int(precision_text)
+    else:
+        return "NUMERIC"
+    scale_text = params[1] if len(params) > 1 else "0"
+    scale = int(scale_text) if scale_text.lstrip("-").isdigit() else 0
+    if integers_as_int64 and scale <= 0 and precision <= 18:
+        return "INT64"
+    if 0 <= scale <= 9 and precision - scale <= 29:
+        return "NUMERIC"
+    return "BIGNUMERIC"
+
+
+def _mysql_tinyint(params):
+    # MySQL has no real boolean; BOOLEAN columns are stored as TINYINT(1)
+    return "BOOL" if params == ("1",) else "INT64"
+
+
+# Rules for types whose BigQuery type depends on their parameters
+_TYPE_RULES = {
+    "NUMERIC": _numeric_type,
+    "DECIMAL": _numeric_type,
+    "DEC": _numeric_type,
 }
+DIALECT_TYPE_RULES = {
+    "mysql": {"TINYINT": _mysql_tinyint},
+    "oracle": {"NUMBER": partial(_numeric_type, integers_as_int64=True)},
+}
+
+# Merged once at import so each lookup is a single dict access
+_MAPPINGS = {None: TYPE_MAPPING}
+_RULES = {None: _TYPE_RULES}
+for _dialect, _overrides in DIALECT_TYPE_MAPPING.items():
+    _MAPPINGS[_dialect] = {**TYPE_MAPPING, **_overrides}
+    _RULES[_dialect] = {**_TYPE_RULES, **DIALECT_TYPE_RULES.get(_dialect, {})}
+
+
+def parse_type(src_type):
+    """
+    Splits a source type string into (base name, params, is_array).
+    e.g. "numeric(38, 10)" -> ("NUMERIC", ("38", "10"), False)
+         "TIMESTAMP(6) WITH TIME ZONE" -> ("TIMESTAMP WITH TIME ZONE", ("6",), False)
+         "int[]" -> ("INT", (), True)
+    """
+    text = str(src_type or "").strip().upper()
+    is_array = False
+    array_match = _ARRAY_SUFFIX_RE.search(text)
+    if array_match:
+        is_array = True
+        text = text[:array_match.start()]
+    params_match = _PARAMS_RE.search(text)
+    params = ()
+    if params_match:
+        params = tuple(p.strip().split(" ")[0] for p in params_match.group(1).split(","))
+        text = _PARAMS_RE.sub(" ", text)
+    base = " ".join(text.split())
+    return base, params, is_array
+
+
+@lru_cache(maxsize=4096)
+def map_type_to_bigquery(src_type, dialect=None):
+    """
+    Maps one source column type to a BigQuery type.
+    Type parameters are parsed, dialect-specific rules apply when dialect is one
+    of mysql/postgresql/sqlserver/oracle, and arrays become ARRAY<...>.
+    Unknown types fall back to STRING. Results are memoized.
+    """
+    mapping = _MAPPINGS.get(dialect, TYPE_MAPPING)
+    rules = _RULES.get(dialect, _TYPE_RULES)
+    base, params, is_array = parse_type(src_type)
+
+    if dialect == "postgresql" and base.startswith("_") and base[1:] in mapping:
+        # udt_name form of arrays, e.g. _int4
+        base, is_array = base[1:], True
+    if base == "ARRAY":
+        # information_schema reports arrays without their element type
+        return "ARRAY<STRING>"
+
+    unsigned = _UNSIGNED_RE.search(" " + base)
+    if unsigned:
+        base = _UNSIGNED_RE.sub("", " " + base).strip()
+        if base == "BIGINT":
+            # Unsigned 64-bit values do not fit in INT64
+            return "NUMERIC"
+
+    rule = rules.get(base)
+    if rule is not None:
+        bq_type = rule(params)
+    else:
+        bq_type = mapping.get(base)
+        if bq_type is None:
+            bq_type = mapping.get(base.split(" ")[0], "STRING") if base else "STRING"
+    return f"ARRAY<{bq_type}>" if is_array else bq_type
+
 
-def map_type_to_bigquery(src_type):
-    # Compare in uppercase
-    return TYPE_MAPPING.get(str(src_type).upper(), "STRING")
+def map_types(src_types, dialect=None):
+    """
+    Maps a list of source types in one call.
+    Real schemas repeat a few dozen distinct type strings across many columns,
+    so each distinct string is resolved once per call (and memoized across calls).
+    """
+    resolved = {}
+    result = []
+    for src_type in src_types:
+        bq_type = resolved.get(src_type)
+        if bq_type is None:
+            bq_type = map_type_to_bigquery(src_type, dialect)
+            resolved[src_type] = bq_type
+        result.append(bq_type)
+    return result
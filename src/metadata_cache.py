@@ -0,0 +1,191 @@
+# src/metadata_cache.py
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+METADATA_CACHE_TTL = float(os.environ.get("BQ_DDL_METADATA_CACHE_TTL", "300"))
+METADATA_CACHE_MAX_ENTRIES = int(os.environ.get("BQ_DDL_METADATA_CACHE_MAX_ENTRIES", "2048"))
+# Directory for the optional on-disk tier; empty keeps the cache in memory only
+METADATA_CACHE_DIR = os.environ.get("BQ_DDL_METADATA_CACHE_DIR", "")
+
+# Order of the key fields; invalidation matches a prefix of these
+KEY_FIELDS = ("engine", "host", "port", "user", "database", "schema", "table", "kind", "credential")
+
+
+def credential_hash(engine, host, port, user, password):
+    """sha256 of the full credential set, so entries are only served to the same login."""
+    material = json.dumps([engine, str(host or ""), str(port or ""), str(user or ""), password or ""])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def make_key(engine, host, port, user, database=None, schema=None, table=None, kind="", credential=""):
+    return (engine, str(host or ""), str(port or ""), str(user or ""),
+            database or "", schema or "", table or "", kind, credential)
+
+
+def _matches(key, pattern):
+    return all(value is None or key[idx] == value for idx, value in enumerate(pattern))
+
+
+class MetadataCache:
+    """
+    Cache of catalog lookups (database, schema and table lists, table schemas).
+    Entries expire after ttl seconds. The memory tier is an LRU bounded by
+    max_entries; when disk_dir is set, entries are also written there as JSON
+    so they survive restarts and are shared between worker processes.
+    """
+
+    def __init__(self, ttl=METADATA_CACHE_TTL, max_entries=METADATA_CACHE_MAX_ENTRIES, disk_dir=METADATA_CACHE_DIR):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _read_disk(self, key, now):
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - entry["stored_at"] > self.ttl:
+            return None
+        return entry["stored_at"], entry["value"]
+
+    def _write_disk(self, key, stored_at, value):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": list(key), "stored_at": stored_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not write metadata cache entry: {e}")
+
+    def get(self, key):
+        """Returns a copy of the cached value, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+        if self.disk_dir:
+            entry = self._read_disk(key, now)
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, entry)
+                return copy.deepcopy(entry[1])
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store(self, key, entry):
+        # Called with self._lock held
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, key, value):
+        stored_at = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, (stored_at, value))
+        if self.disk_dir:
+            self._write_disk(key, stored_at, value)
+
+    def invalidate(self, engine=None, host=None, port=None, user=None, database=None, schema=None, table=None):
+        """
+        Drops every entry under the given subtree; fields left as None match
+        anything. A table's own entries and the table list of its schema are
+        dropped together, so a refreshed table also shows up in its list.
+        Returns the number of entries removed.
+        """
+        pattern = (
+            engine,
+            None if host is None else str(host),
+            None if port is None else str(port),
+            None if user is None else str(user),
+            database, schema, table
+        )
+        parent = pattern[:6] + ("",) if table is not None else None
+        removed = 0
+        with self._lock:
+            for key in list(self._entries):
+                if _matches(key, pattern) or (parent is not None and _matches(key, parent)):
+                    del self._entries[key]
+                    removed += 1
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for file_name in os.listdir(self.disk_dir):
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(self.disk_dir, file_name)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        key = tuple(json.load(f)["key"])
+                except (OSError, ValueError, KeyError):
+                    continue
+                if _matches(key, pattern) or (parent is not None and _matches(key, parent)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "disk_dir": self.disk_dir or None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+
+metadata_cache = MetadataCache()
+
+
+def cached_metadata(engine, kind, levels):
+    """
+    Caches a catalog function with the signature
+    (host, port, user, password, <levels...>), where levels names the
+    remaining positional arguments as "database", "schema" and/or "table".
+    Keys carry a sha256 of the credentials rather than the password itself,
+    so a wrong password never reads what another login cached.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(host, port, user, password, *args):
+            scope = dict(zip(levels, args))
+            key = make_key(engine, host, port, user, scope.get("database"), scope.get("schema"),
+                           scope.get("table"), kind, credential_hash(engine, host, port, user, password))
+            value = metadata_cache.get(key)
+            if value is None:
+                value = fn(host, port, user, password, *args)
+                metadata_cache.put(key, value)
+            return value
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
@@ -0,0 +1,233 @@
+# src/model_manager.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.drivers import load_driver
+from src.instrumentation import span
+
+MODELS_DIR = os.environ.get(
+    "BQ_DDL_MODELS_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "models")
+)
+# Models stay resident until one of these limits is exceeded
+MAX_LOADED_MODELS = int(os.environ.get("BQ_DDL_MAX_LOADED_MODELS", "2"))
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("BQ_DDL_MODEL_MEMORY_BUDGET_MB", "8192"))
+# Comma-separated model file names to load at startup
+WARMUP_MODELS = [m.strip() for m in os.environ.get("BQ_DDL_WARMUP_MODELS", "").split(",") if m.strip()]
+
+
+def _estimate_size_mb(model_name):
+    # A .gguf file is mapped into memory more or less whole
+    try:
+        return os.path.getsize(os.path.join(MODELS_DIR, model_name)) / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+
+class _LoadedModel:
+    def __init__(self, name, model, size_mb, load_seconds):
+        self.name = name
+        self.model = model
+        self.size_mb = size_mb
+        self.load_seconds = load_seconds
+        self.last_used = time.time()
+        # GPT4All instances are not safe to generate from concurrently
+        self.lock = threading.Lock()
+        # Requests holding the model (between _get_entry(hold=True) and _release),
+        # changed under the manager lock; held models are never evicted
+        self.in_use = 0
+        # Unloaded while held: closed by the last _release
+        self.retired = False
+
+
+class ModelManager:
+    """
+    Keeps GPT4All models loaded once per process. gpt4all itself is only
+    imported when the first model is loaded.
+    Models are loaded lazily on first use and evicted least recently used first
+    when more than max_models are loaded or their combined size exceeds
+    memory_budget_mb. Models held by a request are never evicted; unloading
+    one waits for its last holder to release it.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, max_models=MAX_LOADED_MODELS,
+                 memory_budget_mb=MODEL_MEMORY_BUDGET_MB):
+        self.models_dir = models_dir
+        self.max_models = max_models
+        self.memory_budget_mb = memory_budget_mb
+        self._models = OrderedDict()  # name -> _LoadedModel, least recently used first
+        self._loading = {}  # name -> Lock, so a model is loaded only once
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def _load(self, model_name):
+        print(f"Loading model '{model_name}' from {self.models_dir}...")
+        start = time.perf_counter()
+        with span("model_load"):
+            model = load_driver("gpt4all").GPT4All(model_name, model_path=self.models_dir)
+        load_seconds = time.perf_counter() - start
+        print(f"Model '{model_name}' loaded in {load_seconds:.1f}s")
+        return _LoadedModel(model_name, model, _estimate_size_mb(model_name), load_seconds)
+
+    def _pick_evictions(self, keep):
+        # Called with self._lock held
+        evicted = []
+        total_mb = sum(entry.size_mb for entry in self._models.values())
+        for name in list(self._models):
+            over_count = len(self._models) > self.max_models
+            over_budget = total_mb > self.memory_budget_mb
+            if not (over_count or over_budget):
+                break
+            if name == keep or self._models[name].in_use:
+                continue
+            entry = self._models.pop(name)
+            total_mb -= entry.size_mb
+            evicted.append(entry)
+        return evicted
+
+    def _close(self, entry):
+        print(f"Unloading model '{entry.name}'")
+        self.evictions += 1
+        # Wait for any generation still running on it
+        with entry.lock:
+            close = getattr(entry.model, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Error closing model '{entry.name}': {e}")
+
+    def _get_entry(self, model_name, hold=False):
+        """
+        Returns the entry for model_name, loading it if needed. With hold, the
+        entry's in_use count is taken under the manager lock, so it cannot be
+        evicted before the caller is done; pair it with _release.
+        """
+        with self._lock:
+            entry = self._models.get(model_name)
+            if entry is not None:
+                self._models.move_to_end(model_name)
+                entry.last_used = time.time()
+                entry.in_use += hold
+                self.hits += 1
+                return entry
+            load_lock = self._loading.setdefault(model_name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(model_name)
+                if entry is not None:
+                    # Loaded by another thread while we waited
+                    self._models.move_to_end(model_name)
+                    entry.in_use += hold
+                    self.hits += 1
+                    return entry
+            entry = self._load(model_name)
+            with self._lock:
+                self._models[model_name] = entry
+                self._loading.pop(model_name, None)
+                entry.in_use += hold
+                self.loads += 1
+                evicted = self._pick_evictions(keep=model_name)
+        for old in evicted:
+            self._close(old)
+        return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.in_use -= 1
+            evicted = []
+            if entry.in_use == 0:
+                # Evictions skipped while the model was held can happen now
+                evicted = [entry] if entry.retired else self._pick_evictions(keep=None)
+        for old in evicted:
+            self._close(old)
+
+    def _retire(self, entries):
+        """Called with self._lock held: returns the entries to close now; held ones close on release."""
+        idle = []
+        for entry in entries:
+            if entry.in_use:
+                entry.retired = True
+            else:
+                idle.append(entry)
+        return idle
+
+    def get(self, model_name):
+        """
+        Returns the loaded GPT4All instance for model_name, loading it if needed.
+        The model is not held, so it may be evicted; generate through use() instead.
+        """
+        return self._get_entry(model_name).model
+
+    @contextmanager
+    def use(self, model_name):
+        """
+        Yields the model for exclusive use, so concurrent requests for the same
+        model take turns instead of generating on it at the same time.
+        """
+        entry = self._get_entry(model_name, hold=True)
+        try:
+            with entry.lock:
+                entry.last_used = time.time()
+                yield entry.model
+        finally:
+            self._release(entry)
+
+    def unload(self, model_name=None):
+        """Unloads one model, or all of them when model_name is None."""
+        with self._lock:
+            if model_name is None:
+                evicted = list(self._models.values())
+                self._models.clear()
+            else:
+                entry = self._models.pop(model_name, None)
+                evicted = [entry] if entry is not None else []
+            evicted = self._retire(evicted)
+        for entry in evicted:
+            self._close(entry)
+
+    def warm_up(self, model_names=None):
+        """Loads the given models (default: BQ_DDL_WARMUP_MODELS) ahead of the first request."""
+        for model_name in model_names if model_names is not None else WARMUP_MODELS:
+            try:
+                self._get_entry(model_name)
+            except Exception as e:
+                print(f"Warm-up of model '{model_name}' failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": [
+                    {
+                        "name": entry.name,
+                        "size_mb": round(entry.size_mb, 1),
+                        "load_seconds": round(entry.load_seconds, 2),
+                        "last_used": entry.last_used
+                    }
+                    for entry in self._models.values()
+                ],
+                "max_models": self.max_models,
+                "memory_budget_mb": self.memory_budget_mb,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions
+            }
+
+
+model_manager = ModelManager()
+
+
+def start_warm_up(model_names=None):
+    """Warms up models on a background thread so startup is not blocked."""
+    names = model_names if model_names is not None else WARMUP_MODELS
+    if not names:
+        return None
+    thread = threading.Thread(target=model_manager.warm_up, args=(names,), name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
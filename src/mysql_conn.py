@@ -1,68 +1,149 @@
-import mysql.connector
+from src.catalog import like_prefix
+from src.drivers import load_driver
+from src.metadata_cache import cached_metadata
+from src.pool import register_adapter, pooled_connection
+
+def _connect_mysql(host, port, user, password, database=None):
+    params = {
+        "host": host,
+        "port": int(port),
+        "user": user,
+        "password": password,
+        "autocommit": True
+    }
+    if database:
+        params["database"] = database
+    return load_driver("mysql.connector").connect(**params)
+
+register_adapter("mysql", _connect_mysql)
 
 def test_mysql_connection(host, port, user, password):
-    conn = mysql.connector.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password
-    )
-    cursor = conn.cursor()
-    cursor.execute("SHOW DATABASES")
-    dbs = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("mysql", host, port, user, password) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SHOW DATABASES")
+        dbs = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return dbs
 
+@cached_metadata("mysql", "tables", ("database",))
 def get_mysql_tables(host, port, user, password, database):
-    conn = mysql.connector.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password,
-        database=database
-    )
-    cursor = conn.cursor()
-    cursor.execute("SHOW TABLES")
-    tables = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("mysql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES")
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
+
+def get_mysql_tables_page(host, port, user, password, database, prefix="", after="", limit=100):
+    """
+    One page of table names in name order: names starting with prefix and
+    sorting after the cursor name after. Returns at most limit names.
+    """
+    with pooled_connection("mysql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TABLE_NAME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME LIKE %s AND TABLE_NAME > %s
+            ORDER BY TABLE_NAME
+            LIMIT %s
+        """, (database, like_prefix(prefix), after or "", int(limit)))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return tables
 
+@cached_metadata("mysql", "table_schema", ("database", "table"))
 def get_mysql_table_schema(host, port, user, password, database, table):
-    conn = mysql.connector.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password,
-        database=database
-    )
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE,
-               COLUMN_DEFAULT, COLUMN_KEY, EXTRA, COLUMN_COMMENT
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
-        ORDER BY ORDINAL_POSITION
-    """, (database, table))
-    columns = []
-    for col in cursor.fetchall():
-        columns.append({
-            "name": col[0],
-            "type": col[1],
-            "nullable": col[3].upper() == "YES",
-            "comment": col[7] or ""
-        })
-    cursor.execute("SHOW TABLE STATUS WHERE Name = %s", (table,))
-    table_status = cursor.fetchone()
-    table_comment = table_status[17] if table_status else ""
-    schema = {
-        "table_name": table,
-        "columns": columns,
-        "db": database,
-        "schema": database,
-        "table_comment": table_comment
-    }
-    cursor.close()
-    conn.close()
-    return schema
\ No newline at end of file
+    with pooled_connection("mysql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE,
+                   COLUMN_DEFAULT, COLUMN_KEY, EXTRA, COLUMN_COMMENT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+        """, (database, table))
+        columns = []
+        for col in cursor.fetchall():
+            columns.append({
+                "name": col[0],
+                "type": col[1],
+                "nullable": col[3].upper() == "YES",
+                "comment": col[7] or ""
+            })
+        cursor.execute("SHOW TABLE STATUS WHERE Name = %s", (table,))
+        table_status = cursor.fetchone()
+        table_comment = table_status[17] if table_status else ""
+        schema = {
+            "table_name": table,
+            "columns": columns,
+            "db": database,
+            "schema": database,
+            "table_comment": table_comment
+        }
+        cursor.close()
+    return schema
+
+def get_mysql_all_table_schemas(host, port, user, password, database, tables=None):
+    """
+    Extracts every table of a database with one query per catalog view.
+    Returns a list of schema dicts shaped like get_mysql_table_schema.
+    """
+    wanted = set(tables) if tables else None
+    with pooled_connection("mysql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TABLE_NAME, TABLE_COMMENT
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = %s
+        """, (database,))
+        table_comments = {row[0]: row[1] or "" for row in cursor.fetchall()}
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_COMMENT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """, (database,))
+        schemas = {}
+        for table_name, col_name, data_type, is_nullable, comment in cursor.fetchall():
+            if wanted is not None and table_name not in wanted:
+                continue
+            if table_name not in schemas:
+                schemas[table_name] = {
+                    "table_name": table_name,
+                    "columns": [],
+                    "db": database,
+                    "schema": database,
+                    "table_comment": table_comments.get(table_name, "")
+                }
+            schemas[table_name]["columns"].append({
+                "name": col_name,
+                "type": data_type,
+                "nullable": is_nullable.upper() == "YES",
+                "comment": comment or ""
+            })
+        cursor.close()
+    return list(schemas.values())
+
+def get_mysql_table_fingerprints(host, port, user, password, database):
+    """
+    Returns {table_name: fingerprint text} for every table of a database from one
+    catalog query: creation time, table comment, column count and a checksum over
+    each column's position, name, type, nullability and comment.
+    UPDATE_TIME is left out because it moves on every data change.
+    """
+    with pooled_connection("mysql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT t.TABLE_NAME, t.CREATE_TIME, t.TABLE_COMMENT, COUNT(c.COLUMN_NAME),
+                   SUM(CRC32(CONCAT_WS('|', c.ORDINAL_POSITION, c.COLUMN_NAME, c.COLUMN_TYPE,
+                                       c.IS_NULLABLE, c.COLUMN_COMMENT)))
+            FROM INFORMATION_SCHEMA.TABLES t
+            LEFT JOIN INFORMATION_SCHEMA.COLUMNS c
+              ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+            WHERE t.TABLE_SCHEMA = %s
+            GROUP BY t.TABLE_NAME, t.CREATE_TIME, t.TABLE_COMMENT
+        """, (database,))
+        fingerprints = {row[0]: "|".join(str(v) for v in row[1:]) for row in cursor.fetchall()}
+        cursor.close()
+    return fingerprints
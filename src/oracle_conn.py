@@ -1,76 +1,206 @@
-import oracledb
+from src.catalog import like_prefix
+from src.drivers import load_driver
+from src.metadata_cache import cached_metadata
+from src.pool import register_adapter, pooled_connection
 
 def get_oracle_py_conn(host, port, user, password, service_name):
     dsn = f"{host}:{port}/{service_name}"
-    return oracledb.connect(user=user, password=password, dsn=dsn)
+    return load_driver("oracledb").connect(user=user, password=password, dsn=dsn)
+
+def _connect_oracle(host, port, user, password, database=None):
+    return get_oracle_py_conn(host, port, user, password, database)
+
+register_adapter("oracle", _connect_oracle, ping_query="SELECT 1 FROM dual")
+
+_CHAR_TYPES = ("VARCHAR2", "NVARCHAR2", "VARCHAR", "CHAR", "NCHAR")
+
+def _column_type(data_type, precision, scale, char_length):
+    """
+    Rebuilds the declared type from all_tab_columns, whose data_type is bare
+    ("NUMBER", "VARCHAR2"), so the NUMBER(p,s) mapping rules apply as for pasted DDL.
+    """
+    if data_type == "NUMBER":
+        if precision is not None:
+            return f"NUMBER({int(precision)},{int(scale or 0)})"
+        if scale is not None:
+            # INTEGER and NUMBER(*,0) columns have a scale but no precision
+            return f"NUMBER(*,{int(scale)})"
+        return data_type
+    if data_type in _CHAR_TYPES and char_length:
+        return f"{data_type}({int(char_length)})"
+    return data_type
 
 def test_oracle_connection(host, port, user, password, service_name):
-    conn = get_oracle_py_conn(host, port, user, password, service_name)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM v$database")
-    db_name = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM v$database")
+        db_name = cursor.fetchone()[0]
+        cursor.close()
     return [db_name]
 
+@cached_metadata("oracle", "schemas", ("database",))
 def get_oracle_schemas(host, port, user, password, service_name):
-    conn = get_oracle_py_conn(host, port, user, password, service_name)
-    cursor = conn.cursor()
-    cursor.execute("SELECT username FROM all_users ORDER BY username")
-    schemas = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT username FROM all_users ORDER BY username")
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return schemas
+
+def get_oracle_schemas_page(host, port, user, password, service_name, prefix="", after="", limit=100):
+    """One page of schema (user) names; see get_oracle_tables_page."""
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT username FROM all_users
+            WHERE username LIKE :prefix ESCAPE '\\' AND username > :after
+            ORDER BY username
+            FETCH FIRST :limit ROWS ONLY
+        """, prefix=like_prefix(prefix), after=after or " ", limit=int(limit))
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return schemas
 
+@cached_metadata("oracle", "tables", ("database", "schema"))
 def get_oracle_tables(host, port, user, password, service_name, owner):
-    conn = get_oracle_py_conn(host, port, user, password, service_name)
-    cursor = conn.cursor()
-    query = f"SELECT table_name FROM all_tables WHERE owner = '{owner}' ORDER BY table_name"
-    cursor.execute(query)
-    tables = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT table_name FROM all_tables WHERE owner = :owner ORDER BY table_name", owner=owner)
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return tables
 
+def get_oracle_tables_page(host, port, user, password, service_name, owner, prefix="", after="", limit=100):
+    """
+    One page of table names of a schema in name order: names starting with
+    prefix, matched exactly so quoted mixed-case names can be found, and sorting
+    after the cursor name after. The filter and FETCH FIRST run in the catalog (12c+).
+    """
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT table_name FROM all_tables
+            WHERE owner = :owner AND table_name LIKE :prefix ESCAPE '\\' AND table_name > :after
+            ORDER BY table_name
+            FETCH FIRST :limit ROWS ONLY
+        """, owner=owner, prefix=like_prefix(prefix), after=after or " ", limit=int(limit))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
+
+@cached_metadata("oracle", "table_schema", ("database", "schema", "table"))
 def get_oracle_table_schema(host, port, user, password, service_name, owner, table):
-    conn = get_oracle_py_conn(host, port, user, password, service_name)
-    cursor = conn.cursor()
-    query = f"""
-        SELECT 
-            col.column_name, 
-            col.data_type, 
-            col.nullable,
-            comm.comments
-        FROM all_tab_columns col
-        LEFT JOIN all_col_comments comm
-            ON col.owner = comm.owner AND col.table_name = comm.table_name AND col.column_name = comm.column_name
-        WHERE col.owner = '{owner}' AND col.table_name = '{table}'
-        ORDER BY col.column_id
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                col.column_name,
+                col.data_type,
+                col.data_precision,
+                col.data_scale,
+                col.char_length,
+                col.nullable,
+                comm.comments
+            FROM all_tab_columns col
+            LEFT JOIN all_col_comments comm
+                ON col.owner = comm.owner AND col.table_name = comm.table_name AND col.column_name = comm.column_name
+            WHERE col.owner = :owner AND col.table_name = :table_name
+            ORDER BY col.column_id
+        """, owner=owner, table_name=table)
+        rows = cursor.fetchall()
+        columns = []
+        for col_name, data_type, precision, scale, char_length, nullable, comment in rows:
+            columns.append({
+                "name": col_name,
+                "type": _column_type(data_type, precision, scale, char_length),
+                "nullable": (nullable == "Y"),
+                "comment": comment or ""
+            })
+        cursor.execute(
+            "SELECT comments FROM all_tab_comments WHERE owner = :owner AND table_name = :table_name",
+            owner=owner, table_name=table
+        )
+        table_comment_row = cursor.fetchone()
+        table_comment = table_comment_row[0] if table_comment_row else ""
+        schema_json = {
+            "table_name": table,
+            "columns": columns,
+            "db": "",
+            "schema": owner,
+            "table_comment": table_comment or ""
+        }
+        cursor.close()
+    return schema_json
+
+def get_oracle_all_table_schemas(host, port, user, password, service_name, owner, tables=None):
+    """
+    Extracts every table of a schema with one all_tab_columns/all_col_comments
+    query and one all_tab_comments query. Returns a list of schema dicts shaped
+    like get_oracle_table_schema.
+    """
+    wanted = set(tables) if tables else None
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT table_name, comments FROM all_tab_comments WHERE owner = :owner",
+            owner=owner
+        )
+        table_comments = {row[0]: row[1] or "" for row in cursor.fetchall()}
+        # Fetch the column rows in large batches rather than the driver default of 100
+        cursor.arraysize = 5000
+        cursor.execute("""
+            SELECT
+                col.table_name,
+                col.column_name,
+                col.data_type,
+                col.data_precision,
+                col.data_scale,
+                col.char_length,
+                col.nullable,
+                comm.comments
+            FROM all_tab_columns col
+            LEFT JOIN all_col_comments comm
+                ON col.owner = comm.owner AND col.table_name = comm.table_name AND col.column_name = comm.column_name
+            WHERE col.owner = :owner
+            ORDER BY col.table_name, col.column_id
+        """, owner=owner)
+        schemas = {}
+        for table_name, col_name, data_type, precision, scale, char_length, nullable, comment in cursor.fetchall():
+            if wanted is not None and table_name not in wanted:
+                continue
+            if table_name not in schemas:
+                schemas[table_name] = {
+                    "table_name": table_name,
+                    "columns": [],
+                    "db": "",
+                    "schema": owner,
+                    "table_comment": table_comments.get(table_name, "")
+                }
+            schemas[table_name]["columns"].append({
+                "name": col_name,
+                "type": _column_type(data_type, precision, scale, char_length),
+                "nullable": (nullable == "Y"),
+                "comment": comment or ""
+            })
+        cursor.close()
+    return list(schemas.values())
+
+def get_oracle_table_fingerprints(host, port, user, password, service_name, owner):
     """
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    columns = []
-    for col_name, data_type, nullable, comment in rows:
-        columns.append({
-            "name": col_name,
-            "type": data_type,
-            "nullable": (nullable == "Y"),
-            "comment": comment or ""
-        })
-    table_comment_query = f"""
-        SELECT comments FROM all_tab_comments
-        WHERE owner = '{owner}' AND table_name = '{table}'
+    Returns {table_name: fingerprint text} for every table and view of a schema
+    from one catalog query: LAST_DDL_TIME (also moved by COMMENT ON) and the column count.
     """
-    cursor.execute(table_comment_query)
-    table_comment_row = cursor.fetchone()
-    table_comment = table_comment_row[0] if table_comment_row else ""
-    schema_json = {
-        "table_name": table,
-        "columns": columns,
-        "db": "",
-        "schema": owner,
-        "table_comment": table_comment or ""
-    }
-    cursor.close()
-    conn.close()
-    return schema_json
\ No newline at end of file
+    with pooled_connection("oracle", host, port, user, password, service_name) as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = 5000
+        cursor.execute("""
+            SELECT o.object_name, TO_CHAR(o.last_ddl_time, 'YYYY-MM-DD HH24:MI:SS'), COUNT(col.column_id)
+            FROM all_objects o
+            JOIN all_tab_columns col
+              ON col.owner = o.owner AND col.table_name = o.object_name
+            WHERE o.owner = :owner AND o.object_type IN ('TABLE', 'VIEW')
+            GROUP BY o.object_name, o.last_ddl_time
+        """, owner=owner)
+        fingerprints = {row[0]: "|".join(str(v) for v in row[1:]) for row in cursor.fetchall()}
+        cursor.close()
+    return fingerprints
@@ -0,0 +1,205 @@
+# src/pool.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from src.instrumentation import metrics, span
+
+POOL_MAX_SIZE = int(os.environ.get("BQ_DDL_POOL_MAX_SIZE", "4"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("BQ_DDL_POOL_IDLE_TIMEOUT", "300"))
+POOL_PING_INTERVAL = float(os.environ.get("BQ_DDL_POOL_PING_INTERVAL", "10"))
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get("BQ_DDL_POOL_ACQUIRE_TIMEOUT", "30"))
+
+
+class PoolAdapter:
+    """
+    Per-engine hooks used by the pool: how to open a connection and how to
+    check that an idle one is still alive.
+    """
+
+    def __init__(self, engine, connect, ping_query="SELECT 1"):
+        self.engine = engine
+        self.connect = connect
+        self.ping_query = ping_query
+
+    def ping(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self.ping_query)
+            cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections for one set of credentials.
+    Idle connections older than idle_timeout are closed, and connections idle
+    for longer than ping_interval are health-checked before being handed out.
+    Once close_all has run, connections handed back are closed, not kept.
+    """
+
+    def __init__(self, adapter, params, max_size=POOL_MAX_SIZE,
+                 idle_timeout=POOL_IDLE_TIMEOUT, ping_interval=POOL_PING_INTERVAL):
+        self.adapter = adapter
+        self.params = params
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._idle = deque()  # (conn, last_used)
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def _evict_idle(self, now):
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            expired = self._evict_idle(time.monotonic())
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.max_size:
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Timed out waiting for a {self.adapter.engine} connection"
+                    )
+                self._cond.wait(remaining)
+            self._in_use += 1
+        for stale in expired:
+            self.adapter.close(stale)
+
+        try:
+            if conn is not None and time.monotonic() - last_used > self.ping_interval:
+                try:
+                    self.adapter.ping(conn)
+                except Exception:
+                    self.adapter.close(conn)
+                    conn = None
+            if conn is None:
+                with span("connect", engine=self.adapter.engine):
+                    conn = self.adapter.connect(**self.params)
+                metrics.inc("bq_ddl_source_connects_total", engine=self.adapter.engine)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            self._in_use -= 1
+            # Connections checked out when the pool was closed are not kept
+            discard = discard or self.closed
+            if not discard:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self.adapter.close(conn)
+
+    def close_all(self):
+        with self._cond:
+            self.closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self.adapter.close(conn)
+
+
+_ADAPTERS = {}
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def register_adapter(engine, connect, ping_query="SELECT 1"):
+    _ADAPTERS[engine] = PoolAdapter(engine, connect, ping_query)
+
+
+def _pool_key(engine, host, port, user, password, database):
+    password_hash = hashlib.sha256(str(password or "").encode("utf-8")).hexdigest()
+    return (engine, host or "", str(port or ""), user or "", password_hash, database or "")
+
+
+def get_pool(engine, host, port, user, password, database=None):
+    key = _pool_key(engine, host, port, user, password, database)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            params = {"host": host, "port": port, "user": user, "password": password}
+            if database:
+                params["database"] = database
+            pool = ConnectionPool(_ADAPTERS[engine], params)
+            _POOLS[key] = pool
+    return pool
+
+
+@contextmanager
+def pooled_connection(engine, host, port, user, password, database=None):
+    """
+    Borrow a connection from the shared pool for these credentials.
+    Connections that raise while in use are discarded instead of returned.
+    """
+    pool = get_pool(engine, host, port, user, password, database)
+    conn = pool.acquire()
+    try:
+        with span("catalog", engine=engine):
+            yield conn
+    except Exception:
+        pool.release(conn, discard=True)
+        raise
+    pool.release(conn)
+
+
+def close_pools(engine=None, host=None, port=None, user=None):
+    """
+    Close idle connections and forget the pools matching the given filters;
+    connections still checked out are closed when they are released.
+    With no arguments every pool is closed.
+    """
+    with _POOLS_LOCK:
+        matched = []
+        for key in list(_POOLS):
+            key_engine, key_host, key_port, key_user = key[:4]
+            if engine is not None and key_engine != engine:
+                continue
+            if host is not None and key_host != host:
+                continue
+            if port is not None and key_port != str(port):
+                continue
+            if user is not None and key_user != user:
+                continue
+            matched.append(_POOLS.pop(key))
+    for pool in matched:
+        pool.close_all()
+
+
+def pool_stats():
+    """Idle and in-use connections summed over all pools."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    stats = {"pools": len(pools), "idle": 0, "in_use": 0}
+    for pool in pools:
+        with pool._cond:
+            stats["idle"] += len(pool._idle)
+            stats["in_use"] += pool._in_use
+    return stats
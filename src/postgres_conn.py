@@ -1,99 +1,208 @@
-import psycopg2
+from src.catalog import like_prefix
+from src.drivers import load_driver
+from src.metadata_cache import cached_metadata
+from src.pool import register_adapter, pooled_connection
 
-def test_postgres_connection(host, port, user, password):
-    conn = psycopg2.connect(
+def _connect_postgres(host, port, user, password, database="postgres"):
+    conn = load_driver("psycopg2").connect(
         host=host,
         port=int(port),
         user=user,
         password=password,
-        database="postgres"
+        database=database
     )
-    cursor = conn.cursor()
-    cursor.execute("SELECT datname FROM pg_database WHERE datistemplate = false;")
-    dbs = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    # Catalog reads only; avoid leaving pooled connections idle in a transaction
+    conn.autocommit = True
+    return conn
+
+register_adapter("postgresql", _connect_postgres)
+
+def test_postgres_connection(host, port, user, password):
+    with pooled_connection("postgresql", host, port, user, password, "postgres") as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT datname FROM pg_database WHERE datistemplate = false;")
+        dbs = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return dbs
 
+@cached_metadata("postgresql", "schemas", ("database",))
 def get_postgres_schemas(host, port, user, password, database):
-    conn = psycopg2.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password,
-        database=database
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT schema_name FROM information_schema.schemata WHERE schema_name NOT IN ('pg_catalog', 'information_schema');")
-    schemas = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT schema_name FROM information_schema.schemata WHERE schema_name NOT IN ('pg_catalog', 'information_schema');")
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return schemas
 
+def get_postgres_schemas_page(host, port, user, password, database, prefix="", after="", limit=100):
+    """One page of schema names; see get_postgres_tables_page."""
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT nspname FROM pg_catalog.pg_namespace
+            WHERE nspname NOT IN ('pg_catalog', 'information_schema')
+              AND nspname LIKE %s AND nspname > %s
+            ORDER BY nspname
+            LIMIT %s
+        """, (like_prefix(prefix), after or "", int(limit)))
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return schemas
+
+@cached_metadata("postgresql", "tables", ("database", "schema"))
 def get_postgres_tables(host, port, user, password, database, schema):
-    conn = psycopg2.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password,
-        database=database
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = %s;", (schema,))
-    tables = [row[0] for row in cursor.fetchall()]
-    print(tables)
-    cursor.close()
-    conn.close()
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = %s;", (schema,))
+        tables = [row[0] for row in cursor.fetchall()]
+        print(tables)
+        cursor.close()
     return tables
 
+def get_postgres_tables_page(host, port, user, password, database, schema, prefix="", after="", limit=100):
+    """
+    One page of table and view names of a schema in name order: names starting
+    with prefix and sorting after the cursor name after. Both compare
+    case-sensitively, so the prefix filter and the keyset cursor agree.
+    Reads pg_class directly, so the filter and LIMIT run in the catalog.
+    """
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p', 'v', 'f')
+              AND c.relname LIKE %s AND c.relname > %s
+            ORDER BY c.relname
+            LIMIT %s
+        """, (schema, like_prefix(prefix), after or "", int(limit)))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
+
+@cached_metadata("postgresql", "table_schema", ("database", "schema", "table"))
 def get_postgres_table_schema(host, port, user, password, database, schema, table):
-    conn = psycopg2.connect(
-        host=host,
-        port=int(port),
-        user=user,
-        password=password,
-        database=database
-    )
-    cursor = conn.cursor()
-    # Get column details
-    cursor.execute("""
-        SELECT column_name, data_type, is_nullable, column_default
-        FROM information_schema.columns
-        WHERE table_schema = %s AND table_name = %s
-        ORDER BY ordinal_position
-    """, (schema, table))
-    columns = []
-    for col in cursor.fetchall():
-        columns.append({
-            "name": col[0],
-            "type": col[1],
-            "nullable": col[2].upper() == "YES",
-            "comment": ""  # Will be filled below
-        })
-    # Get column comments
-    cursor.execute("""
-        SELECT a.attname, d.description
-        FROM pg_catalog.pg_attribute a
-        LEFT JOIN pg_catalog.pg_description d
-          ON d.objoid = a.attrelid AND d.objsubid = a.attnum
-        WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
-    """, (f'"{schema}"."{table}"',))
-    col_comments = {row[0]: row[1] for row in cursor.fetchall() if row[1]}
-    for col in columns:
-        col["comment"] = col_comments.get(col["name"], "")
-    # Get table comment
-    cursor.execute("""
-        SELECT obj_description(%s::regclass)
-    """, (f'"{schema}"."{table}"',))
-    table_comment_row = cursor.fetchone()
-    table_comment = table_comment_row[0] if table_comment_row else ""
-    schema_dict = {
-        "table_name": table,
-        "columns": columns,
-        "db": database,
-        "schema": schema,
-        "table_comment": table_comment
-    }
-    cursor.close()
-    conn.close()
-    return schema_dict
\ No newline at end of file
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        # Get column details
+        cursor.execute("""
+            SELECT column_name, data_type, is_nullable, column_default
+            FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position
+        """, (schema, table))
+        columns = []
+        for col in cursor.fetchall():
+            columns.append({
+                "name": col[0],
+                "type": col[1],
+                "nullable": col[2].upper() == "YES",
+                "comment": ""  # Will be filled below
+            })
+        # Get column comments
+        cursor.execute("""
+            SELECT a.attname, d.description
+            FROM pg_catalog.pg_attribute a
+            LEFT JOIN pg_catalog.pg_description d
+              ON d.objoid = a.attrelid AND d.objsubid = a.attnum
+            WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        """, (f'"{schema}"."{table}"',))
+        col_comments = {row[0]: row[1] for row in cursor.fetchall() if row[1]}
+        for col in columns:
+            col["comment"] = col_comments.get(col["name"], "")
+        # Get table comment
+        cursor.execute("""
+            SELECT obj_description(%s::regclass)
+        """, (f'"{schema}"."{table}"',))
+        table_comment_row = cursor.fetchone()
+        table_comment = table_comment_row[0] if table_comment_row else ""
+        schema_dict = {
+            "table_name": table,
+            "columns": columns,
+            "db": database,
+            "schema": schema,
+            "table_comment": table_comment
+        }
+        cursor.close()
+    return schema_dict
+
+def get_postgres_all_table_schemas(host, port, user, password, database, schema, tables=None):
+    """
+    Extracts every table of a schema with one columns query and one
+    pg_description query. Returns a list of schema dicts shaped like
+    get_postgres_table_schema.
+    """
+    wanted = set(tables) if tables else None
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        # Table comments have objsubid = 0, column comments carry the attnum
+        cursor.execute("""
+            SELECT c.relname, a.attname, d.description
+            FROM pg_catalog.pg_description d
+            JOIN pg_catalog.pg_class c
+              ON c.oid = d.objoid AND d.classoid = 'pg_catalog.pg_class'::regclass
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_catalog.pg_attribute a
+              ON a.attrelid = c.oid AND a.attnum = d.objsubid AND d.objsubid > 0
+            WHERE n.nspname = %s
+        """, (schema,))
+        table_comments = {}
+        col_comments = {}
+        for table_name, col_name, description in cursor.fetchall():
+            if col_name is None:
+                table_comments[table_name] = description or ""
+            else:
+                col_comments[(table_name, col_name)] = description or ""
+        cursor.execute("""
+            SELECT table_name, column_name, data_type, is_nullable
+            FROM information_schema.columns
+            WHERE table_schema = %s
+            ORDER BY table_name, ordinal_position
+        """, (schema,))
+        schemas = {}
+        for table_name, col_name, data_type, is_nullable in cursor.fetchall():
+            if wanted is not None and table_name not in wanted:
+                continue
+            if table_name not in schemas:
+                schemas[table_name] = {
+                    "table_name": table_name,
+                    "columns": [],
+                    "db": database,
+                    "schema": schema,
+                    "table_comment": table_comments.get(table_name, "")
+                }
+            schemas[table_name]["columns"].append({
+                "name": col_name,
+                "type": data_type,
+                "nullable": is_nullable.upper() == "YES",
+                "comment": col_comments.get((table_name, col_name), "")
+            })
+        cursor.close()
+    return list(schemas.values())
+
+def get_postgres_table_fingerprints(host, port, user, password, database, schema):
+    """
+    Returns {table_name: fingerprint text} for every table and view of a schema
+    from one catalog query: the column count and an md5 over the table comment
+    and each column's name, type, NOT NULL flag and comment.
+    pg_class.xmin is not used because VACUUM/ANALYZE can move it without a DDL change.
+    """
+    with pooled_connection("postgresql", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.relname, COUNT(a.attnum),
+                   md5(COALESCE(obj_description(c.oid, 'pg_class'), '') || '|' || string_agg(
+                       a.attname || ':' || format_type(a.atttypid, a.atttypmod) || ':' ||
+                       a.attnotnull::text || ':' || COALESCE(col_description(c.oid, a.attnum), ''),
+                       ',' ORDER BY a.attnum))
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_catalog.pg_attribute a
+              ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p', 'v', 'f')
+            GROUP BY c.oid, c.relname
+        """, (schema,))
+        fingerprints = {row[0]: "|".join(str(v) for v in row[1:]) for row in cursor.fetchall()}
+        cursor.close()
+    return fingerprints
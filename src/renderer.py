@@ -1,32 +1,78 @@
 # src/renderer.py
 
-from src.mapping import map_type_to_bigquery
+import time
 
-def generate_bq_ddl(table_name, columns, dataset, table_comment=None):
+from src.mapping import map_types
+
+
+def _add_time(timings, phase, start):
+    timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def _ddl_lines(table_name, columns, dataset, table_comment=None, dialect=None, timings=None):
     """
-    Generates BigQuery CREATE TABLE DDL.
+    Yields the DDL one line at a time (without newlines).
+    The caller's column dicts are only read, never modified.
     """
-    # Apply type mapping to all columns
-    for col in columns:
-        original_type = col.get("type", "")
-        col["type"] = map_type_to_bigquery(original_type)
+    if timings is None:
+        mapped_types = map_types([col.get("type", "") for col in columns], dialect)
+    else:
+        start = time.perf_counter()
+        mapped_types = map_types([col.get("type", "") for col in columns], dialect)
+        _add_time(timings, "map", start)
 
     # Add backticks to table name
     full_table_name = f"`{dataset}.{table_name}`" if dataset else f"`{table_name}`"
-    ddl_lines = [f"CREATE OR REPLACE TABLE {full_table_name} ("]
-    for col in columns:
-        col_line = f"  {col['name']} {col['type']}"
-        if not col.get('nullable', True):
+    yield f"CREATE OR REPLACE TABLE {full_table_name} ("
+    last = len(columns) - 1
+    for idx, (col, bq_type) in enumerate(zip(columns, mapped_types)):
+        col_line = f"  {col['name']} {bq_type}"
+        # BigQuery arrays cannot be declared NOT NULL
+        if not col.get('nullable', True) and not bq_type.startswith("ARRAY<"):
             col_line += " NOT NULL"
         if col.get('comment'):
             col_line += f" OPTIONS(description=\"{col['comment']}\")"
-        ddl_lines.append(col_line + ",")
-    # Remove last comma
-    if len(ddl_lines) > 1:
-        ddl_lines[-1] = ddl_lines[-1].rstrip(",")
-    ddl_lines.append(")")
+        yield col_line if idx == last else col_line + ","
+    yield ")"
     if table_comment:
-        ddl_lines.append(f"OPTIONS(description=\"{table_comment}\");")
+        yield f"OPTIONS(description=\"{table_comment}\");"
     else:
-        ddl_lines.append(";")
-    return "\n".join(ddl_lines)
+        yield ";"
+
+
+def generate_bq_ddl(table_name, columns, dataset, table_comment=None, dialect=None, timings=None):
+    """
+    Generates BigQuery CREATE TABLE DDL.
+    dialect is the source system (mysql, postgresql, sqlserver, oracle) and
+    selects its type-mapping rules. The columns passed in are left unchanged,
+    so the same schema can be rendered again for other targets.
+    When a timings dict is given, the seconds spent in "map" and "render"
+    (which includes map) are added to it; callers record them once per table
+    or batch with instrumentation.record_phases.
+    """
+    if timings is None:
+        return "\n".join(_ddl_lines(table_name, columns, dataset, table_comment, dialect))
+    start = time.perf_counter()
+    ddl = "\n".join(_ddl_lines(table_name, columns, dataset, table_comment, dialect, timings))
+    _add_time(timings, "render", start)
+    return ddl
+
+
+def iter_bq_ddl(table_name, columns, dataset, table_comment=None, dialect=None):
+    """
+    Yields the same DDL as generate_bq_ddl in chunks, for streaming very wide
+    tables or many tables without building the whole text in memory.
+    """
+    first = True
+    for line in _ddl_lines(table_name, columns, dataset, table_comment, dialect):
+        if first:
+            first = False
+            yield line
+        else:
+            yield "\n" + line
+
+
+def write_bq_ddl(fp, table_name, columns, dataset, table_comment=None, dialect=None):
+    """Writes the DDL to a text file-like object."""
+    for chunk in iter_bq_ddl(table_name, columns, dataset, table_comment, dialect):
+        fp.write(chunk)
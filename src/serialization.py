@@ -0,0 +1,157 @@
+# src/serialization.py
+
+import datetime
+import decimal
+import gzip
+import json
+import os
+import uuid
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# "auto" uses orjson when it is installed; "json" forces the standard library
+JSON_BACKEND = os.environ.get("BQ_DDL_JSON_BACKEND", "auto").lower()
+# Compress responses the client accepts compressed (set to 0 when a proxy does it)
+COMPRESS_RESPONSES = os.environ.get("BQ_DDL_COMPRESS", "1").lower() in ("1", "true", "yes")
+# Smaller bodies are sent as they are; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.environ.get("BQ_DDL_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("BQ_DDL_COMPRESS_LEVEL", "6"))
+# Response types worth compressing; zip files and event streams are left alone
+COMPRESSIBLE_TYPES = ("application/json", "text/sql", "application/sql", "text/plain", "text/html", "text/css",
+                      "text/javascript", "application/javascript", "text/csv")
+
+
+def _use_orjson():
+    return orjson is not None and JSON_BACKEND != "json"
+
+
+def backend():
+    return "orjson" if _use_orjson() else "json"
+
+
+def _default(value):
+    # Values catalog drivers return that JSON has no type for
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, pretty=False, sort_keys=False):
+    """UTF-8 JSON; compact unless pretty, which indents by two spaces."""
+    if _use_orjson():
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return dumps(obj, pretty, sort_keys).encode("utf-8")
+
+
+def dumps(obj, pretty=False, sort_keys=False):
+    if _use_orjson():
+        return dumps_bytes(obj, pretty, sort_keys).decode("utf-8")
+    if pretty:
+        return json.dumps(obj, default=_default, indent=2, ensure_ascii=False, sort_keys=sort_keys)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+
+
+def loads(data):
+    if _use_orjson():
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def json_value(value):
+    """
+    A value sent either as real JSON or, by older clients, as a JSON string
+    inside the request body. Returns the decoded value (None when empty).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (str, bytes, bytearray)):
+        return loads(value)
+    return value
+
+
+def schema_value(value, name="schema"):
+    """Like json_value, for a schema dict; raises ValueError when it is not a JSON object."""
+    value = json_value(value)
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be a JSON object")
+    return value
+
+
+# Compression
+
+def choose_encoding(accept_encoding):
+    """The best content coding the client accepts: "br" (when brotli is installed), "gzip" or None."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding, level=COMPRESS_LEVEL):
+    if encoding == "br":
+        # Brotli quality runs 0-11; map the gzip-style level onto it
+        return brotli.compress(data, quality=min(11, max(0, level - 1)))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _as_bytes(chunks):
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def compress_stream(chunks, encoding, level=COMPRESS_LEVEL):
+    """
+    Compresses an iterable of byte chunks as it is consumed, for streamed
+    responses. The source iterable is closed when the stream ends or is abandoned.
+    """
+    try:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=min(11, max(0, level - 1)))
+            for chunk in _as_bytes(chunks):
+                out = compressor.process(chunk)
+                if out:
+                    yield out
+            yield compressor.finish()
+            return
+        # wbits 31 = gzip container
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in _as_bytes(chunks):
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
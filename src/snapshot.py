@@ -0,0 +1,248 @@
+# src/snapshot.py
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC = b"BQSNAP01"
+# MAGIC, then the offset of the index, then one compressed block per table
+_HEADER = struct.Struct("<8sQ")
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = ".bqsnap"
+# Where snapshots uploaded through the web UI are kept
+SNAPSHOT_DIR = os.environ.get(
+    "BQ_DDL_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "snapshots")
+)
+
+_COLUMN_FIELDS = ("name", "type", "nullable", "comment")
+
+
+def _encode(obj, codec):
+    if codec == "msgpack":
+        return msgpack.packb(obj, use_bin_type=True)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(data, codec):
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("This snapshot was written with msgpack; install msgpack to read it")
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def _to_columnar(schema):
+    """Stores the columns of a table as one list per field rather than one dict per column."""
+    columns = schema.get("columns", [])
+    block = {key: value for key, value in schema.items() if key != "columns"}
+    block["columns"] = {field: [col.get(field) for col in columns] for field in _COLUMN_FIELDS}
+    extra = [{k: v for k, v in col.items() if k not in _COLUMN_FIELDS} for col in columns]
+    if any(extra):
+        block["columns"]["extra"] = extra
+    return block
+
+
+def _from_columnar(block):
+    schema = {key: value for key, value in block.items() if key != "columns"}
+    fields = block["columns"]
+    extra = fields.get("extra")
+    columns = []
+    for idx in range(len(fields["name"])):
+        col = {field: fields[field][idx] for field in _COLUMN_FIELDS}
+        if extra and extra[idx]:
+            col.update(extra[idx])
+        columns.append(col)
+    schema["columns"] = columns
+    return schema
+
+
+def write_snapshot(fp, schemas, source=None, codec=None):
+    """
+    Writes schema dicts to a snapshot in binary file fp, which must be seekable.
+    schemas may be any iterable; tables are compressed and written one at a time.
+    source is free-form metadata about where the schemas came from.
+    Returns the number of tables written.
+    """
+    codec = codec or ("msgpack" if msgpack is not None else "json")
+    start = fp.tell()
+    fp.write(_HEADER.pack(MAGIC, 0))
+    tables = []
+    offset = _HEADER.size
+    for schema in schemas:
+        block = zlib.compress(_encode(_to_columnar(schema), codec), 6)
+        fp.write(block)
+        tables.append({
+            "table_name": schema.get("table_name"),
+            "schema": schema.get("schema"),
+            "db": schema.get("db"),
+            "columns": len(schema.get("columns", [])),
+            "offset": offset,
+            "length": len(block)
+        })
+        offset += len(block)
+    index = {
+        "version": SNAPSHOT_VERSION,
+        "codec": codec,
+        "created": time.time(),
+        "source": source or {},
+        "tables": tables
+    }
+    fp.write(zlib.compress(json.dumps(index, separators=(",", ":")).encode("utf-8"), 6))
+    end = fp.tell()
+    fp.seek(start)
+    fp.write(_HEADER.pack(MAGIC, offset))
+    fp.seek(end)
+    return len(tables)
+
+
+def save_snapshot(path, schemas, source=None, codec=None):
+    # Written beside the target and renamed, so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        written = write_snapshot(f, schemas, source, codec)
+    os.replace(tmp_path, path)
+    return written
+
+
+class Snapshot:
+    """
+    A snapshot file opened read-only through mmap. Only the index is read up
+    front; each table is decompressed when it is asked for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = None
+        try:
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty, not a schema snapshot")
+            magic, index_offset = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a schema snapshot")
+            self._read_index(index_offset)
+        except ValueError:
+            self.close()
+            raise
+        except Exception as e:
+            # Truncated or corrupt files fail anywhere in the header or index
+            self.close()
+            raise ValueError(f"{path} is not a readable schema snapshot: {e}") from e
+
+    def _read_index(self, index_offset):
+        index = json.loads(zlib.decompress(self._map[index_offset:]))
+        self.version = index["version"]
+        self.codec = index["codec"]
+        self.created = index["created"]
+        self.source = index["source"]
+        self.tables = index["tables"]
+        self._by_name = {}
+        for pos, entry in enumerate(self.tables):
+            self._by_name.setdefault((entry["table_name"] or "").lower(), []).append(pos)
+            qualified = f"{entry['schema']}.{entry['table_name']}".lower()
+            self._by_name.setdefault(qualified, []).append(pos)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.tables)
+
+    def _load(self, pos):
+        entry = self.tables[pos]
+        data = zlib.decompress(self._map[entry["offset"]:entry["offset"] + entry["length"]])
+        return _from_columnar(_decode(data, self.codec))
+
+    def get_table_schema(self, table, schema=None):
+        """Returns the schema dict of one table, or None if it is not in the snapshot."""
+        positions = self._by_name.get(f"{schema}.{table}".lower()) if schema else None
+        if not positions:
+            # A bare name (or an unknown schema) resolves when only one table has that name
+            positions = self._by_name.get((table or "").lower())
+            if not positions or (schema and len(positions) > 1):
+                return None
+        return self._load(positions[0])
+
+    def table_names(self, schema=None):
+        return [
+            entry["table_name"] for entry in self.tables
+            if schema is None or (entry["schema"] or "").lower() == schema.lower()
+        ]
+
+    def iter_schemas(self, tables=None):
+        """
+        Yields schema dicts one at a time, optionally only for the named tables
+        (bare names or "<schema>.<table>" keys).
+        """
+        wanted = {t.lower() for t in tables} if tables else None
+        for pos, entry in enumerate(self.tables):
+            name = (entry["table_name"] or "").lower()
+            if wanted is not None and name not in wanted and f"{(entry['schema'] or '').lower()}.{name}" not in wanted:
+                continue
+            yield self._load(pos)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "codec": self.codec,
+            "created": self.created,
+            "source": self.source,
+            "table_count": len(self.tables),
+            "tables": [
+                {"table_name": e["table_name"], "schema": e["schema"], "db": e["db"], "columns": e["columns"]}
+                for e in self.tables
+            ]
+        }
+
+
+_SNAPSHOT_ID_RE = re.compile(r"^[A-Za-z0-9_\-]+$")
+_open_snapshots = {}
+_open_lock = threading.Lock()
+
+
+def snapshot_path(snapshot_id):
+    """Path of a stored snapshot; ids are plain names so they cannot escape SNAPSHOT_DIR."""
+    if not snapshot_id or not _SNAPSHOT_ID_RE.match(snapshot_id):
+        raise ValueError(f"Invalid snapshot id: {snapshot_id!r}")
+    return os.path.join(SNAPSHOT_DIR, snapshot_id + SNAPSHOT_EXTENSION)
+
+
+def open_snapshot(snapshot_id):
+    """Returns the stored snapshot, opened once and shared between requests."""
+    with _open_lock:
+        snap = _open_snapshots.get(snapshot_id)
+        if snap is None:
+            path = snapshot_path(snapshot_id)
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"No snapshot named {snapshot_id}")
+            snap = Snapshot(path)
+            _open_snapshots[snapshot_id] = snap
+        return snap
+
+
+def list_snapshots():
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted(
+        name[:-len(SNAPSHOT_EXTENSION)] for name in os.listdir(SNAPSHOT_DIR) if name.endswith(SNAPSHOT_EXTENSION)
+    )
@@ -0,0 +1,154 @@
+# src/source_sessions.py
+
+import os
+import secrets
+import threading
+import time
+
+from src.pool import close_pools
+
+# Sessions not used for this long are closed along with their sources' pools
+SESSION_IDLE_TIMEOUT = float(os.environ.get("BQ_DDL_SESSION_IDLE_TIMEOUT", "1800"))
+# Key of the opaque handle in the Flask cookie session
+SESSION_KEY = "source_session"
+
+DB_SYSTEMS = ("mysql", "postgresql", "sqlserver", "oracle")
+
+
+class SourceSessionRegistry:
+    """
+    Server-side store of the sources a browser session is attached to.
+    The cookie only carries a random handle; credentials, database lists and
+    the pooled connections opened for them stay in this process.
+    Each session can attach several sources at once, keyed by a source id
+    (the engine name unless the user names the source).
+    """
+
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._sessions = {}  # handle -> {"sources": {source_id: entry}, "last_used": t}
+
+    def _expire(self, now):
+        # Called with self._lock held; returns the sources whose pools should close
+        expired = []
+        for handle, state in list(self._sessions.items()):
+            if now - state["last_used"] > self.idle_timeout:
+                expired.extend(self._sessions.pop(handle)["sources"].values())
+        return expired
+
+    def _touch(self, handle):
+        """Returns the session state for handle (None if unknown or expired) and closes idle sessions."""
+        now = time.monotonic()
+        with self._lock:
+            expired = self._expire(now)
+            state = self._sessions.get(handle) if handle else None
+            if state is not None:
+                state["last_used"] = now
+        self._release(expired)
+        return state
+
+    def attach(self, handle, engine, conn_details, dbs=None, source_id=None):
+        """
+        Attaches a source to the session and returns the (possibly new) handle.
+        Re-attaching an existing source id replaces it and closes the old pools.
+        """
+        if engine not in DB_SYSTEMS:
+            raise ValueError(f"Unsupported source system: {engine}")
+        source_id = source_id or engine
+        entry = {"id": source_id, "engine": engine, "conn": dict(conn_details), "dbs": list(dbs or [])}
+        replaced = None
+        with self._lock:
+            expired = self._expire(time.monotonic())
+            state = self._sessions.get(handle) if handle else None
+            if state is None:
+                handle = secrets.token_urlsafe(32)
+                state = self._sessions[handle] = {"sources": {}, "last_used": time.monotonic()}
+            replaced = state["sources"].get(source_id)
+            state["sources"][source_id] = entry
+            state["last_used"] = time.monotonic()
+        if replaced is not None and replaced["conn"] != entry["conn"]:
+            expired.append(replaced)
+        self._release(expired)
+        return handle
+
+    def get(self, handle, source_id):
+        """The attached source entry ({"id", "engine", "conn", "dbs"}) or None."""
+        state = self._touch(handle)
+        if state is None:
+            return None
+        return state["sources"].get(source_id)
+
+    def sources(self, handle):
+        state = self._touch(handle)
+        if state is None:
+            return []
+        return list(state["sources"].values())
+
+    def detach(self, handle, source_id=None):
+        """Detaches one source, or all of them and forgets the session when source_id is None."""
+        with self._lock:
+            state = self._sessions.get(handle) if handle else None
+            if state is None:
+                return 0
+            if source_id is None:
+                removed = list(self._sessions.pop(handle)["sources"].values())
+            else:
+                entry = state["sources"].pop(source_id, None)
+                removed = [entry] if entry else []
+        self._release(removed)
+        return len(removed)
+
+    def _release(self, entries):
+        """Closes the pools of detached sources unless another session still uses the same credentials."""
+        if not entries:
+            return
+        with self._lock:
+            in_use = {
+                _pool_scope(entry)
+                for state in self._sessions.values() for entry in state["sources"].values()
+            }
+        for scope in {_pool_scope(entry) for entry in entries} - in_use:
+            close_pools(*scope)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "sources": sum(len(state["sources"]) for state in self._sessions.values()),
+                "idle_timeout": self.idle_timeout
+            }
+
+
+def _pool_scope(entry):
+    conn = entry["conn"]
+    return (entry["engine"], conn.get('host'), conn.get('port'), conn.get('user'))
+
+
+source_sessions = SourceSessionRegistry()
+
+
+def get_source(session, engine, source_id=None):
+    """
+    Connection details of the source attached to this Flask session, in the
+    shape the extract functions take, or None. source_id defaults to the engine.
+    """
+    entry = source_sessions.get(session.get(SESSION_KEY), source_id or engine)
+    if entry is None or entry["engine"] != engine:
+        return None
+    return entry["conn"]
+
+
+def attach_source(session, engine, conn_details, dbs=None, source_id=None):
+    session[SESSION_KEY] = source_sessions.attach(session.get(SESSION_KEY), engine, conn_details, dbs, source_id)
+
+
+def detach_sources(session, source_id=None):
+    removed = source_sessions.detach(session.get(SESSION_KEY), source_id)
+    if source_id is None:
+        session.pop(SESSION_KEY, None)
+    return removed
+
+
+def attached_sources(session):
+    return source_sessions.sources(session.get(SESSION_KEY))
@@ -1,6 +1,9 @@
-import pyodbc
+from src.catalog import like_prefix
+from src.drivers import load_driver
+from src.metadata_cache import cached_metadata
+from src.pool import register_adapter, pooled_connection
 
-def test_sqlserver_connection(host, port, user, password):
+def _connect_sqlserver(host, port, user, password, database=None):
     if port:
         server = f"{host},{port}"
     else:
@@ -8,124 +11,213 @@ def test_sqlserver_connection(host, port, user, password):
     conn_str = (
         f"DRIVER={{SQL Server}};"
         f"SERVER={server};"
+    )
+    if database:
+        conn_str += f"DATABASE={database};"
+    conn_str += (
         f"UID={user};"
         f"PWD={password};"
         f"Trusted_Connection=no;"
     )
-    conn = pyodbc.connect(conn_str, autocommit=True)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sys.databases")
-    dbs = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    return load_driver("pyodbc").connect(conn_str, autocommit=True)
+
+register_adapter("sqlserver", _connect_sqlserver)
+
+def test_sqlserver_connection(host, port, user, password):
+    with pooled_connection("sqlserver", host, port, user, password) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sys.databases")
+        dbs = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return dbs
 
+@cached_metadata("sqlserver", "schemas", ("database",))
 def get_sqlserver_schemas(host, port, user, password, database):
-    if port:
-        server = f"{host},{port}"
-    else:
-        server = host
-    conn_str = (
-        f"DRIVER={{SQL Server}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-        f"UID={user};"
-        f"PWD={password};"
-        f"Trusted_Connection=no;"
-    )
-    conn = pyodbc.connect(conn_str, autocommit=True)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sys.schemas")
-    schemas = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sys.schemas")
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return schemas
 
+def get_sqlserver_schemas_page(host, port, user, password, database, prefix="", after="", limit=100):
+    """One page of schema names; see get_sqlserver_tables_page."""
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TOP (?) name FROM sys.schemas
+            WHERE name LIKE ? ESCAPE '\\' AND name > ?
+            ORDER BY name
+        """, (int(limit), like_prefix(prefix), after or ""))
+        schemas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return schemas
+
+@cached_metadata("sqlserver", "tables", ("database", "schema"))
 def get_sqlserver_tables(host, port, user, password, database, schema):
-    if port:
-        server = f"{host},{port}"
-    else:
-        server = host
-    conn_str = (
-        f"DRIVER={{SQL Server}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-        f"UID={user};"
-        f"PWD={password};"
-        f"Trusted_Connection=no;"
-    )
-    conn = pyodbc.connect(conn_str, autocommit=True)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT TABLE_NAME
-        FROM INFORMATION_SCHEMA.TABLES
-        WHERE TABLE_SCHEMA = ?
-    """, (schema,))
-    tables = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TABLE_NAME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = ?
+        """, (schema,))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
+
+def get_sqlserver_tables_page(host, port, user, password, database, schema, prefix="", after="", limit=100):
+    """
+    One page of table and view names of a schema in name order: names starting
+    with prefix and sorting after the cursor name after, using sys.objects so
+    the filter and TOP run in the catalog.
+    """
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TOP (?) o.name
+            FROM sys.objects o
+            JOIN sys.schemas s ON s.schema_id = o.schema_id
+            WHERE s.name = ? AND o.type IN ('U', 'V')
+              AND o.name LIKE ? ESCAPE '\\' AND o.name > ?
+            ORDER BY o.name
+        """, (int(limit), schema, like_prefix(prefix), after or ""))
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
     return tables
 
+@cached_metadata("sqlserver", "table_schema", ("database", "schema", "table"))
 def get_sqlserver_table_schema(host, port, user, password, database, schema, table):
-    if port:
-        server = f"{host},{port}"
-    else:
-        server = host
-    conn_str = (
-        f"DRIVER={{SQL Server}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-        f"UID={user};"
-        f"PWD={password};"
-        f"Trusted_Connection=no;"
-    )
-    conn = pyodbc.connect(conn_str, autocommit=True)
-    cursor = conn.cursor()
-    # Get column details
-    cursor.execute("""
-        SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
-        ORDER BY ORDINAL_POSITION
-    """, (schema, table))
-    columns = []
-    for col in cursor.fetchall():
-        columns.append({
-            "name": col[0],
-            "type": col[1],
-            "nullable": col[2].upper() == "YES",
-            "comment": ""  # Will be filled below
-        })
-    # Get column comments (extended properties)
-    cursor.execute(f"""
-        SELECT c.name, ep.value
-        FROM sys.columns c
-        LEFT JOIN sys.extended_properties ep
-          ON ep.major_id = OBJECT_ID('{schema}.{table}')
-          AND ep.minor_id = c.column_id
-          AND ep.name = 'MS_Description'
-        WHERE c.object_id = OBJECT_ID('{schema}.{table}')
-    """)
-    col_comments = {row[0]: row[1] for row in cursor.fetchall() if row[1]}
-    for col in columns:
-        col["comment"] = col_comments.get(col["name"], "")
-    # Get table comment (extended property)
-    cursor.execute(f"""
-        SELECT ep.value
-        FROM sys.extended_properties ep
-        WHERE ep.major_id = OBJECT_ID('{schema}.{table}')
-          AND ep.minor_id = 0
-          AND ep.name = 'MS_Description'
-    """)
-    table_comment_row = cursor.fetchone()
-    table_comment = table_comment_row[0] if table_comment_row else ""
-    schema_dict = {
-        "table_name": table,
-        "columns": columns,
-        "db": database,
-        "schema": schema,
-        "table_comment": table_comment
-    }
-    cursor.close()
-    conn.close()
-    return schema_dict
\ No newline at end of file
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        # Get column details
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
+            ORDER BY ORDINAL_POSITION
+        """, (schema, table))
+        columns = []
+        for col in cursor.fetchall():
+            columns.append({
+                "name": col[0],
+                "type": col[1],
+                "nullable": col[2].upper() == "YES",
+                "comment": ""  # Will be filled below
+            })
+        # Get column comments (extended properties)
+        cursor.execute(f"""
+            SELECT c.name, ep.value
+            FROM sys.columns c
+            LEFT JOIN sys.extended_properties ep
+              ON ep.major_id = OBJECT_ID('{schema}.{table}')
+              AND ep.minor_id = c.column_id
+              AND ep.name = 'MS_Description'
+            WHERE c.object_id = OBJECT_ID('{schema}.{table}')
+        """)
+        col_comments = {row[0]: row[1] for row in cursor.fetchall() if row[1]}
+        for col in columns:
+            col["comment"] = col_comments.get(col["name"], "")
+        # Get table comment (extended property)
+        cursor.execute(f"""
+            SELECT ep.value
+            FROM sys.extended_properties ep
+            WHERE ep.major_id = OBJECT_ID('{schema}.{table}')
+              AND ep.minor_id = 0
+              AND ep.name = 'MS_Description'
+        """)
+        table_comment_row = cursor.fetchone()
+        table_comment = table_comment_row[0] if table_comment_row else ""
+        schema_dict = {
+            "table_name": table,
+            "columns": columns,
+            "db": database,
+            "schema": schema,
+            "table_comment": table_comment
+        }
+        cursor.close()
+    return schema_dict
+
+def get_sqlserver_all_table_schemas(host, port, user, password, database, schema, tables=None):
+    """
+    Extracts every table of a schema with one columns query and one
+    sys.extended_properties query. Returns a list of schema dicts shaped like
+    get_sqlserver_table_schema.
+    """
+    wanted = set(tables) if tables else None
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        # Table descriptions have minor_id = 0, column descriptions carry the column_id
+        cursor.execute("""
+            SELECT o.name, c.name, CAST(ep.value AS NVARCHAR(MAX))
+            FROM sys.extended_properties ep
+            JOIN sys.objects o ON o.object_id = ep.major_id
+            JOIN sys.schemas s ON s.schema_id = o.schema_id
+            LEFT JOIN sys.columns c
+              ON c.object_id = ep.major_id AND c.column_id = ep.minor_id
+            WHERE ep.class = 1 AND ep.name = 'MS_Description' AND s.name = ?
+        """, (schema,))
+        table_comments = {}
+        col_comments = {}
+        for table_name, col_name, description in cursor.fetchall():
+            if col_name is None:
+                table_comments[table_name] = description or ""
+            else:
+                col_comments[(table_name, col_name)] = description or ""
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = ?
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """, (schema,))
+        schemas = {}
+        for table_name, col_name, data_type, is_nullable in cursor.fetchall():
+            if wanted is not None and table_name not in wanted:
+                continue
+            if table_name not in schemas:
+                schemas[table_name] = {
+                    "table_name": table_name,
+                    "columns": [],
+                    "db": database,
+                    "schema": schema,
+                    "table_comment": table_comments.get(table_name, "")
+                }
+            schemas[table_name]["columns"].append({
+                "name": col_name,
+                "type": data_type,
+                "nullable": is_nullable.upper() == "YES",
+                "comment": col_comments.get((table_name, col_name), "")
+            })
+        cursor.close()
+    return list(schemas.values())
+
+def get_sqlserver_table_fingerprints(host, port, user, password, database, schema):
+    """
+    Returns {table_name: fingerprint text} for every table and view of a schema
+    from one catalog query: modify_date, the column count, a checksum over the
+    column definitions and descriptions, and the table description
+    (sp_addextendedproperty does not touch modify_date).
+    """
+    with pooled_connection("sqlserver", host, port, user, password, database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT t.name, CONVERT(VARCHAR(33), t.modify_date, 126), COUNT(c.column_id),
+                   CHECKSUM_AGG(CHECKSUM(c.column_id, c.name, c.system_type_id, c.max_length,
+                                         c.precision, c.scale, c.is_nullable,
+                                         CAST(ep.value AS NVARCHAR(4000)))),
+                   (SELECT CAST(tp.value AS NVARCHAR(4000))
+                    FROM sys.extended_properties tp
+                    WHERE tp.class = 1 AND tp.major_id = t.object_id AND tp.minor_id = 0
+                      AND tp.name = 'MS_Description')
+            FROM sys.objects t
+            JOIN sys.schemas s ON s.schema_id = t.schema_id
+            JOIN sys.columns c ON c.object_id = t.object_id
+            LEFT JOIN sys.extended_properties ep
+              ON ep.class = 1 AND ep.major_id = c.object_id AND ep.minor_id = c.column_id
+             AND ep.name = 'MS_Description'
+            WHERE s.name = ? AND t.type IN ('U', 'V')
+            GROUP BY t.object_id, t.name, t.modify_date
+        """, (schema,))
+        fingerprints = {row[0]: "|".join(str(v) for v in row[1:]) for row in cursor.fetchall()}
+        cursor.close()
+    return fingerprints
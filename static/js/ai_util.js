@@ -17,39 +17,138 @@ function updateAIButtonsState() {
     });
 }
 
-function sendSchemaToAI(jsonSchema, modelName, callback) {
-    fetch('/ai_add_comment', {
+function sendSchemaToAI(jsonSchema, modelName, callback, dbSystem = '') {
+    // The schema is sent as a JSON object, not as a string inside the body
+    let schema;
+    try {
+        schema = JSON.parse(jsonSchema);
+    } catch (e) {
+        hideLoadingOverlay();
+        showToast("Invalid JSON schema.", "danger", 4000);
+        return;
+    }
+    // Commenting runs as a background job; progress arrives as Server-Sent Events
+    fetch('/ai_jobs', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ json_schema: jsonSchema, model: modelName })
+        body: JSON.stringify({ json_schema: schema, model: modelName, db_system: dbSystem })
     })
     .then(response => response.json())
     .then(data => {
-        if (data.schema) {
-            showToast("AI comments added!", "success", 2000);
-            callback(data.schema);
-        } else {
+        if (!data.job_id) {
+            hideLoadingOverlay();
             showToast("AI failed to add comments.", "danger", 4000);
+            return;
         }
+        followAIJob(data.job_id, callback);
     })
     .catch(() => {
+        hideLoadingOverlay();
         showToast("Error communicating with AI service.", "danger", 4000);
     });
 }
 
-function sendDDLToAI(ddl, modelName) {
-    fetch('/ai_add_comment', {
+function followAIJob(jobId, callback) {
+    const events = new EventSource(`/ai_jobs/${jobId}/events`);
+    const cancelBtn = document.getElementById('gpt-cancel-btn');
+    if (cancelBtn) {
+        cancelBtn.style.display = '';
+        cancelBtn.onclick = function() {
+            cancelBtn.disabled = true;
+            fetch(`/ai_jobs/${jobId}/cancel`, { method: 'POST' });
+        };
+    }
+    const finish = function() {
+        events.close();
+        if (cancelBtn) {
+            cancelBtn.style.display = 'none';
+            cancelBtn.disabled = false;
+        }
+    };
+    events.addEventListener('progress', function(e) {
+        const job = JSON.parse(e.data);
+        setLoadingText(`Processing with AI... ${job.completed}/${job.total} columns`);
+    });
+    events.addEventListener('done', function(e) {
+        finish();
+        const job = JSON.parse(e.data);
+        if (job.status === 'done') {
+            showToast("AI comments added!", "success", 2000);
+            callback(job.schema);
+        } else if (job.status === 'cancelled') {
+            hideLoadingOverlay();
+            showToast("AI commenting cancelled.", "info", 2000);
+        } else {
+            hideLoadingOverlay();
+            showToast("AI failed to add comments: " + (job.error || "unknown error"), "danger", 4000);
+        }
+    });
+    events.onerror = function() {
+        // The stream dropped; EventSource reconnects on its own unless closed
+        if (events.readyState === EventSource.CLOSED) {
+            finish();
+            hideLoadingOverlay();
+            showToast("Lost connection to the AI job.", "danger", 4000);
+        }
+    };
+}
+
+function sendDDLToAI(ddl, modelName, target, onDone) {
+    // Tokens are rendered into target as the model produces them
+    fetch('/ai_comment_ddl_stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ ddl: ddl, model: modelName })
     })
-    .then(response => response.json())
-    .then(data => {
-        showToast("AI Response: " + (data.response || "No response"), "info", 5000);
-        console.log("AI Response:", data.response);
+    .then(response => {
+        if (!response.ok || !response.body) {
+            throw new Error("stream failed");
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let finished = false;
+        target.textContent = '';
+        const handleEvent = function(raw) {
+            let eventName = 'message';
+            let data = '';
+            raw.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (eventName === 'message' && data) {
+                text += JSON.parse(data).token;
+                target.textContent = text;
+            } else if (eventName === 'done') {
+                finished = true;
+                if (onDone) onDone(text, true);
+            } else if (eventName === 'error') {
+                finished = true;
+                showToast("AI error: " + JSON.parse(data).error, "danger", 4000);
+                if (onDone) onDone(text, false);
+            }
+        };
+        const pump = function() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    if (!finished && onDone) onDone(text, true);
+                    return;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                    handleEvent(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                }
+                return pump();
+            });
+        };
+        return pump();
     })
     .catch(() => {
         showToast("Error communicating with AI service.", "danger", 4000);
+        if (onDone) onDone('', false);
     });
 }
 
@@ -85,7 +184,8 @@ function handleAddCommentsDDLBtn(id) {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
-                    schema: JSON.stringify(updatedSchema),
+                    schema: updatedSchema,
+                    db_system: id === 'addCommentsDDLBtn' ? document.getElementById('db_system').value : '',
                     bq_project_id: bq_project_id,
                     bq_dataset_id: bq_dataset_id,
                     bq_table_name: bq_table_name
@@ -107,12 +207,33 @@ function handleAddCommentsDDLBtn(id) {
                 hideLoadingOverlay();
                 showToast("Error generating DDL.", "danger", 2000);
             });
-        });
+        }, id === 'addCommentsDDLBtn' ? document.getElementById('db_system').value : '');
     } else {
         showToast("Missing schema or model.", "danger", 2000);
     }
 }
 
+function handleStandardizeDDLBtn(id) {
+    const isBrowse = id === 'standardizeDDLBtn';
+    const pre = document.querySelector(isBrowse ? '#bq_ddl_preview pre' : '#bq_ddl_preview_manual pre');
+    const modelName = document.getElementById('ai_model_select').value;
+    const ddl = pre ? pre.textContent : '';
+    if (!ddl || !modelName) {
+        showToast("Missing DDL or model.", "danger", 2000);
+        return;
+    }
+    const btn = document.getElementById(id);
+    btn.disabled = true;
+    sendDDLToAI(ddl, modelName, pre, function(text, ok) {
+        btn.disabled = false;
+        if (!ok) {
+            pre.textContent = text || ddl;
+            return;
+        }
+        updateDownloadDDLBtn(text, isBrowse ? "downloadDDLBtn" : "downloadDDLBtnManual");
+        showToast("Preview updated with AI comments!", "success", 2000);
+    });
+}
 
 // Fetch models from the backend and populate the select
 window.addEventListener('DOMContentLoaded', function() {
@@ -147,6 +268,7 @@ window.addEventListener('DOMContentLoaded', function() {
         if (btn) {
             btn.addEventListener('click', function() {
                 showToast("Processing Standardize DDL...", "info", 2000);
+                handleStandardizeDDLBtn(id);
             });
         }
     });
@@ -163,8 +285,13 @@ window.addEventListener('DOMContentLoaded', function() {
 });
 
 function showLoadingOverlay() {
+    setLoadingText("Processing with AI...");
     document.getElementById('gpt-loading-overlay').style.display = 'flex';
 }
+function setLoadingText(text) {
+    const label = document.getElementById('gpt-loading-text');
+    if (label) label.textContent = text;
+}
 function hideLoadingOverlay() {
     document.getElementById('gpt-loading-overlay').style.display = 'none';
 }
\ No newline at end of file
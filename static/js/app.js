@@ -37,39 +37,110 @@ window.addEventListener('DOMContentLoaded', function() {
     updateBQTableNameFromDDL();
 });
 
-function loadMysqlTables() {
-    const db = document.getElementById('browse_database').value;
-    if (!db) {
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-        clearJsonSchema();
-        return;
+// Table (and Oracle schema) pickers are type-ahead inputs: each keystroke asks
+// /catalog for one small page of names starting with what was typed.
+const CATALOG_PAGE_LIMIT = 50;
+const CATALOG_LOOKUP_DELAY = 250;
+let catalogLookupTimer = null;
+let catalogLookupSeq = 0;
+
+function resetNameInput(inputId) {
+    const input = document.getElementById(inputId);
+    if (!input) return;
+    input.value = '';
+    document.getElementById(`${inputId}_options`).innerHTML = '';
+    document.getElementById(`${inputId}_hint`).textContent = '';
+}
+
+// The attached source the browse tab works on (empty for the engine's default source)
+function browseSourceQuery() {
+    const sourceEl = document.getElementById('browse_source');
+    return sourceEl && sourceEl.value ? `&source=${encodeURIComponent(sourceEl.value)}` : '';
+}
+
+function loadCatalogOptions(kind, inputId) {
+    const input = document.getElementById(inputId);
+    const dbSystem = document.getElementById('db_system').value;
+    const databaseEl = document.getElementById('browse_database');
+    const schemaEl = document.getElementById('browse_schema');
+    const params = new URLSearchParams({
+        db_system: dbSystem,
+        database: databaseEl ? databaseEl.value : '',
+        prefix: input.value,
+        limit: CATALOG_PAGE_LIMIT
+    });
+    const sourceEl = document.getElementById('browse_source');
+    if (sourceEl && sourceEl.value) {
+        params.set('source', sourceEl.value);
+    }
+    if (kind === 'tables' && schemaEl) {
+        if (!schemaEl.value) return;
+        params.set('schema', schemaEl.value);
     }
-    document.getElementById('browse_table').innerHTML = '<option>Loading...</option>';
-    fetch(`/get_mysql_tables?database=${encodeURIComponent(db)}`)
+    const hint = document.getElementById(`${inputId}_hint`);
+    const seq = ++catalogLookupSeq;
+    hint.textContent = 'Loading...';
+    fetch(`/catalog/${kind}?${params}`)
         .then(response => response.json())
         .then(data => {
-            let options = '<option value="">Select table...</option>';
-            for (const tbl of data) {
-                options += `<option value="${tbl}">${tbl}</option>`;
+            // Answers to earlier keystrokes can arrive after newer ones
+            if (seq !== catalogLookupSeq) return;
+            if (data.error) {
+                hint.textContent = data.error;
+                return;
+            }
+            const datalist = document.getElementById(`${inputId}_options`);
+            datalist.innerHTML = '';
+            for (const name of data.items) {
+                const option = document.createElement('option');
+                option.value = name;
+                datalist.appendChild(option);
+            }
+            if (data.next_cursor) {
+                hint.textContent = `Showing the first ${data.items.length} matches, keep typing to narrow down.`;
+            } else {
+                hint.textContent = `${data.items.length} match${data.items.length === 1 ? '' : 'es'}.`;
             }
-            document.getElementById('browse_table').innerHTML = options;
-            clearJsonSchema();
         })
         .catch(() => {
-            document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-            clearJsonSchema();
+            if (seq === catalogLookupSeq) hint.textContent = '';
         });
 }
 
+function attachTypeAhead(inputId, kind) {
+    const input = document.getElementById(inputId);
+    if (!input) return;
+    input.addEventListener('input', function() {
+        clearTimeout(catalogLookupTimer);
+        catalogLookupTimer = setTimeout(() => loadCatalogOptions(kind, inputId), CATALOG_LOOKUP_DELAY);
+    });
+}
+
+window.addEventListener('DOMContentLoaded', function() {
+    attachTypeAhead('browse_table', 'tables');
+    if (document.getElementById('db_system').value === 'oracle') {
+        attachTypeAhead('browse_schema', 'schemas');
+    }
+});
+
+function loadMysqlTables() {
+    const db = document.getElementById('browse_database').value;
+    resetNameInput('browse_table');
+    clearJsonSchema();
+    if (db) {
+        loadCatalogOptions('tables', 'browse_table');
+    }
+}
+
 function loadPostgresSchemas() {
     const db = document.getElementById('browse_database').value;
     if (!db) {
         document.getElementById('browse_schema').innerHTML = '<option value="">Select schema...</option>';
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
+        resetNameInput('browse_table');
         clearJsonSchema();
         return;
     }
-    fetch(`/get_postgres_schemas?database=${encodeURIComponent(db)}`)
+    fetch(`/get_postgres_schemas?database=${encodeURIComponent(db)}${browseSourceQuery()}`)
         .then(response => response.json())
         .then(data => {
             let options = '<option value="">Select schema...</option>';
@@ -77,40 +148,26 @@ function loadPostgresSchemas() {
                 options += `<option value="${schema}">${schema}</option>`;
             }
             document.getElementById('browse_schema').innerHTML = options;
-            document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
+            resetNameInput('browse_table');
             clearJsonSchema();
         });
 }
 
 function loadPostgresTables() {
-    const db = document.getElementById('browse_database').value;
-    const schema = document.getElementById('browse_schema').value;
-    if (!db || !schema) {
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-        clearJsonSchema();
-        return;
-    }
-    fetch(`/get_postgres_tables?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}`)
-        .then(response => response.json())
-        .then(data => {
-            let options = '<option value="">Select table...</option>';
-            for (const tbl of data) {
-                options += `<option value="${tbl}">${tbl}</option>`;
-            }
-            document.getElementById('browse_table').innerHTML = options;
-            clearJsonSchema();
-        });
+    resetNameInput('browse_table');
+    clearJsonSchema();
+    loadCatalogOptions('tables', 'browse_table');
 }
 
 function loadSqlServerSchemas() {
     const db = document.getElementById('browse_database').value;
     if (!db) {
         document.getElementById('browse_schema').innerHTML = '<option value="">Select schema...</option>';
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
+        resetNameInput('browse_table');
         clearJsonSchema();
         return;
     }
-    fetch(`/get_sqlserver_schemas?database=${encodeURIComponent(db)}`)
+    fetch(`/get_sqlserver_schemas?database=${encodeURIComponent(db)}${browseSourceQuery()}`)
         .then(response => response.json())
         .then(data => {
             let options = '<option value="">Select schema...</option>';
@@ -118,62 +175,28 @@ function loadSqlServerSchemas() {
                 options += `<option value="${schema}">${schema}</option>`;
             }
             document.getElementById('browse_schema').innerHTML = options;
-            document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
+            resetNameInput('browse_table');
             clearJsonSchema();
         });
 }
 
 function loadSqlServerTables() {
-    const db = document.getElementById('browse_database').value;
-    const schema = document.getElementById('browse_schema').value;
-    if (!db || !schema) {
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-        clearJsonSchema();
-        return;
-    }
-    fetch(`/get_sqlserver_tables?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}`)
-        .then(response => response.json())
-        .then(data => {
-            let options = '<option value="">Select table...</option>';
-            for (const tbl of data) {
-                options += `<option value="${tbl}">${tbl}</option>`;
-            }
-            document.getElementById('browse_table').innerHTML = options;
-            clearJsonSchema();
-        });
+    resetNameInput('browse_table');
+    clearJsonSchema();
+    loadCatalogOptions('tables', 'browse_table');
 }
 
 function loadOracleSchemas() {
-    fetch('/get_oracle_schemas')
-        .then(response => response.json())
-        .then(data => {
-            let options = '<option value="">Select schema...</option>';
-            for (const schema of data) {
-                options += `<option value="${schema}">${schema}</option>`;
-            }
-            document.getElementById('browse_schema').innerHTML = options;
-            document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-            clearJsonSchema();
-        });
+    resetNameInput('browse_schema');
+    resetNameInput('browse_table');
+    clearJsonSchema();
+    loadCatalogOptions('schemas', 'browse_schema');
 }
 
 function loadOracleTables() {
-    const schema = document.getElementById('browse_schema').value;
-    if (!schema) {
-        document.getElementById('browse_table').innerHTML = '<option value="">Select table...</option>';
-        clearJsonSchema();
-        return;
-    }
-    fetch(`/get_oracle_tables?schema=${encodeURIComponent(schema)}`)
-        .then(response => response.json())
-        .then(data => {
-            let options = '<option value="">Select table...</option>';
-            for (const tbl of data) {
-                options += `<option value="${tbl}">${tbl}</option>`;
-            }
-            document.getElementById('browse_table').innerHTML = options;
-            clearJsonSchema();
-        });
+    resetNameInput('browse_table');
+    clearJsonSchema();
+    loadCatalogOptions('tables', 'browse_table');
 }
 
 // Call this when Oracle is selected and connected
@@ -265,7 +288,7 @@ function getSchemaFromBrowse() {
             showToast("Please select database, schema, and table.", "warning", 4000);
             return;
         }
-        fetch(`/get_postgres_schema?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}`)
+        fetch(`/get_postgres_schema?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}${browseSourceQuery()}`)
             .then(response => response.json())
             .then(data => {
                 document.getElementById('browse_json_schema').textContent = JSON.stringify(data.schema, null, 4);
@@ -279,7 +302,7 @@ function getSchemaFromBrowse() {
             showToast("Please select database, schema, and table.", "warning", 4000);
             return;
         }
-        fetch(`/get_sqlserver_schema?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}`)
+        fetch(`/get_sqlserver_schema?database=${encodeURIComponent(db)}&schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}${browseSourceQuery()}`)
             .then(response => response.json())
             .then(data => {
                 document.getElementById('browse_json_schema').textContent = JSON.stringify(data.schema, null, 4);
@@ -292,7 +315,7 @@ function getSchemaFromBrowse() {
             showToast("Please select both database and table.", "warning", 4000);
             return;
         }
-        fetch(`/get_mysql_schema?database=${encodeURIComponent(db)}&table=${encodeURIComponent(tbl)}`)
+        fetch(`/get_mysql_schema?database=${encodeURIComponent(db)}&table=${encodeURIComponent(tbl)}${browseSourceQuery()}`)
             .then(response => response.json())
             .then(data => {
                 document.getElementById('browse_json_schema').textContent = JSON.stringify(data.schema, null, 4);
@@ -306,7 +329,7 @@ function getSchemaFromBrowse() {
             showToast("Please select schema and table.", "warning", 4000);
             return;
         }
-        fetch(`/get_oracle_table_schema?schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}`)
+        fetch(`/get_oracle_table_schema?schema=${encodeURIComponent(schema)}&table=${encodeURIComponent(tbl)}${browseSourceQuery()}`)
             .then(response => response.json())
             .then(data => {
                 document.getElementById('browse_json_schema').textContent = JSON.stringify(data.schema, null, 4);
@@ -324,11 +347,19 @@ function generateDDLFromSchema() {
     const bq_project_id = document.getElementById('bq_project_id_browse').value;
     const bq_dataset_id = document.getElementById('bq_dataset_id_browse').value;
     const bq_table_name = document.getElementById('bq_table_name_browse').value;
+    let schema;
+    try {
+        schema = JSON.parse(schemaText);
+    } catch (e) {
+        showToast(`Invalid JSON schema: ${e.message}`, "danger", 4000);
+        return;
+    }
     fetch('/generate_bq_ddl', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({
-            schema: schemaText,
+            schema: schema,
+            db_system: document.getElementById('db_system').value,
             bq_project_id: bq_project_id,
             bq_dataset_id: bq_dataset_id,
             bq_table_name: bq_table_name
@@ -336,6 +367,10 @@ function generateDDLFromSchema() {
     })
     .then(response => response.json())
     .then(data => {
+        if (data.error) {
+            showToast(data.error, "danger", 4000);
+            return;
+        }
         document.getElementById('bq_ddl_preview').style.display = 'block';
         document.getElementById('bq_ddl_preview').querySelector('pre').textContent = data.ddl;
         // Optional: enable download